@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+
+__all__ = [
+    'Log',
+    'SORT_FIELDS',
+]
+
+
+@dataclass(frozen=True, slots=True)
+class Log:
+    id: int
+    action: str
+    created: datetime
+
+
+SORT_FIELDS = {'id': 'id', 'action': 'action', 'created': 'created'}
@@ -0,0 +1,38 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterator
+from datetime import datetime, timedelta, timezone
+from typing import Any, TypeVar
+
+import pytest
+
+from ._data import Log
+
+
+_T = TypeVar('_T')
+
+RunT = Callable[[Awaitable[_T]], _T]
+
+ROWS_COUNTS = (1_000, 100_000, 1_000_000)
+_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_ACTIONS = ('create', 'update', 'delete', 'login', 'logout')
+
+
+def make_logs(count: int) -> list[Log]:
+    # Many rows share "created" and "action", so the unique field breaks ties
+    return [
+        Log(i, _ACTIONS[i % len(_ACTIONS)], _START + timedelta(seconds=i // 10))
+        for i in range(1, count + 1)
+    ]
+
+
+@pytest.fixture(scope='session')
+def aio_run() -> Iterator[RunT[Any]]:
+    """Run a coroutine on a dedicated loop, benchmark functions are sync."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(scope='session', params=ROWS_COUNTS, ids=lambda c: f'{c}_rows')
+def logs(request: pytest.FixtureRequest) -> list[Log]:
+    return make_logs(request.param)
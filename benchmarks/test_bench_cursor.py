@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Any
+
+import pytest
+from paginate_any.cursor_codec import (
+    CursorCodec,
+    MsgpackCursorCodec,
+    StructCursorCodec,
+)
+from paginate_any.cursor_pagination import InMemoryCursorPaginator
+
+from ._data import SORT_FIELDS, Log
+
+
+pytestmark = pytest.mark.benchmark(group='cursor')
+
+_FIELDS = ('created', 'id')
+_VALUES = (datetime.fromisoformat('2024-01-01T00:00:00+00:00'), 100_500)
+_CODECS = {
+    'msgpack': MsgpackCursorCodec(),
+    'msgpack_no_cache': MsgpackCursorCodec(cache_size=0),
+    'struct': StructCursorCodec({'created': datetime, 'id': int}),
+}
+
+
+@pytest.fixture(params=list(_CODECS))
+def codec(request: pytest.FixtureRequest) -> CursorCodec:
+    return _CODECS[request.param]
+
+
+def test_make_cursor(benchmark):
+    p = InMemoryCursorPaginator[Log]('id', SORT_FIELDS)
+    token = p._encode_cursor(_VALUES, _FIELDS)
+
+    cursor = benchmark(p._make_cursor, None, token, '-created', 50)
+
+    assert cursor.after == _VALUES
+
+
+def test_make_cursor_without_token(benchmark):
+    p = InMemoryCursorPaginator[Log]('id', SORT_FIELDS)
+
+    cursor = benchmark(p._make_cursor, None, None, '-action,created', 50)
+
+    assert cursor.sort_fields == ('action', 'created', 'id')
+
+
+def test_encode_cursor(benchmark, codec: CursorCodec):
+    token = benchmark(codec.encode, _VALUES, _FIELDS)
+
+    assert codec.decode(token, _FIELDS) == _VALUES
+
+
+def test_decode_cursor(benchmark, codec: CursorCodec):
+    token = codec.encode(_VALUES, _FIELDS)
+
+    values: Any = benchmark(codec.decode, token, _FIELDS)
+
+    assert values == _VALUES
@@ -0,0 +1,52 @@
+import pytest
+from paginate_any.cursor_pagination import (
+    IndexedRowsStore,
+    InMemoryCursorPaginator,
+)
+
+from ._data import SORT_FIELDS, Log
+from .conftest import RunT
+
+
+pytestmark = pytest.mark.benchmark(group='in_memory')
+
+_SIZE = 50
+
+
+@pytest.mark.parametrize('sort', ['id', '-created'])
+def test_in_memory_first_page(benchmark, aio_run: RunT[object], logs: list[Log], sort):
+    p = InMemoryCursorPaginator[Log]('id', SORT_FIELDS, max_size=_SIZE)
+
+    page = benchmark(lambda: aio_run(p.paginate(logs, sort, size=_SIZE)))
+
+    assert len(page.rows) == _SIZE
+
+
+@pytest.mark.parametrize('sort', ['id', '-created'])
+def test_in_memory_middle_page(benchmark, aio_run: RunT[object], logs: list[Log], sort):
+    p = InMemoryCursorPaginator[Log]('id', SORT_FIELDS, max_size=_SIZE)
+    cursor = p._make_cursor(None, None, sort, _SIZE)
+    after = p._get_cursor_value(logs[len(logs) // 2], cursor)
+
+    page = benchmark(lambda: aio_run(p.paginate(logs, sort, after=after, size=_SIZE)))
+
+    assert len(page.rows) == _SIZE
+
+
+@pytest.mark.parametrize('sort', ['id', '-created'])
+def test_in_memory_indexed_store_middle_page(
+    benchmark,
+    aio_run: RunT[object],
+    logs: list[Log],
+    sort,
+):
+    p = InMemoryCursorPaginator[Log]('id', SORT_FIELDS, max_size=_SIZE)
+    store = IndexedRowsStore(logs)
+    cursor = p._make_cursor(None, None, sort, _SIZE)
+    after = p._get_cursor_value(logs[len(logs) // 2], cursor)
+    # Build the index outside of the measured calls
+    aio_run(p.paginate(store, sort, size=_SIZE))
+
+    page = benchmark(lambda: aio_run(p.paginate(store, sort, after=after, size=_SIZE)))
+
+    assert len(page.rows) == _SIZE
@@ -0,0 +1,92 @@
+import sys
+from typing import Any
+
+import pytest
+from paginate_any.cursor_pagination import InMemoryCursorPaginator
+
+from ._data import SORT_FIELDS, Log
+from .conftest import RunT, make_logs
+
+
+pytestmark = [
+    pytest.mark.benchmark(group='rest'),
+    pytest.mark.filterwarnings('ignore::DeprecationWarning'),
+]
+
+_SIZE = 50
+_QUERY = {'ordering': '-created', 'size': _SIZE, 'action': 'login', 'tz': 'UTC'}
+
+
+@pytest.fixture(scope='module')
+def paginator() -> InMemoryCursorPaginator[Log]:
+    return InMemoryCursorPaginator[Log]('id', SORT_FIELDS, max_size=_SIZE)
+
+
+@pytest.fixture(scope='module')
+def store() -> list[Log]:
+    return make_logs(1_000)
+
+
+@pytest.fixture()
+def fastapi_client(paginator: InMemoryCursorPaginator[Log], store: list[Log]) -> Any:
+    try:
+        from fastapi import FastAPI, Request
+        from httpx import AsyncClient
+    except ImportError as e:
+        pytest.skip(str(e))
+
+    from paginate_any.ext.fastapi import (
+        FastApiCursorPagination,
+        PaginationJSONResponse,
+        init_paginate_any_fastapi_app,
+    )
+
+    app = FastAPI()
+    init_paginate_any_fastapi_app(app)
+    pagination = FastApiCursorPagination(paginator)
+
+    @app.get('/logs')
+    async def paginate(request: Request) -> PaginationJSONResponse:
+        return PaginationJSONResponse(await pagination.paginate(request, store))
+
+    return AsyncClient(app=app, base_url='https://app')
+
+
+@pytest.fixture()
+def sanic_client(paginator: InMemoryCursorPaginator[Log], store: list[Log]) -> Any:
+    try:
+        from sanic import Sanic
+        from sanic_testing.testing import SanicASGITestClient
+    except ImportError as e:
+        pytest.skip(str(e))
+
+    from paginate_any.ext.sanic import (
+        SanicJsonCursorPagination,
+        init_paginate_any_sanic_app,
+        pagination_json,
+    )
+
+    app: Sanic[Any, Any] = Sanic('bench_app')
+    app.config.TOUCHUP = False
+    app.config.REQUEST_TIMEOUT = sys.maxsize
+    app.config.RESPONSE_TIMEOUT = sys.maxsize
+    init_paginate_any_sanic_app(app)
+    pagination = SanicJsonCursorPagination(paginator)
+
+    @app.get('/logs')
+    async def paginate(request: Any) -> Any:
+        return pagination_json(await pagination.paginate(request, store))
+
+    return SanicASGITestClient(app)
+
+
+def test_fastapi_request(benchmark, aio_run: RunT[Any], fastapi_client: Any):
+    resp = benchmark(lambda: aio_run(fastapi_client.get('/logs', params=_QUERY)))
+
+    assert resp.status_code == 200, resp.content
+
+
+def test_sanic_request(benchmark, aio_run: RunT[Any], sanic_client: Any):
+    _, resp = benchmark(lambda: aio_run(sanic_client.get('/logs', params=_QUERY)))
+
+    assert resp.status_code == 200, resp.content
@@ -0,0 +1,87 @@
+from collections.abc import Iterator
+from dataclasses import asdict
+from typing import Any
+
+import pytest
+from paginate_any.ext.sqlalchemy import KeysetPredicate, SQLAlchemyCursorPaginator
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    insert,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from .conftest import RunT, make_logs
+
+
+pytestmark = pytest.mark.benchmark(group='sqlalchemy')
+
+_ROWS_COUNT = 100_000
+_SIZE = 50
+
+_metadata = MetaData()
+logs = Table(
+    'logs',
+    _metadata,
+    Column('id', Integer, primary_key=True),
+    Column('action', String(255), nullable=False),
+    Column('created', DateTime(timezone=True), nullable=False),
+    # Keyset indexes of the benchmarked sorts
+    Index('ix_logs_created_id', 'created', 'id'),
+    Index('ix_logs_action_id', 'action', 'id'),
+)
+
+
+@pytest.fixture(scope='module')
+def session(
+    aio_run: RunT[Any],
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Iterator[AsyncSession]:
+    path = tmp_path_factory.mktemp('sqlite') / 'bench.db'
+    engine = create_async_engine(f'sqlite+aiosqlite:///{path}')
+
+    async def create_db() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(_metadata.create_all)
+            await conn.execute(insert(logs), [asdict(r) for r in make_logs(_ROWS_COUNT)])
+            await conn.exec_driver_sql('ANALYZE')
+
+    aio_run(create_db())
+    s = AsyncSession(engine)
+    yield s
+    aio_run(s.close())
+    aio_run(engine.dispose())
+
+
+@pytest.fixture(params=list(KeysetPredicate))
+def paginator(request: pytest.FixtureRequest) -> SQLAlchemyCursorPaginator[Any]:
+    return SQLAlchemyCursorPaginator[Any](
+        'id',
+        {'id': logs.c.id, 'action': logs.c.action, 'created': logs.c.created},
+        max_size=_SIZE,
+        predicate=request.param,
+    )
+
+
+@pytest.mark.parametrize('sort', ['id', '-created', 'action'])
+def test_sqlalchemy_next_page(
+    benchmark,
+    aio_run: RunT[Any],
+    session: AsyncSession,
+    paginator: SQLAlchemyCursorPaginator[Any],
+    sort,
+):
+    store = (session, select(logs))
+    after = aio_run(paginator.paginate(store, sort, size=_SIZE)).next
+
+    page = benchmark(
+        lambda: aio_run(paginator.paginate(store, sort, after=after, size=_SIZE)),
+    )
+
+    assert len(page.rows) == _SIZE
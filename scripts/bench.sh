@@ -0,0 +1,8 @@
+#!/bin/bash
+
+set -o errexit
+set -o nounset
+
+# Results are saved to .benchmarks/ and compared with the previous saved run,
+# e.g. ./scripts/bench.sh --benchmark-compare-fail=mean:10% -k in_memory
+exec python -m pytest benchmarks -p no:randomly --benchmark-autosave --benchmark-compare "$@"
@@ -25,9 +25,9 @@ else
     exit 1
 fi
 
-printf_center "Ruff" && ruff check $ruff_flags src tests
-printf_center "Black" && black $black_flags src tests
-printf_center "MyPy" && mypy --install-types --non-interactive src tests
+printf_center "Ruff" && ruff check $ruff_flags src tests benchmarks
+printf_center "Black" && black $black_flags src tests benchmarks
+printf_center "MyPy" && mypy --install-types --non-interactive src tests benchmarks
 
 RED='\033[0;31m'
 GREEN='\033[0;32m'
@@ -0,0 +1,72 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+from .exc import ConfigurationErr
+
+
+__all__ = [
+    'TTLCache',
+]
+
+
+_KT = TypeVar('_KT', bound=Hashable)
+_VT = TypeVar('_VT')
+
+
+class TTLCache(Generic[_KT, _VT]):
+    """In-process LRU cache, entries expire after ``ttl`` seconds."""
+
+    __slots__ = ('_data', '_timer', 'maxsize', 'ttl')
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 60,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if maxsize <= 0:
+            msg = '"maxsize" must be > 0'
+            raise ConfigurationErr(msg)
+        if ttl <= 0:
+            msg = '"ttl" must be > 0'
+            raise ConfigurationErr(msg)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        # key -> (expiration time, value)
+        self._data: OrderedDict[_KT, tuple[float, _VT]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: _KT) -> _VT | None:
+        if (item := self._data.get(key)) is None:
+            return None
+
+        expires, value = item
+        if expires <= self._timer():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: _KT, value: _VT, ttl: float | None = None) -> None:
+        self._data[key] = (self._timer() + (ttl or self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def expire(self) -> None:
+        """Drop expired entries, ``get`` drops them lazily."""
+        now = self._timer()
+        for key in [k for k, (expires, _) in self._data.items() if expires <= now]:
+            del self._data[key]
+
+    def pop(self, key: _KT) -> _VT | None:
+        item = self._data.pop(key, None)
+        return None if item is None else item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
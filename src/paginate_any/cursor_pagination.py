@@ -1,19 +1,49 @@
 import abc
-import binascii
+import asyncio
 import logging
+import operator
+from bisect import bisect_left, bisect_right
+from collections.abc import (
+    AsyncGenerator,
+    Callable,
+    Generator,
+    Hashable,
+    Iterable,
+    Iterator,
+    Sequence,
+)
+from contextlib import aclosing, closing
+from dataclasses import dataclass, replace
+from functools import lru_cache, partial, total_ordering
 from itertools import islice
-from typing import Any, Generic, Protocol, TypeAlias, TypeVar, final, runtime_checkable
-
-import msgspec
-from pybase64 import urlsafe_b64decode, urlsafe_b64encode
+from operator import attrgetter, itemgetter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Final,
+    Generic,
+    Protocol,
+    TypeAlias,
+    TypeVar,
+    cast,
+    final,
+    runtime_checkable,
+)
 
+from .cache import TTLCache
+from .cursor_codec import CursorCodec, MsgpackCursorCodec
 from .datastruct import (
+    CountMode,
+    CountStrategy,
     CurrentCursor,
     CursorPaginationPage,
+    CursorPaginationWindow,
     CursorRawT,
     CursorValuesT,
     Ordering,
+    PageTotal,
     PointerExpression,
+    TotalRelation,
 )
 from .exc import (
     ConfigurationErr,
@@ -22,6 +52,11 @@ from .exc import (
     PaginationErr,
     SortParamErr,
 )
+from .instrumentation import Instrumentation, Stage
+
+
+if TYPE_CHECKING:
+    from functools import _CacheInfo
 
 
 __all__ = [
@@ -30,8 +65,12 @@ __all__ = [
     'FieldT',
     'RowT',
     'RowsStoreT',
+    'PageRequest',
     'CursorPaginator',
+    'SyncCursorPaginator',
     'InMemoryCursorPaginator',
+    'SyncInMemoryCursorPaginator',
+    'IndexedRowsStore',
 ]
 
 
@@ -56,17 +95,42 @@ class _SupportsGetItem(Protocol[_KT_contra, _VT_co]):
 FieldT = TypeVar('FieldT')
 RowT = TypeVar('RowT', bound=_SupportsGetItem[str, Any] | object)
 RowsStoreT = TypeVar('RowsStoreT')
+_RowKeyFuncT: TypeAlias = Callable[[Any], CursorValuesT]
+
+
+def _get_tuple_fields(row: Any) -> tuple[str, ...] | None:
+    """Return field names of a named tuple like row, None for other rows."""
+    if not isinstance(row, Sequence):
+        return None
+    row_fields = getattr(row, '_fields', None)
+    return row_fields if isinstance(row_fields, tuple) else None
+
+
+@dataclass(frozen=True, slots=True)
+class PageRequest(Generic[RowsStoreT]):
+    """Arguments of ``CursorPaginator.paginate`` for a batch pagination."""
 
+    store: RowsStoreT
+    sort_fields: SortFieldsRawT = None
+    before: CursorRawT = None
+    after: CursorRawT = None
+    size: int | None = None
 
-_cursor_encode = msgspec.msgpack.Encoder().encode
-_cursor_decode = msgspec.msgpack.Decoder(type=CursorValuesT).decode
-_cursor_decode_err = msgspec.DecodeError
 
+class _BaseCursorPaginator(Generic[FieldT, RowsStoreT, RowT], metaclass=abc.ABCMeta):
+    """Cursor, sort params and rows logic shared by async and sync paginators."""
 
-class CursorPaginator(Generic[FieldT, RowsStoreT, RowT], metaclass=abc.ABCMeta):
     __slots__ = (
         '_unq_field',
         '_sort_fields',
+        '_sort_fields_cache',
+        '_row_key_funcs',
+        '_codec',
+        '_strict_cursor',
+        '_count',
+        '_count_cache',
+        '_mixed_ordering',
+        '_instrumentation',
         'default_sort',
         'default_size',
         'max_size',
@@ -83,6 +147,13 @@ class CursorPaginator(Generic[FieldT, RowsStoreT, RowT], metaclass=abc.ABCMeta):
         default_size: int = 20,
         max_size: int | None = 100,
         default_sort: SortFieldsRawT = None,
+        *,
+        sort_cache_size: int = 128,
+        codec: CursorCodec | None = None,
+        strict_cursor: bool = False,
+        count: CountStrategy | None = None,
+        mixed_ordering: bool = False,
+        instrumentation: Instrumentation | None = None,
     ) -> None:
         self._unq_field = unq_field
         self._sort_fields = sort_fields
@@ -105,36 +176,104 @@ class CursorPaginator(Generic[FieldT, RowsStoreT, RowT], metaclass=abc.ABCMeta):
             raise ConfigurationErr(msg)
         self.default_size = default_size
 
-    async def paginate(  # noqa: PLR0913
+        if sort_cache_size < 0:
+            msg = '"sort_cache_size" must be >= 0'
+            raise ConfigurationErr(msg)
+        # Parsed sort params, including invalid ones, keyed by the raw value
+        self._sort_fields_cache = lru_cache(maxsize=sort_cache_size)(
+            self._parse_sort_fields,
+        )
+        self._row_key_funcs: dict[
+            tuple[type[Any], SortFieldsT | None, SortFieldsT],
+            _RowKeyFuncT,
+        ] = {}
+        self._codec = codec or MsgpackCursorCodec()
+        # By default, the cursor row is included into the query (<=, >=)
+        # and "size + 2" rows are fetched. Strict cursor excludes it (<, >),
+        # fetches "size + 1" rows and checks rows behind the cursor with a probe.
+        self._strict_cursor = strict_cursor
+        # By default, a leading "-" sorts all fields in DESC order ("-created,id").
+        # Mixed ordering reads the direction of every field ("-created,id" sorts
+        # "id" in ASC order), the implicit unique field follows the first field.
+        self._mixed_ordering = mixed_ordering
+        # Hooks of "paginate" stages, None - "paginate" skips them at all
+        self._instrumentation = instrumentation
+
+        if count is not None:
+            if not self._supports_count():
+                msg = f'{type(self).__name__} does not support counting'
+                raise ConfigurationErr(msg)
+            if count.cap <= 0:
+                msg = '"cap" of the count strategy must be > 0'
+                raise ConfigurationErr(msg)
+        self._count = count
+        self._count_cache: TTLCache[Hashable, PageTotal] | None = None
+        if count is not None and count.ttl:
+            self._count_cache = TTLCache(count.cache_size, count.ttl)
+
+    @property
+    def sort_cache_info(self) -> '_CacheInfo':
+        """Hits and misses of the parsed sort params cache."""
+        return self._sort_fields_cache.cache_info()
+
+    @property
+    def instrumentation(self) -> Instrumentation | None:
+        return self._instrumentation
+
+    @classmethod
+    def _supports_count(cls) -> bool:
+        """Check a backend overrides ``_count_rows``."""
+        return False
+
+    def _make_page(  # noqa: PLR0913
         self,
-        store: RowsStoreT,
-        sort_fields: SortFieldsRawT = None,
-        before: CursorRawT = None,
-        after: CursorRawT = None,
-        size: int | None = None,
+        cursor: CurrentCursor,
+        rows: list[RowT],
+        has_prev: bool,  # noqa: FBT001
+        has_next: bool,  # noqa: FBT001
+        total: PageTotal | None = None,
     ) -> CursorPaginationPage[RowT]:
-        cursor = self._make_cursor(before, after, sort_fields, size)
-        rows, has_prev, has_next = await self._get_rows(store, cursor)
         return CursorPaginationPage(
             cursor_params=cursor,
             rows=rows,
             prev=self._get_cursor_value(rows[0], cursor) if rows and has_prev else None,
             next=self._get_cursor_value(rows[-1], cursor) if rows and has_next else None,
+            total=total,
         )
 
+    def _get_cached_total(
+        self,
+        store: RowsStoreT,
+    ) -> tuple[Hashable | None, PageTotal | None]:
+        """Return the store fingerprint and its cached total."""
+        cache = self._count_cache
+        if cache is None or (fingerprint := self._store_fingerprint(store)) is None:
+            return None, None
+        return fingerprint, cache.get(fingerprint)
+
+    def _set_cached_total(self, fingerprint: Hashable | None, total: PageTotal) -> None:
+        if fingerprint is not None and self._count_cache is not None:
+            self._count_cache.set(fingerprint, total)
+
     def _get_cursor_value(self, row: RowT, cursor: CurrentCursor) -> str:
-        cursor_values: list[Any] = []
-        for f in cursor.sort_fields:
-            if (value := self._get_field_val(row, f)) is None:
+        cursor_values = self._get_cursor_values(row, cursor)
+        return self._encode_cursor(cursor_values, cursor.sort_fields)
+
+    def _get_cursor_values(self, row: RowT, cursor: CurrentCursor) -> CursorValuesT:
+        cursor_values = self._get_row_key_func(row, cursor.sort_fields)(row)
+        for f, value in zip(cursor.sort_fields, cursor_values, strict=True):
+            if value is None:
                 msg = f'Cursor value must not be None (field: "{f}")'
                 logger.error(msg)
                 raise PaginationErr(msg)
-            cursor_values.append(value)
-        return self._encode_cursor(cursor_values)
+        return cursor_values
 
-    @staticmethod
-    def _encode_cursor(cursor_values: list[Any]) -> str:
-        return urlsafe_b64encode(_cursor_encode(cursor_values)).decode('utf-8')
+    def _encode_cursor(
+        self,
+        cursor_values: CursorValuesT,
+        sort_fields: SortFieldsT,
+    ) -> str:
+        return self._codec.encode(cursor_values, sort_fields)
 
     def _get_field_val(self, row: RowT, field: str) -> Any:
         err: Exception | None
@@ -146,13 +285,62 @@ class CursorPaginator(Generic[FieldT, RowsStoreT, RowT], metaclass=abc.ABCMeta):
         if isinstance(row, _SupportsGetItem):
             try:
                 return row[field]
-            except LookupError as exc:
+            except (LookupError, TypeError) as exc:
+                # TypeError: a tuple row (e.g. SQLAlchemy "Row") indexed by a name
                 err = exc
 
         msg = "Can't get cursor value from row"
         logger.exception(msg, exc_info=err)
         raise PaginationErr(msg) from err
 
+    def _get_row_key(self, row: RowT, sort_fields: SortFieldsT) -> CursorValuesT:
+        return tuple(self._get_field_val(row, f) for f in sort_fields)
+
+    def _get_row_key_func(self, row: RowT, sort_fields: SortFieldsT) -> _RowKeyFuncT:
+        """Return cursor values getter compiled for the row shape."""
+        # Named tuples (e.g. SQLAlchemy "Row") of one type may have different fields
+        row_fields = _get_tuple_fields(row)
+        cache_key = (type(row), row_fields, sort_fields)
+        if (func := self._row_key_funcs.get(cache_key)) is None:
+            if (func := self._compile_row_key_func(row, sort_fields)) is None:
+                return partial(self._get_row_key, sort_fields=sort_fields)
+            self._row_key_funcs[cache_key] = func
+        return func
+
+    def _compile_row_key_func(
+        self,
+        row: RowT,
+        sort_fields: SortFieldsT,
+    ) -> _RowKeyFuncT | None:
+        getter: _RowKeyFuncT
+        row_fields = _get_tuple_fields(row)
+        if row_fields and all(f in row_fields for f in sort_fields):
+            # Read values by position, it's faster than an attribute lookup
+            getter = itemgetter(*(row_fields.index(f) for f in sort_fields))
+        elif all(hasattr(row, f) for f in sort_fields):
+            getter = attrgetter(*sort_fields)
+        elif isinstance(row, _SupportsGetItem) and all(f in row for f in sort_fields):
+            getter = itemgetter(*sort_fields)
+        else:
+            return None
+
+        if len(sort_fields) == 1:
+            single_getter = getter
+
+            def getter(r: Any) -> CursorValuesT:
+                return (single_getter(r),)
+
+        slow_getter = partial(self._get_row_key, sort_fields=sort_fields)
+
+        def get_row_key(r: Any) -> CursorValuesT:
+            try:
+                return getter(r)
+            except (AttributeError, LookupError, TypeError):
+                # Rows with a different shape
+                return slow_getter(r)
+
+        return get_row_key
+
     def _make_cursor(
         self,
         before_raw: CursorRawT,
@@ -160,7 +348,7 @@ class CursorPaginator(Generic[FieldT, RowsStoreT, RowT], metaclass=abc.ABCMeta):
         sort_fields_raw: SortFieldsRawT,
         size: int | None = None,
     ) -> CurrentCursor:
-        sort_fields, direction = self._get_sort_fields(
+        sort_fields, directions = self._get_sort_fields(
             sort_fields_raw or self.default_sort,
         )
         after, before = self._get_after_and_before(before_raw, after_raw, sort_fields)
@@ -176,28 +364,63 @@ class CursorPaginator(Generic[FieldT, RowsStoreT, RowT], metaclass=abc.ABCMeta):
             before=before,
             size=size,
             sort_fields=sort_fields,
-            sort_direction=direction,
+            sort_direction=directions[0],
+            inclusive=not self._strict_cursor,
+            sort_directions=directions if len(set(directions)) > 1 else None,
         )
 
-    def _get_sort_fields(self, fields: SortFieldsRawT) -> tuple[SortFieldsT, Ordering]:
-        if fields:
-            direction = Ordering.get_direction(fields)
-            fields_ = fields.removeprefix('-')
-            sort_fields = fields_.split(',')
+    def _make_cursor_instrumented(  # noqa: PLR0913
+        self,
+        i: Instrumentation,
+        before_raw: CursorRawT,
+        after_raw: CursorRawT,
+        sort_fields_raw: SortFieldsRawT,
+        size: int | None = None,
+    ) -> CurrentCursor:
+        with i.stage(Stage.make_cursor):
+            try:
+                return self._make_cursor(before_raw, after_raw, sort_fields_raw, size)
+            except CursorValueErr as exc:
+                i.on_cursor_err(exc)
+                raise
+
+    def _get_sort_fields(
+        self,
+        fields: SortFieldsRawT,
+    ) -> tuple[SortFieldsT, tuple[Ordering, ...]]:
+        """Return sort fields and the direction of every field."""
+        result = self._sort_fields_cache(fields)
+        if isinstance(result, SortParamErr):
+            raise SortParamErr(title=result.title, detail=result.detail)
+        return result
+
+    def _parse_sort_fields(
+        self,
+        fields: SortFieldsRawT,
+    ) -> tuple[SortFieldsT, tuple[Ordering, ...]] | SortParamErr:
+        directions: list[Ordering]
+        if not fields:
+            directions, sort_fields = [], []
+        elif self._mixed_ordering:
+            split_fields = [Ordering.split_field(f) for f in fields.split(',')]
+            sort_fields = [f for f, _ in split_fields]
+            directions = [d for _, d in split_fields]
         else:
-            direction, sort_fields = Ordering.ASC, []
+            sort_fields = fields.removeprefix('-').split(',')
+            directions = [Ordering.get_direction(fields)] * len(sort_fields)
 
         unq_field = self._unq_field
         if bad_fields := (set(sort_fields) - set(self._sort_fields)):
             msg = f'Remove "{bad_fields}" fields'
-            raise SortParamErr(detail=msg)
+            return SortParamErr(detail=msg)
         if unq_field in sort_fields and sort_fields[-1] != unq_field:
             msg = f'Move "{unq_field}" field to the end'
-            raise SortParamErr(detail=msg)
+            return SortParamErr(detail=msg)
         if unq_field not in sort_fields:
             sort_fields.append(unq_field)
+            directions.append(directions[0] if directions else Ordering.ASC)
 
-        return tuple(sort_fields), direction
+        return tuple(sort_fields), tuple(directions)
 
     def _get_after_and_before(
         self,
@@ -209,9 +432,9 @@ class CursorPaginator(Generic[FieldT, RowsStoreT, RowT], metaclass=abc.ABCMeta):
             raise MultipleCursorsErr()
 
         if after_raw:
-            cursor_values = self._decode_cursor(after_raw)
+            cursor_values = self._decode_cursor(after_raw, sort_fields)
         elif before_raw:
-            cursor_values = self._decode_cursor(before_raw)
+            cursor_values = self._decode_cursor(before_raw, sort_fields)
         else:
             return None, None
 
@@ -219,53 +442,374 @@ class CursorPaginator(Generic[FieldT, RowsStoreT, RowT], metaclass=abc.ABCMeta):
             raise CursorValueErr()
         return (cursor_values, None) if after_raw else (None, cursor_values)
 
+    def _decode_cursor(self, s: str | bytes, sort_fields: SortFieldsT) -> CursorValuesT:
+        return self._codec.decode(s, sort_fields)
+
     @staticmethod
-    def _decode_cursor(s: str | bytes) -> CursorValuesT:
-        try:
-            return _cursor_decode(urlsafe_b64decode(s))
-        except binascii.Error as exc:
-            raise CursorValueErr(detail='Invalid base64 value') from exc
-        except _cursor_decode_err as exc:
-            msg = 'Invalid cursor value'
-            raise CursorValueErr(detail=msg) from exc
+    def _needs_behind_probe(cursor: CurrentCursor, rows: list[RowT]) -> bool:
+        return bool(not cursor.inclusive and cursor.values and rows)
 
-    async def _get_rows(
+    def _trim_rows(
         self,
-        store: RowsStoreT,
+        rows: list[RowT],
         cursor: CurrentCursor,
+        has_behind: bool = False,  # noqa: FBT001, FBT002
     ) -> tuple[list[RowT], bool, bool]:
-        rows = await self._paginate_data(store, cursor)
+        """Cut the page from fetched rows.
 
-        has_prev, has_next = False, False
+        ``has_behind`` - there are rows before the cursor in the query ordering,
+        it's used in the strict mode only, the inclusive mode gets it
+        from the boundary row.
+        """
         if not rows:
-            return rows, has_prev, has_next
-
-        cursor_values = cursor.values
-        if (
-            cursor_values
-            and self._get_field_val(rows[0], self._unq_field) == cursor_values[-1]
-        ):
-            rows.pop(0)
-            if cursor.reverse:
-                has_next = True
-            else:
-                has_prev = True
-
-        if len(rows) > cursor.size:
-            for _ in range(len(rows) - cursor.size):
-                rows.pop()
-
-            if cursor.reverse:
-                has_prev = True
-            else:
-                has_next = True
+            return rows, False, False
+
+        start = 0
+        if cursor.inclusive:
+            has_behind = self._is_cursor_row(rows[0], cursor)
+            start = int(has_behind)
+
+        has_ahead = len(rows) - start > cursor.size
+        if start or has_ahead:
+            rows = rows[start : start + cursor.size]
 
         if cursor.reverse:
             # If we have a reverse data, then the query ordering was in reverse,
             # so we need to reverse the items again before returning them to the user
             rows.reverse()
+            return rows, has_ahead, has_behind
+        return rows, has_behind, has_ahead
+
+    def _is_cursor_row(self, row: RowT, cursor: CurrentCursor) -> bool:
+        """Check the row is the cursor row itself (fetched by the inclusive cursor)."""
+        if not (cursor.inclusive and (cursor_values := cursor.values)):
+            return False
+        return bool(
+            self._get_row_key_func(row, cursor.sort_fields)(row)[-1] == cursor_values[-1],
+        )
+
+    def _make_window_pages(  # noqa: PLR0913
+        self,
+        cursor: CurrentCursor,
+        rows: list[RowT],
+        has_prev: bool,  # noqa: FBT001
+        has_next: bool,  # noqa: FBT001
+        total: PageTotal | None,
+    ) -> list[CursorPaginationPage[RowT]]:
+        """Split trimmed rows of several pages into pages of ``cursor.size``.
 
-        return rows, has_prev, has_next
+        Pages are aligned to the cursor: the first page follows the "after" cursor,
+        the last one precedes the "before" cursor. Every page gets the cursor
+        of its own prev or next link.
+        """
+        size = cursor.size
+        if cursor.reverse:
+            chunks = [
+                rows[max(end - size, 0) : end] for end in range(len(rows), 0, -size)
+            ]
+            chunks.reverse()
+        else:
+            chunks = [rows[start : start + size] for start in range(0, len(rows), size)]
+
+        pages = []
+        last = len(chunks) - 1
+        for i, chunk in enumerate(chunks):
+            page_cursor = cursor
+            if cursor.reverse and i < last:
+                before = self._get_cursor_values(chunks[i + 1][0], cursor)
+                page_cursor = replace(cursor, before=before)
+            elif not cursor.reverse and i > 0:
+                after = self._get_cursor_values(chunks[i - 1][-1], cursor)
+                page_cursor = replace(cursor, after=after)
+            pages.append(
+                self._make_page(
+                    page_cursor,
+                    chunk,
+                    has_prev or i > 0,
+                    has_next or i < last,
+                    total,
+                ),
+            )
+        return pages
+
+    def _store_fingerprint(self, store: RowsStoreT) -> Hashable | None:
+        """Return a key of the store rows to cache a total, None - don't cache."""
+        return None
+
+    def _rows_outlive_store(self, store: RowsStoreT) -> bool:
+        """Check rows of the store can be cached, e.g. aren't bound to a DB session."""
+        return True
+
+
+class CursorPaginator(_BaseCursorPaginator[FieldT, RowsStoreT, RowT]):
+    __slots__ = ()
+
+    @classmethod
+    def _supports_count(cls) -> bool:
+        return cls._count_rows is not CursorPaginator._count_rows
+
+    async def paginate(  # noqa: PLR0913
+        self,
+        store: RowsStoreT,
+        sort_fields: SortFieldsRawT = None,
+        before: CursorRawT = None,
+        after: CursorRawT = None,
+        size: int | None = None,
+    ) -> CursorPaginationPage[RowT]:
+        if (i := self._instrumentation) is not None:
+            return await self._paginate_instrumented(
+                i,
+                store,
+                sort_fields,
+                before,
+                after,
+                size,
+            )
+        cursor = self._make_cursor(before, after, sort_fields, size)
+        return await self._paginate_cursor(store, cursor)
+
+    async def _paginate_instrumented(  # noqa: PLR0913
+        self,
+        i: Instrumentation,
+        store: RowsStoreT,
+        sort_fields: SortFieldsRawT,
+        before: CursorRawT,
+        after: CursorRawT,
+        size: int | None,
+    ) -> CursorPaginationPage[RowT]:
+        """``paginate`` with hooks of the instrumentation."""
+        with i.stage(Stage.paginate):
+            cursor = self._make_cursor_instrumented(i, before, after, sort_fields, size)
+            return await self._paginate_cursor_instrumented(i, store, cursor)
+
+    async def _paginate_cursor_instrumented(
+        self,
+        i: Instrumentation,
+        store: RowsStoreT,
+        cursor: CurrentCursor,
+    ) -> CursorPaginationPage[RowT]:
+        """Stages of ``_paginate_cursor``, inside of the ``paginate`` stage."""
+        with i.stage(Stage.fetch):
+            rows = await self._paginate_data(store, cursor)
+            has_behind = False
+            if self._needs_behind_probe(cursor, rows):
+                has_behind = await self._has_rows_behind(store, cursor)
+        fetched = len(rows)
+        with i.stage(Stage.trim):
+            rows, has_prev, has_next = self._trim_rows(rows, cursor, has_behind)
+        total = None
+        if self._count:
+            with i.stage(Stage.count):
+                total = await self._get_total(store)
+        with i.stage(Stage.encode_cursor):
+            page = self._make_page(cursor, rows, has_prev, has_next, total)
+        i.on_page(cursor, fetched, len(rows))
+        return page
+
+    async def _paginate_cursor(
+        self,
+        store: RowsStoreT,
+        cursor: CurrentCursor,
+    ) -> CursorPaginationPage[RowT]:
+        rows, has_prev, has_next = await self._get_rows(store, cursor)
+        total = await self._get_total(store) if self._count else None
+        return self._make_page(cursor, rows, has_prev, has_next, total)
+
+    async def paginate_many(
+        self,
+        requests: Sequence[PageRequest[RowsStoreT]],
+    ) -> list[CursorPaginationPage[RowT]]:
+        """Paginate several independent stores, data is fetched concurrently."""
+        cursors = [
+            self._make_cursor(r.before, r.after, r.sort_fields, r.size) for r in requests
+        ]
+        queries = [(r.store, c) for r, c in zip(requests, cursors, strict=True)]
+        rows_batch = await self._paginate_data_many(queries)
+
+        probe_indexes = [
+            i
+            for i, (c, rows) in enumerate(zip(cursors, rows_batch, strict=True))
+            if self._needs_behind_probe(c, rows)
+        ]
+        probes = await self._has_rows_behind_many([queries[i] for i in probe_indexes])
+        has_behind = dict(zip(probe_indexes, probes, strict=True))
+        # Counts are mostly cached, and sessions of a backend may not support
+        # concurrent queries, so they're fetched one by one
+        totals = [
+            await self._get_total(r.store) if self._count else None for r in requests
+        ]
+        return [
+            self._make_page(
+                c,
+                *self._trim_rows(rows, c, has_behind.get(i, False)),
+                total=totals[i],
+            )
+            for i, (c, rows) in enumerate(zip(cursors, rows_batch, strict=True))
+        ]
+
+    async def paginate_window(  # noqa: PLR0913
+        self,
+        store: RowsStoreT,
+        sort_fields: SortFieldsRawT = None,
+        before: CursorRawT = None,
+        after: CursorRawT = None,
+        size: int | None = None,
+        *,
+        ahead: int = 1,
+        behind: int = 0,
+    ) -> CursorPaginationWindow[RowT]:
+        """Paginate the page with neighbour pages, e.g. to prefetch an infinite scroll.
+
+        Pages in the query direction of the cursor (ahead of the "after" cursor
+        and the first page, behind of the "before" cursor) are fetched with the page
+        by one query with a larger limit, pages in the other direction
+        need one more query. The pages and their cursors are the same
+        as ``paginate`` returns for the prev and next links.
+        """
+        if ahead < 0 or behind < 0:
+            msg = '"ahead" and "behind" must be >= 0'
+            raise ConfigurationErr(msg)
+
+        cursor = self._make_cursor(before, after, sort_fields, size)
+        forward, backward = (behind, ahead) if cursor.reverse else (ahead, behind)
+        total = await self._get_total(store) if self._count else None
+        rows, has_prev, has_next = await self._get_rows(
+            store,
+            replace(cursor, size=cursor.size * (forward + 1)),
+        )
+        if not rows:
+            return CursorPaginationWindow(
+                current=self._make_page(cursor, rows, has_prev, has_next, total),
+            )
+        pages = self._make_window_pages(cursor, rows, has_prev, has_next, total)
+
+        other_pages: list[CursorPaginationPage[RowT]] = []
+        if backward and (has_next if cursor.reverse else has_prev):
+            # The cursor of the other direction is the edge row of the window
+            edge = self._get_cursor_values(rows[-1 if cursor.reverse else 0], cursor)
+            other = replace(
+                cursor,
+                before=None if cursor.reverse else edge,
+                after=edge if cursor.reverse else None,
+            )
+            other_pages = self._make_window_pages(
+                other,
+                *await self._get_rows(store, replace(other, size=other.size * backward)),
+                total=total,
+            )
+
+        if cursor.reverse:
+            return CursorPaginationWindow(
+                current=pages[-1],
+                behind=pages[:-1],
+                ahead=other_pages,
+            )
+        return CursorPaginationWindow(
+            current=pages[0],
+            behind=other_pages,
+            ahead=pages[1:],
+        )
+
+    async def iterate_pages(
+        self,
+        store: RowsStoreT,
+        sort_fields: SortFieldsRawT = None,
+        size: int | None = None,
+        *,
+        prefetch: bool = False,
+    ) -> AsyncGenerator[list[RowT], None]:
+        """Walk all pages of the store, e.g. for an export.
+
+        The next cursor is made from raw values of the last row,
+        without encoding and decoding of a token, and only one page is kept in memory.
+        ``prefetch`` fetches the next page while the current one is processed,
+        so the store must support concurrent queries
+        (e.g. don't use the session of the store in the loop body).
+        """
+        cursor = self._make_cursor(None, None, sort_fields, size)
+        next_rows: asyncio.Task[list[RowT]] | None = None
+        try:
+            rows = await self._paginate_data(store, cursor)
+            while True:
+                rows, _, has_next = self._trim_rows(rows, cursor)
+                if has_next:
+                    cursor = replace(
+                        cursor,
+                        after=self._get_cursor_values(rows[-1], cursor),
+                    )
+                    if prefetch:
+                        next_rows = asyncio.create_task(
+                            self._paginate_data(store, cursor),
+                        )
+                if rows:
+                    yield rows
+                if not has_next:
+                    return
+                if next_rows is None:
+                    rows = await self._paginate_data(store, cursor)
+                else:
+                    rows, next_rows = await next_rows, None
+        finally:
+            if next_rows is not None:
+                next_rows.cancel()
+
+    async def iterate(
+        self,
+        store: RowsStoreT,
+        sort_fields: SortFieldsRawT = None,
+        size: int | None = None,
+        *,
+        prefetch: bool = False,
+    ) -> AsyncGenerator[RowT, None]:
+        """Walk all rows of the store page by page, see ``iterate_pages``.
+
+        Without ``prefetch`` rows of a page are streamed from the backend
+        (see ``_stream_data``), so a page isn't materialized as a list.
+        """
+        if prefetch:
+            async with aclosing(
+                self.iterate_pages(store, sort_fields, size, prefetch=True),
+            ) as pages:
+                async for rows in pages:
+                    for row in rows:
+                        yield row
+            return
+
+        cursor = self._make_cursor(None, None, sort_fields, size)
+        while True:
+            count, last_row, has_next = 0, None, False
+            async with aclosing(self._stream_data(store, cursor)) as stream:
+                async for row in stream:
+                    if last_row is None and self._is_cursor_row(row, cursor):
+                        # The boundary row of the inclusive cursor
+                        continue
+                    if count == cursor.size:
+                        has_next = True
+                        break
+                    count, last_row = count + 1, row
+                    yield row
+
+            if not has_next or last_row is None:
+                return
+            cursor = replace(cursor, after=self._get_cursor_values(last_row, cursor))
+
+    async def _get_total(self, store: RowsStoreT) -> PageTotal:
+        fingerprint, total = self._get_cached_total(store)
+        if total is None:
+            total = await self._count_rows(store, cast(CountStrategy, self._count))
+            self._set_cached_total(fingerprint, total)
+        return total
+
+    async def _get_rows(
+        self,
+        store: RowsStoreT,
+        cursor: CurrentCursor,
+    ) -> tuple[list[RowT], bool, bool]:
+        rows = await self._paginate_data(store, cursor)
+        has_behind = False
+        if self._needs_behind_probe(cursor, rows):
+            has_behind = await self._has_rows_behind(store, cursor)
+        return self._trim_rows(rows, cursor, has_behind)
 
     @abc.abstractmethod
     async def _paginate_data(
@@ -275,39 +819,479 @@ class CursorPaginator(Generic[FieldT, RowsStoreT, RowT], metaclass=abc.ABCMeta):
     ) -> list[RowT]:
         ...
 
+    async def _stream_data(
+        self,
+        store: RowsStoreT,
+        cursor: CurrentCursor,
+    ) -> AsyncGenerator[RowT, None]:
+        """Yield rows of ``_paginate_data`` one by one.
+
+        Override it in a backend, which can stream rows without loading them all.
+        """
+        for row in await self._paginate_data(store, cursor):
+            yield row
+
+    async def _paginate_data_many(
+        self,
+        queries: Sequence[tuple[RowsStoreT, CurrentCursor]],
+    ) -> list[list[RowT]]:
+        """Fetch data of several pages.
+
+        Override it in a backend, which can fetch a batch more efficiently.
+        """
+        return list(await asyncio.gather(*(self._paginate_data(*q) for q in queries)))
+
+    async def _count_rows(self, store: RowsStoreT, count: CountStrategy) -> PageTotal:
+        """Count rows of the store, override it in a backend to support ``count``."""
+        msg = f'{type(self).__name__} does not support counting'
+        raise ConfigurationErr(msg)
+
+    async def _has_rows_behind(
+        self,
+        store: RowsStoreT,
+        cursor: CurrentCursor,
+    ) -> bool:
+        """Check rows before the cursor in the query ordering (strict mode only).
+
+        A cursor is made from an existing row, so it's True by default,
+        override it in a backend with a cheap probe query.
+        """
+        return True
+
+    async def _has_rows_behind_many(
+        self,
+        queries: Sequence[tuple[RowsStoreT, CurrentCursor]],
+    ) -> list[bool]:
+        return list(await asyncio.gather(*(self._has_rows_behind(*q) for q in queries)))
+
+
+class SyncCursorPaginator(_BaseCursorPaginator[FieldT, RowsStoreT, RowT]):
+    """Paginator for sync code, e.g. workers without an event loop.
+
+    It has the same cursors and sort params as ``CursorPaginator``,
+    but fetches data without coroutines.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def _supports_count(cls) -> bool:
+        return cls._count_rows is not SyncCursorPaginator._count_rows
+
+    def paginate(  # noqa: PLR0913
+        self,
+        store: RowsStoreT,
+        sort_fields: SortFieldsRawT = None,
+        before: CursorRawT = None,
+        after: CursorRawT = None,
+        size: int | None = None,
+    ) -> CursorPaginationPage[RowT]:
+        if (i := self._instrumentation) is not None:
+            return self._paginate_instrumented(i, store, sort_fields, before, after, size)
+        cursor = self._make_cursor(before, after, sort_fields, size)
+        rows, has_prev, has_next = self._get_rows(store, cursor)
+        total = self._get_total(store) if self._count else None
+        return self._make_page(cursor, rows, has_prev, has_next, total)
+
+    def _paginate_instrumented(  # noqa: PLR0913
+        self,
+        i: Instrumentation,
+        store: RowsStoreT,
+        sort_fields: SortFieldsRawT,
+        before: CursorRawT,
+        after: CursorRawT,
+        size: int | None,
+    ) -> CursorPaginationPage[RowT]:
+        """See ``CursorPaginator._paginate_instrumented``."""
+        with i.stage(Stage.paginate):
+            cursor = self._make_cursor_instrumented(i, before, after, sort_fields, size)
+            with i.stage(Stage.fetch):
+                rows = self._paginate_data(store, cursor)
+                has_behind = False
+                if self._needs_behind_probe(cursor, rows):
+                    has_behind = self._has_rows_behind(store, cursor)
+            fetched = len(rows)
+            with i.stage(Stage.trim):
+                rows, has_prev, has_next = self._trim_rows(rows, cursor, has_behind)
+            total = None
+            if self._count:
+                with i.stage(Stage.count):
+                    total = self._get_total(store)
+            with i.stage(Stage.encode_cursor):
+                page = self._make_page(cursor, rows, has_prev, has_next, total)
+            i.on_page(cursor, fetched, len(rows))
+        return page
+
+    def iterate_pages(
+        self,
+        store: RowsStoreT,
+        sort_fields: SortFieldsRawT = None,
+        size: int | None = None,
+    ) -> Generator[list[RowT], None, None]:
+        """Walk all pages of the store, see ``CursorPaginator.iterate_pages``."""
+        cursor = self._make_cursor(None, None, sort_fields, size)
+        while True:
+            rows, _, has_next = self._trim_rows(
+                self._paginate_data(store, cursor),
+                cursor,
+            )
+            if rows:
+                yield rows
+            if not has_next:
+                return
+            cursor = replace(cursor, after=self._get_cursor_values(rows[-1], cursor))
+
+    def iterate(
+        self,
+        store: RowsStoreT,
+        sort_fields: SortFieldsRawT = None,
+        size: int | None = None,
+    ) -> Generator[RowT, None, None]:
+        """Walk all rows of the store, see ``CursorPaginator.iterate``."""
+        cursor = self._make_cursor(None, None, sort_fields, size)
+        while True:
+            count, last_row, has_next = 0, None, False
+            with closing(self._stream_data(store, cursor)) as stream:
+                for row in stream:
+                    if last_row is None and self._is_cursor_row(row, cursor):
+                        # The boundary row of the inclusive cursor
+                        continue
+                    if count == cursor.size:
+                        has_next = True
+                        break
+                    count, last_row = count + 1, row
+                    yield row
+
+            if not has_next or last_row is None:
+                return
+            cursor = replace(cursor, after=self._get_cursor_values(last_row, cursor))
+
+    def _get_total(self, store: RowsStoreT) -> PageTotal:
+        fingerprint, total = self._get_cached_total(store)
+        if total is None:
+            total = self._count_rows(store, cast(CountStrategy, self._count))
+            self._set_cached_total(fingerprint, total)
+        return total
+
+    def _get_rows(
+        self,
+        store: RowsStoreT,
+        cursor: CurrentCursor,
+    ) -> tuple[list[RowT], bool, bool]:
+        rows = self._paginate_data(store, cursor)
+        has_behind = False
+        if self._needs_behind_probe(cursor, rows):
+            has_behind = self._has_rows_behind(store, cursor)
+        return self._trim_rows(rows, cursor, has_behind)
+
+    @abc.abstractmethod
+    def _paginate_data(
+        self,
+        store: RowsStoreT,
+        cursor: CurrentCursor,
+    ) -> list[RowT]:
+        ...
+
+    def _stream_data(
+        self,
+        store: RowsStoreT,
+        cursor: CurrentCursor,
+    ) -> Generator[RowT, None, None]:
+        """Yield rows of ``_paginate_data`` one by one, see ``CursorPaginator``."""
+        yield from self._paginate_data(store, cursor)
+
+    def _count_rows(self, store: RowsStoreT, count: CountStrategy) -> PageTotal:
+        """Count rows of the store, override it in a backend to support ``count``."""
+        msg = f'{type(self).__name__} does not support counting'
+        raise ConfigurationErr(msg)
+
+    def _has_rows_behind(
+        self,
+        store: RowsStoreT,
+        cursor: CurrentCursor,
+    ) -> bool:
+        """Check rows before the cursor in the query ordering (strict mode only)."""
+        return True
+
 
 _T = TypeVar('_T')
 
 
+@total_ordering
+class _Desc:
+    """Wrapper of a value with the reversed comparison."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Desc) and self.value == other.value
+
+    def __lt__(self, other: '_Desc') -> bool:
+        return bool(other.value < self.value)
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+def _sort_key(key: _RowKeyFuncT, flipped: tuple[bool, ...]) -> _RowKeyFuncT:
+    """Make fields sorted against the first one compare in the first field order."""
+    if not flipped:
+        return key
+
+    def mixed_key(row: Any) -> CursorValuesT:
+        return _sort_values(key(row), flipped)
+
+    return mixed_key
+
+
+def _sort_values(values: CursorValuesT, flipped: tuple[bool, ...]) -> CursorValuesT:
+    if not flipped:
+        return values
+    return tuple(_Desc(v) if f else v for v, f in zip(values, flipped, strict=True))
+
+
+class _SortedIndex(Generic[_T]):
+    """Rows sorted in ascending order by their cursor values."""
+
+    __slots__ = ('keys', 'rows', '_key')
+
+    def __init__(self, rows: Iterable[_T], key: Callable[[_T], CursorValuesT]) -> None:
+        pairs = sorted(((key(r), r) for r in rows), key=itemgetter(0))
+        self.keys: list[CursorValuesT] = [k for k, _ in pairs]
+        self.rows: list[_T] = [r for _, r in pairs]
+        self._key = key
+
+    def add(self, row: _T) -> None:
+        k = self._key(row)
+        i = bisect_right(self.keys, k)
+        self.keys.insert(i, k)
+        self.rows.insert(i, row)
+
+    def remove(self, row: _T) -> None:
+        k = self._key(row)
+        lo = bisect_left(self.keys, k)
+        for i in range(lo, bisect_right(self.keys, k, lo=lo)):
+            if self.rows[i] is row:
+                break
+        else:
+            # Cursor values of the row were changed after the insert
+            i = next(i for i, r in enumerate(self.rows) if r is row)
+        del self.keys[i]
+        del self.rows[i]
+
+
+class IndexedRowsStore(Generic[_T]):
+    """Rows with a sorted index for every used sort fields and directions combination.
+
+    Indexes are built lazily on the first request with the sort fields
+    and are reused by the next requests. ``add`` and ``remove`` update every built
+    index with a binary search instead of rebuilding it.
+    Cursor values of a stored row must not be changed in place,
+    remove the row and add it again instead.
+    """
+
+    __slots__ = ('_rows', '_indexes')
+
+    def __init__(self, rows: Iterable[_T] = ()) -> None:
+        self._rows: dict[int, _T] = {id(r): r for r in rows}
+        # (sort fields, flipped fields) -> index
+        self._indexes: dict[tuple[SortFieldsT, tuple[bool, ...]], _SortedIndex[_T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[_T]:
+        return iter(self._rows.values())
+
+    def __contains__(self, row: object) -> bool:
+        return id(row) in self._rows
+
+    def add(self, row: _T) -> None:
+        if row in self:
+            msg = 'Row is already in the store'
+            raise ValueError(msg)
+        self._rows[id(row)] = row
+        for index in self._indexes.values():
+            index.add(row)
+
+    def remove(self, row: _T) -> None:
+        if self._rows.pop(id(row), None) is None:
+            msg = 'Row is not in the store'
+            raise ValueError(msg)
+        for index in self._indexes.values():
+            index.remove(row)
+
+    def _get_index(
+        self,
+        cursor: CurrentCursor,
+        key: Callable[[_T], CursorValuesT],
+    ) -> _SortedIndex[_T]:
+        flipped = cursor.flipped_fields
+        index_key = (cursor.sort_fields, flipped)
+        if (index := self._indexes.get(index_key)) is None:
+            index = _SortedIndex(self._rows.values(), _sort_key(key, flipped))
+            self._indexes[index_key] = index
+        return index
+
+
+def _paginate_index(
+    index: _SortedIndex[_T],
+    cursor: CurrentCursor,
+) -> list[_T]:
+    _, sort_direction = cursor.query_conditions
+    cursor_values, limit = cursor.values, cursor.fetch_size
+    if cursor_values:
+        cursor_values = _sort_values(cursor_values, cursor.flipped_fields)
+    # ASC ordering always goes with ">=" (">") expression and DESC with "<=" ("<")
+    if sort_direction == Ordering.ASC:
+        bisect_start = bisect_left if cursor.inclusive else bisect_right
+        start = bisect_start(index.keys, cursor_values) if cursor_values else 0
+        return index.rows[start : start + limit]
+
+    bisect_end = bisect_right if cursor.inclusive else bisect_left
+    end = bisect_end(index.keys, cursor_values) if cursor_values else len(index.rows)
+    rows = index.rows[max(end - limit, 0) : end]
+    rows.reverse()
+    return rows
+
+
+def _index_has_rows_behind(index: _SortedIndex[_T], cursor: CurrentCursor) -> bool:
+    _, sort_direction = cursor.query_conditions
+    cursor_values = _sort_values(cursor.values or (), cursor.flipped_fields)
+    if sort_direction == Ordering.ASC:
+        return bisect_right(index.keys, cursor_values) > 0
+    return bisect_left(index.keys, cursor_values) < len(index.keys)
+
+
+def _count_in_memory(
+    store: list[_T] | IndexedRowsStore[_T],
+    count: CountStrategy,
+) -> PageTotal:
+    # The exact count is free for in memory rows, estimate returns it too
+    if count.mode == CountMode.capped and len(store) > count.cap:
+        return PageTotal(count.cap, TotalRelation.gte)
+    return PageTotal(len(store))
+
+
+# (expression, inclusive) -> comparison of row and cursor values
+_IN_MEMORY_EXPRESSIONS: Final = {
+    (PointerExpression.lt, True): operator.le,
+    (PointerExpression.lt, False): operator.lt,
+    (PointerExpression.gt, True): operator.ge,
+    (PointerExpression.gt, False): operator.gt,
+}
+
+
+def _paginate_in_memory(
+    p: _BaseCursorPaginator[str, Any, _T],
+    store: list[_T] | IndexedRowsStore[_T],
+    cursor: CurrentCursor,
+) -> list[_T]:
+    if not store:
+        return []
+    get_list_cursor = p._get_row_key_func(next(iter(store)), cursor.sort_fields)
+    if isinstance(store, IndexedRowsStore):
+        index = store._get_index(cursor, get_list_cursor)
+        return _paginate_index(index, cursor)
+
+    flipped = cursor.flipped_fields
+    get_list_cursor = _sort_key(get_list_cursor, flipped)
+    expr, sort_direction = cursor.query_conditions
+    rows_: Iterable[_T] = sorted(
+        store,
+        key=get_list_cursor,
+        reverse=sort_direction == Ordering.DESC,
+    )
+    if cursor_values := cursor.values:
+        cursor_tuple = _sort_values(tuple(cursor_values), flipped)
+        compare = _IN_MEMORY_EXPRESSIONS[expr, cursor.inclusive]
+
+        def expr_func(row: Any) -> bool:
+            return compare(get_list_cursor(row), cursor_tuple)
+
+        rows_ = filter(expr_func, rows_)
+
+    rows = list(islice(rows_, cursor.fetch_size))
+    return rows
+
+
+def _in_memory_has_rows_behind(
+    p: _BaseCursorPaginator[str, Any, _T],
+    store: list[_T] | IndexedRowsStore[_T],
+    cursor: CurrentCursor,
+) -> bool:
+    get_list_cursor = p._get_row_key_func(next(iter(store)), cursor.sort_fields)
+    if isinstance(store, IndexedRowsStore):
+        index = store._get_index(cursor, get_list_cursor)
+        return _index_has_rows_behind(index, cursor)
+
+    flipped = cursor.flipped_fields
+    get_list_cursor = _sort_key(get_list_cursor, flipped)
+
+    expr, _ = cursor.query_conditions
+    # Rows behind the strict cursor include the cursor row itself
+    compare = _IN_MEMORY_EXPRESSIONS[
+        PointerExpression.gt if expr == PointerExpression.lt else PointerExpression.lt,
+        True,
+    ]
+    cursor_tuple = _sort_values(tuple(cursor.values or ()), flipped)
+    return any(compare(get_list_cursor(r), cursor_tuple) for r in store)
+
+
 @final
-class InMemoryCursorPaginator(CursorPaginator[str, list[_T], _T]):
-    """Example of using a cursor with a list of anything in memory."""
+class InMemoryCursorPaginator(CursorPaginator[str, list[_T] | IndexedRowsStore[_T], _T]):
+    """Example of using a cursor with a list of anything in memory.
+
+    Pass ``IndexedRowsStore`` instead of a list to avoid sorting on every request.
+    """
 
     async def _paginate_data(
         self,
-        store: list[_T],
+        store: list[_T] | IndexedRowsStore[_T],
         cursor: CurrentCursor,
     ) -> list[_T]:
-        expr, sort_direction = cursor.query_conditions
+        return _paginate_in_memory(self, store, cursor)
 
-        def get_list_cursor(row: Any) -> tuple[Any, ...]:
-            return tuple(self._get_field_val(row, f) for f in cursor.sort_fields)
+    async def _has_rows_behind(
+        self,
+        store: list[_T] | IndexedRowsStore[_T],
+        cursor: CurrentCursor,
+    ) -> bool:
+        return _in_memory_has_rows_behind(self, store, cursor)
 
-        rows_ = sorted(
-            store,
-            key=get_list_cursor,
-            reverse=sort_direction == Ordering.DESC,
-        )
-        if cursor_values := cursor.values:
-            cursor_tuple = tuple(cursor_values)
+    async def _count_rows(
+        self,
+        store: list[_T] | IndexedRowsStore[_T],
+        count: CountStrategy,
+    ) -> PageTotal:
+        return _count_in_memory(store, count)
 
-            def expr_func(row: Any) -> bool:
-                row_cursor_value = get_list_cursor(row)
-                if expr == PointerExpression.lt:
-                    return row_cursor_value <= cursor_tuple
-                return row_cursor_value >= cursor_tuple
 
-            rows_ = list(filter(expr_func, rows_))
+@final
+class SyncInMemoryCursorPaginator(
+    SyncCursorPaginator[str, list[_T] | IndexedRowsStore[_T], _T],
+):
+    """Sync version of ``InMemoryCursorPaginator``."""
 
-        rows = list(islice(rows_, cursor.size + 2))
-        return rows
+    def _paginate_data(
+        self,
+        store: list[_T] | IndexedRowsStore[_T],
+        cursor: CurrentCursor,
+    ) -> list[_T]:
+        return _paginate_in_memory(self, store, cursor)
+
+    def _has_rows_behind(
+        self,
+        store: list[_T] | IndexedRowsStore[_T],
+        cursor: CurrentCursor,
+    ) -> bool:
+        return _in_memory_has_rows_behind(self, store, cursor)
+
+    def _count_rows(
+        self,
+        store: list[_T] | IndexedRowsStore[_T],
+        count: CountStrategy,
+    ) -> PageTotal:
+        return _count_in_memory(store, count)
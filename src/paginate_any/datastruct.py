@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Generic, TypeAlias, TypeVar
 
@@ -10,7 +10,12 @@ __all__ = [
     'CursorValuesT',
     'CursorRawT',
     'CurrentCursor',
+    'CountMode',
+    'CountStrategy',
+    'TotalRelation',
+    'PageTotal',
     'CursorPaginationPage',
+    'CursorPaginationWindow',
 ]
 
 DictStrAny: TypeAlias = dict[str, Any]
@@ -33,6 +38,11 @@ class Ordering(Enum):
     def get_direction(cls, val: str) -> 'Ordering':
         return cls.DESC if val.startswith('-') else cls.ASC
 
+    @classmethod
+    def split_field(cls, val: str) -> tuple[str, 'Ordering']:
+        """Split a sort field like "-created" into its name and direction."""
+        return val.removeprefix('-'), cls.get_direction(val)
+
 
 CursorValuesT: TypeAlias = tuple[Any, ...]
 CursorRawT: TypeAlias = str | bytes | None
@@ -45,6 +55,29 @@ class CurrentCursor:
     size: int
     sort_fields: tuple[str, ...]
     sort_direction: Ordering
+    # Include the cursor row in the query (<=, >=) or not (<, >)
+    inclusive: bool = True
+    # Direction of every sort field if they're mixed, None - all are "sort_direction".
+    # "sort_direction" is the direction of the first field.
+    sort_directions: tuple[Ordering, ...] | None = None
+
+    @property
+    def fetch_size(self) -> int:
+        """Rows count to fetch, the page itself and boundary rows."""
+        return self.size + 2 if self.inclusive else self.size + 1
+
+    @property
+    def field_directions(self) -> tuple[Ordering, ...]:
+        if self.sort_directions is None:
+            return (self.sort_direction,) * len(self.sort_fields)
+        return self.sort_directions
+
+    @property
+    def flipped_fields(self) -> tuple[bool, ...]:
+        """Fields sorted against the first field, empty if directions aren't mixed."""
+        if self.sort_directions is None:
+            return ()
+        return tuple(d != self.sort_direction for d in self.sort_directions)
 
     @property
     def values(self) -> CursorValuesT | None:
@@ -67,6 +100,46 @@ class CurrentCursor:
         )
         return expression, direction
 
+    @property
+    def query_field_directions(self) -> tuple[Ordering, ...]:
+        """Query ordering of every sort field."""
+        if self.reverse:
+            return tuple(Ordering.reverse(d) for d in self.field_directions)
+        return self.field_directions
+
+
+class CountMode(Enum):
+    # COUNT(*) of all rows
+    exact = 'exact'
+    # Planner estimate (e.g. EXPLAIN), a backend may fall back to the exact count
+    estimate = 'estimate'
+    # Count at most "cap" rows
+    capped = 'capped'
+
+
+@dataclass(frozen=True, slots=True)
+class CountStrategy:
+    mode: CountMode = CountMode.exact
+    cap: int = 1000
+    # Seconds to cache a total per store, None - don't cache
+    ttl: float | None = 60
+    cache_size: int = 1024
+
+
+class TotalRelation(Enum):
+    # Total is equal to value
+    eq = 'eq'
+    # Total is greater than or equal to value (capped count)
+    gte = 'gte'
+    # Total is about value (estimate)
+    approx = 'approx'
+
+
+@dataclass(frozen=True, slots=True)
+class PageTotal:
+    value: int
+    relation: TotalRelation = TotalRelation.eq
+
 
 _T = TypeVar('_T')
 
@@ -77,3 +150,17 @@ class CursorPaginationPage(Generic[_T]):
     rows: list[_T]
     prev: str | None = None
     next: str | None = None
+    total: PageTotal | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class CursorPaginationWindow(Generic[_T]):
+    current: CursorPaginationPage[_T]
+    # Neighbour pages in the display order, "behind" ones end with the page
+    # before the current one, "ahead" ones start with the page after it
+    behind: list[CursorPaginationPage[_T]] = field(default_factory=list)
+    ahead: list[CursorPaginationPage[_T]] = field(default_factory=list)
+
+    @property
+    def pages(self) -> list[CursorPaginationPage[_T]]:
+        return [*self.behind, self.current, *self.ahead]
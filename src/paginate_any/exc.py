@@ -9,6 +9,7 @@ __all__ = [
     'SortParamErr',
     'CursorValueErr',
     'MultipleCursorsErr',
+    'PaginationTimeoutErr',
     'check_module_version',
 ]
 
@@ -49,6 +50,17 @@ class MultipleCursorsErr(CursorParamsErr):
     detail: str = 'Only one cursor can be used in a query'
 
 
+class PaginationTimeoutErr(PaginationErr):
+    """Query isn't finished in time, a client may retry after ``retry_after`` seconds."""
+
+    title: str = 'Pagination timeout'
+
+    def __init__(self, detail: str | None = None, retry_after: int = 1) -> None:
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
 def check_module_version(
     name: str,
     v: str,
@@ -2,13 +2,14 @@ from contextlib import suppress
 from typing import Any, Protocol, TypeVar
 
 import fastapi
+import msgspec.json
 from fastapi import FastAPI, Query, Request
 from fastapi.exceptions import HTTPException
 from pydantic import PositiveInt
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
 from paginate_any.cursor_pagination import CursorPaginator, FieldT, RowsStoreT, RowT
-from paginate_any.exc import check_module_version
+from paginate_any.exc import PaginationTimeoutErr, check_module_version
 from paginate_any.rest_api import (
     Error,
     JsonCursorPagination,
@@ -23,6 +24,7 @@ __all__ = [
     'FastApiCursorPagination',
     'init_paginate_any_fastapi_app',
     'PaginationDependProtocol',
+    'PaginationJSONResponse',
 ]
 
 
@@ -112,6 +114,20 @@ class FastApiCursorPagination(
         return PaginationDepend
 
 
+class PaginationJSONResponse(Response):
+    """JSON response encoding ``PaginationResult`` without ``jsonable_encoder``.
+
+    Return it from an endpoint: ``return PaginationJSONResponse(result)``.
+    """
+
+    media_type = 'application/json'
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, PaginationResult):
+            return content.to_json_bytes()
+        return msgspec.json.encode(content)
+
+
 def fastapi_pagination_exc_handler(
     _: Request,
     exception: FastApiPaginationException,
@@ -122,5 +138,18 @@ def fastapi_pagination_exc_handler(
     )
 
 
+def fastapi_pagination_timeout_handler(
+    _: Request,
+    exception: PaginationTimeoutErr,
+) -> JSONResponse:
+    error = Error(title=exception.title, detail=exception.detail)
+    return JSONResponse(
+        status_code=503,
+        content={'errors': [error.to_dict()]},
+        headers={'Retry-After': str(exception.retry_after)},
+    )
+
+
 def init_paginate_any_fastapi_app(app: FastAPI) -> None:
     app.add_exception_handler(FastApiPaginationException, fastapi_pagination_exc_handler)
+    app.add_exception_handler(PaginationTimeoutErr, fastapi_pagination_timeout_handler)
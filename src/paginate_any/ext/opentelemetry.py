@@ -0,0 +1,53 @@
+from contextlib import AbstractContextManager
+
+from opentelemetry import trace
+from opentelemetry.version import __version__ as otel_version
+
+from paginate_any import __version__
+from paginate_any.datastruct import CurrentCursor
+from paginate_any.exc import CursorValueErr, check_module_version
+from paginate_any.instrumentation import Instrumentation, Stage
+
+
+__all__ = [
+    'OpenTelemetryInstrumentation',
+]
+
+
+check_module_version('opentelemetry-api', otel_version, (1, 20))
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """Span of every pagination stage, e.g. ``paginate_any.fetch``.
+
+    Rows, the page size and page cache hits are attributes
+    of the ``paginate_any.paginate`` span, a cursor error is an event
+    of the ``paginate_any.make_cursor`` span.
+    """
+
+    __slots__ = ('_tracer',)
+
+    def __init__(self, tracer_provider: trace.TracerProvider | None = None) -> None:
+        self._tracer = trace.get_tracer('paginate_any', __version__, tracer_provider)
+
+    def stage(self, stage: Stage) -> AbstractContextManager[object]:
+        return self._tracer.start_as_current_span(f'paginate_any.{stage.value}')
+
+    def on_page(self, cursor: CurrentCursor, fetched: int, returned: int) -> None:
+        trace.get_current_span().set_attributes(
+            {
+                'paginate_any.page.size': cursor.size,
+                'paginate_any.page.sort': ','.join(cursor.sort_fields),
+                'paginate_any.rows.fetched': fetched,
+                'paginate_any.rows.returned': returned,
+            },
+        )
+
+    def on_cursor_err(self, err: CursorValueErr) -> None:
+        trace.get_current_span().add_event(
+            'paginate_any.cursor_error',
+            {'paginate_any.error.detail': err.detail or err.title},
+        )
+
+    def on_page_cache(self, cursor: CurrentCursor, *, hit: bool) -> None:
+        trace.get_current_span().set_attribute('paginate_any.page_cache.hit', hit)
@@ -0,0 +1,87 @@
+from importlib.metadata import version
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram
+
+from paginate_any.datastruct import CurrentCursor
+from paginate_any.exc import CursorValueErr, check_module_version
+from paginate_any.instrumentation import Stage, TimedInstrumentation
+
+
+__all__ = [
+    'PrometheusInstrumentation',
+]
+
+
+check_module_version('prometheus_client', version('prometheus_client'), (0, 16))
+
+_PAGE_SIZE_BUCKETS = (1, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class PrometheusInstrumentation(TimedInstrumentation):
+    """Pagination metrics: stage durations, rows, cursor errors and cache lookups.
+
+    Metric names start with ``prefix``, e.g. ``paginate_any_stage_seconds``.
+    """
+
+    __slots__ = (
+        'stage_seconds',
+        'page_size',
+        'rows_fetched',
+        'rows_returned',
+        'cursor_errors',
+        'page_cache',
+    )
+
+    def __init__(
+        self,
+        prefix: str = 'paginate_any',
+        registry: CollectorRegistry | None = REGISTRY,
+        page_size_buckets: tuple[float, ...] = _PAGE_SIZE_BUCKETS,
+    ) -> None:
+        self.stage_seconds = Histogram(
+            f'{prefix}_stage_seconds',
+            'Duration of pagination stages',
+            ['stage'],
+            registry=registry,
+        )
+        self.page_size = Histogram(
+            f'{prefix}_page_size',
+            'Requested page size',
+            buckets=page_size_buckets,
+            registry=registry,
+        )
+        self.rows_fetched = Counter(
+            f'{prefix}_rows_fetched',
+            'Rows fetched from stores',
+            registry=registry,
+        )
+        self.rows_returned = Counter(
+            f'{prefix}_rows_returned',
+            'Rows returned in pages',
+            registry=registry,
+        )
+        self.cursor_errors = Counter(
+            f'{prefix}_cursor_errors',
+            'Cursor tokens, which can not be decoded',
+            registry=registry,
+        )
+        self.page_cache = Counter(
+            f'{prefix}_page_cache',
+            'Page cache lookups',
+            ['result'],
+            registry=registry,
+        )
+
+    def on_stage(self, stage: Stage, seconds: float) -> None:
+        self.stage_seconds.labels(stage.value).observe(seconds)
+
+    def on_page(self, cursor: CurrentCursor, fetched: int, returned: int) -> None:
+        self.page_size.observe(cursor.size)
+        self.rows_fetched.inc(fetched)
+        self.rows_returned.inc(returned)
+
+    def on_cursor_err(self, err: CursorValueErr) -> None:
+        self.cursor_errors.inc()
+
+    def on_page_cache(self, cursor: CurrentCursor, *, hit: bool) -> None:
+        self.page_cache.labels('hit' if hit else 'miss').inc()
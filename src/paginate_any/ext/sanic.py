@@ -4,18 +4,24 @@ import sanic
 from sanic import Sanic
 from sanic.exceptions import SanicException
 from sanic.request import Request
-from sanic.response import HTTPResponse, json
+from sanic.response import HTTPResponse, json, raw
 
 from paginate_any.cursor_pagination import FieldT, RowsStoreT, RowT
 from paginate_any.datastruct import DictStrAny
-from paginate_any.exc import check_module_version
-from paginate_any.rest_api import Error, JsonCursorPagination, UrlParts
+from paginate_any.exc import PaginationTimeoutErr, check_module_version
+from paginate_any.rest_api import (
+    Error,
+    JsonCursorPagination,
+    PaginationResult,
+    UrlParts,
+)
 
 
 __all__ = [
     'SanicPaginationException',
     'SanicJsonCursorPagination',
     'init_paginate_any_sanic_app',
+    'pagination_json',
 ]
 
 
@@ -69,6 +75,20 @@ class SanicJsonCursorPagination(
         raise SanicPaginationException(errors)
 
 
+def pagination_json(
+    result: PaginationResult[Any],
+    status: int = 200,
+    headers: dict[str, str] | None = None,
+) -> HTTPResponse:
+    """Return JSON response with ``PaginationResult`` encoded by msgspec."""
+    return raw(
+        result.to_json_bytes(),
+        status=status,
+        headers=headers,
+        content_type='application/json',
+    )
+
+
 def sanic_pagination_exc_handler(
     _: Request[Any, Any],
     exception: SanicPaginationException,
@@ -79,5 +99,18 @@ def sanic_pagination_exc_handler(
     )
 
 
+def sanic_pagination_timeout_handler(
+    _: Request[Any, Any],
+    exception: PaginationTimeoutErr,
+) -> HTTPResponse:
+    error = Error(title=exception.title, detail=exception.detail)
+    return json(
+        {'errors': [error.to_dict()]},
+        status=503,
+        headers={'Retry-After': str(exception.retry_after)},
+    )
+
+
 def init_paginate_any_sanic_app(app: Sanic[Any, Any]) -> None:
     app.error_handler.add(SanicPaginationException, sanic_pagination_exc_handler)
+    app.error_handler.add(PaginationTimeoutErr, sanic_pagination_timeout_handler)
@@ -1,24 +1,81 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+import asyncio
+import json
+import time
+from collections import deque
+from contextlib import closing
+from dataclasses import dataclass
+from enum import Enum
+from functools import partial
+from typing import TYPE_CHECKING, Any, Final, Generic, cast
 
 import sqlalchemy
-from sqlalchemy import Column, ColumnElement, Select, tuple_
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    Row,
+    Select,
+    and_,
+    func,
+    or_,
+    select,
+    true,
+    tuple_,
+)
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
-from paginate_any.cursor_pagination import CursorPaginator, RowT
-from paginate_any.datastruct import CurrentCursor, Ordering, PointerExpression
-from paginate_any.exc import check_module_version
+from paginate_any.cursor_pagination import CursorPaginator, RowT, SyncCursorPaginator
+from paginate_any.datastruct import (
+    CountMode,
+    CountStrategy,
+    CurrentCursor,
+    Ordering,
+    PageTotal,
+    PointerExpression,
+    TotalRelation,
+)
+from paginate_any.exc import (
+    ConfigurationErr,
+    PaginationTimeoutErr,
+    check_module_version,
+)
 
 
 if TYPE_CHECKING:
-    from typing import TypeAlias
+    from collections.abc import (
+        AsyncGenerator,
+        Awaitable,
+        Callable,
+        Generator,
+        Hashable,
+        Sequence,
+    )
+    from typing import TypeAlias, TypeVar
+
+    from sqlalchemy import Dialect
+    from sqlalchemy.sql.compiler import SQLCompiler
+
+    from paginate_any.limiter import QueryLimiter
+
+    from .sqlalchemy_routing import SessionRouter
+
+    _R = TypeVar('_R')
 
 
 __all__ = [
     'SQLAlchemyStoreT',
+    'SyncSQLAlchemyStoreT',
     'ColumnT',
+    'KeysetPredicate',
+    'SlowPage',
+    'SlowPageDetector',
     'SQLAlchemyCursorPaginator',
+    'SyncSQLAlchemyCursorPaginator',
 ]
 
 
@@ -26,38 +83,719 @@ check_module_version('sqlalchemy', sqlalchemy.__version__, (2, 0), (3, 0))
 
 
 SQLAlchemyStoreT: TypeAlias = tuple[AsyncSession, Select[Any]]
+SyncSQLAlchemyStoreT: TypeAlias = tuple[Session, Select[Any]]
 ColumnT: TypeAlias = Column[Any]
 
 
-class SQLAlchemyCursorPaginator(CursorPaginator[ColumnT, SQLAlchemyStoreT, RowT]):
-    async def _paginate_data(
+class KeysetPredicate(Enum):
+    # Row values for dialects which seek an index with them, expanded for others
+    auto = 'auto'
+    # Row value comparison: (a, b) > (x, y)
+    row_value = 'row_value'
+    # Expanded comparison: a >= x AND (a > x OR a = x AND b > y)
+    expanded = 'expanded'
+
+
+# Dialects which turn a row value comparison into an index range scan
+_ROW_VALUE_DIALECTS: Final = frozenset({'postgresql', 'sqlite'})
+_MYSQL_QUERY_TIMEOUT: Final = 3024
+
+
+@dataclass(frozen=True, slots=True)
+class SlowPage:
+    # Page query with the keyset predicate and the ordering
+    sql: str
+    params: dict[str, Any]
+    cursor: CurrentCursor
+    rows: int
+    seconds: float
+    # Exception type of a failed query, e.g. "CancelledError" of the limiter timeout
+    error: str | None = None
+
+
+class SlowPageDetector:
+    """Ring buffer of the last ``maxlen`` page queries slower than ``threshold``.
+
+    Pass it to a paginator as ``slow_pages`` to find sort params and cursors
+    of slow pages (e.g. deep pages of a sort without an index) without the SQL echo
+    of the engine. ``on_slow`` is called with every record, e.g. to log it.
+    """
+
+    __slots__ = ('threshold', '_records', '_on_slow')
+
+    def __init__(
         self,
-        store: SQLAlchemyStoreT,
+        threshold: float = 0.5,
+        maxlen: int = 100,
+        on_slow: Callable[[SlowPage], None] | None = None,
+    ) -> None:
+        if threshold < 0:
+            msg = '"threshold" must be >= 0'
+            raise ConfigurationErr(msg)
+        if maxlen <= 0:
+            msg = '"maxlen" must be > 0'
+            raise ConfigurationErr(msg)
+        self.threshold = threshold
+        self._records: deque[SlowPage] = deque(maxlen=maxlen)
+        self._on_slow = on_slow
+
+    @property
+    def records(self) -> list[SlowPage]:
+        """Records from the oldest to the newest one."""
+        return list(self._records)
+
+    def clear(self) -> None:
+        self._records.clear()
+
+    def add(self, record: SlowPage) -> None:
+        self._records.append(record)
+        if self._on_slow is not None:
+            self._on_slow(record)
+
+
+class _SQLAlchemyStatements(Generic[RowT]):
+    """Statements of pages, probes and counts shared by async and sync paginators."""
+
+    __slots__ = ()
+
+    _sort_fields: dict[str, Any]
+    _predicate: KeysetPredicate
+    _yield_per: int | None
+    _row_factory: Callable[..., RowT] | None
+    _slow_pages: SlowPageDetector | None
+
+    @property
+    def _statement_timeout(self) -> float | None:
+        """Server-side timeout of page queries in seconds, None - no timeout."""
+        return None
+
+    def _make_rows(self, rows: Sequence[Row[Any]]) -> list[RowT]:
+        if (row_factory := self._row_factory) is None:
+            return cast(list[RowT], rows)
+        return [row_factory(*r) for r in rows]
+
+    def _make_row(self, row: Row[Any]) -> RowT:
+        if (row_factory := self._row_factory) is None:
+            return cast(RowT, row)
+        return row_factory(*row)
+
+    def _make_page_stmt(
+        self,
+        stmt: Select[Any],
         cursor: CurrentCursor,
-    ) -> list[RowT]:
-        session, stmt = store
+        dialect_name: str,
+    ) -> Select[Any]:
         if cursor.values:
-            stmt = stmt.where(self._make_sql_cursor(cursor))
+            stmt = stmt.where(self._make_sql_cursor(cursor, dialect_name))
 
         order_by_fields = self._order_by_fields(cursor)
-        stmt = stmt.order_by(None).order_by(*order_by_fields).limit(cursor.size + 2)
-        result = await session.scalars(stmt)
-        return list(result.all())
+        stmt = stmt.order_by(None).order_by(*order_by_fields).limit(cursor.fetch_size)
+        if (timeout := self._statement_timeout) is not None and dialect_name == 'mysql':
+            # Optimizer hint of the SELECT, MariaDB ignores it
+            stmt = stmt.prefix_with(f'/*+ MAX_EXECUTION_TIME({_to_ms(timeout)}) */')
+        if self._yield_per:
+            stmt = stmt.execution_options(yield_per=self._yield_per)
+        return stmt
+
+    def _check_slow_page(  # noqa: PLR0913
+        self,
+        store: tuple[Any, Select[Any]],
+        cursor: CurrentCursor,
+        rows: int,
+        seconds: float,
+        error: BaseException | None = None,
+    ) -> None:
+        if (detector := self._slow_pages) is None or seconds < detector.threshold:
+            return
+        session, stmt = store
+        dialect = _get_dialect(session, stmt)
+        compiled = self._make_page_stmt(stmt, cursor, dialect.name).compile(
+            dialect=dialect,
+        )
+        detector.add(
+            SlowPage(
+                str(compiled),
+                dict(compiled.params),
+                cursor,
+                rows,
+                seconds,
+                None if error is None else type(error).__name__,
+            ),
+        )
+
+    def _make_behind_stmt(
+        self,
+        stmt: Select[Any],
+        cursor: CurrentCursor,
+        dialect_name: str,
+    ) -> Select[tuple[bool]]:
+        probe = stmt.where(
+            self._make_sql_cursor(cursor, dialect_name, behind=True),
+        ).order_by(None)
+        return select(probe.exists())
+
+    @staticmethod
+    def _make_count_stmt(stmt: Select[Any], count: CountStrategy) -> Select[tuple[int]]:
+        stmt = stmt.order_by(None)
+        if count.mode == CountMode.capped:
+            stmt = stmt.limit(count.cap + 1)
+        return select(func.count()).select_from(stmt.subquery())
+
+    @staticmethod
+    def _make_total(value: int, count: CountStrategy) -> PageTotal:
+        if count.mode == CountMode.capped and value > count.cap:
+            return PageTotal(count.cap, TotalRelation.gte)
+        return PageTotal(value)
+
+    @staticmethod
+    def _make_estimate_stmt(stmt: Select[Any], dialect: Dialect) -> _Explain | None:
+        """Return a statement of a planner estimate, None if the dialect isn't supported."""
+        if dialect.name != 'postgresql':
+            return None
+        return _Explain(stmt.order_by(None), 'EXPLAIN (FORMAT JSON)')
+
+    @staticmethod
+    def _parse_estimate(plan: Any) -> PageTotal:
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return PageTotal(int(plan[0]['Plan']['Plan Rows']), TotalRelation.approx)
+
+    def _store_fingerprint(self, store: tuple[Any, Select[Any]]) -> Hashable | None:
+        session, stmt = store
+        bind = session.get_bind(clause=stmt)
+        compiled = stmt.compile(dialect=bind.dialect)
+        # The same query of different databases has different rows
+        url = bind.engine.url.render_as_string(hide_password=True)
+        return url, str(compiled), repr(sorted(compiled.params.items()))
+
+    def _rows_outlive_store(self, store: tuple[Any, Select[Any]]) -> bool:
+        # ORM entities are bound to the session (expired on commit, detached on close)
+        return not _selects_entity(store[1])
 
-    def _make_sql_cursor(self, cursor: CurrentCursor) -> ColumnElement[bool]:
+    def _make_sql_cursor(
+        self,
+        cursor: CurrentCursor,
+        dialect_name: str,
+        *,
+        behind: bool = False,
+    ) -> ColumnElement[bool]:
+        """Make a condition of rows after the cursor (or behind it with ``behind``)."""
         expr, _ = cursor.query_conditions
-        fields_tuple = tuple_(*(self._sort_fields[f] for f in cursor.sort_fields))
-        values_tuple = tuple_(*(cursor.values or ()))
-        if expr == PointerExpression.lt:
-            q = fields_tuple <= values_tuple
+        inclusive = cursor.inclusive
+        if behind:
+            # Rows behind the cursor, including the cursor row itself
+            is_lt, inclusive = expr != PointerExpression.lt, True
         else:
-            q = fields_tuple >= values_tuple
-        return q
+            is_lt = expr == PointerExpression.lt
+
+        fields = [self._sort_fields[f] for f in cursor.sort_fields]
+        values = cursor.values or ()
+        # Fields sorted against the first one are compared the other way
+        lt_flags = [is_lt != f for f in cursor.flipped_fields] or [is_lt] * len(fields)
+        if self._use_row_value(dialect_name, lt_flags):
+            return _row_value_predicate(fields, values, is_lt=is_lt, inclusive=inclusive)
+        return _expanded_predicate(fields, values, lt_flags, inclusive=inclusive)
+
+    def _use_row_value(self, dialect_name: str, lt_flags: Sequence[bool]) -> bool:
+        if len(set(lt_flags)) > 1:
+            # Mixed directions can't be compared as a row value
+            return False
+        if self._predicate == KeysetPredicate.auto:
+            return dialect_name in _ROW_VALUE_DIALECTS
+        return self._predicate == KeysetPredicate.row_value
 
     def _order_by_fields(self, cursor: CurrentCursor) -> list[ColumnElement[Any]]:
-        is_asc = cursor.query_conditions[1] == Ordering.ASC
         fields = []
-        for f in cursor.sort_fields:
+        for f, direction in zip(
+            cursor.sort_fields,
+            cursor.query_field_directions,
+            strict=True,
+        ):
             col = self._sort_fields[f]
-            fields.append(col if is_asc else col.desc())
+            fields.append(col if direction == Ordering.ASC else col.desc())
         return fields
+
+
+class SQLAlchemyCursorPaginator(
+    _SQLAlchemyStatements[RowT],
+    CursorPaginator[ColumnT, SQLAlchemyStoreT, RowT],
+):
+    """Paginate a ``Select`` of an ORM entity or a column projection.
+
+    A select with an entity in the first column returns ORM objects
+    (extra columns are dropped, like ``Session.scalars`` does).
+    A projection (e.g. ``select(A.id, A.name)``) skips the ORM hydration and returns
+    ``Row`` tuples, or objects made by ``row_factory`` called with the column values
+    (e.g. a msgspec ``Struct``).
+    Columns of the sort fields must be selected with the sort field names as labels.
+    ``limiter`` limits concurrency and duration of page, probe and count queries
+    (streaming of ``iterate`` isn't limited). Its timeout also stops page queries
+    on the server: ``statement_timeout`` on PostgreSQL (one more query before
+    and after a page) and ``MAX_EXECUTION_TIME`` on MySQL, other dialects
+    may keep running a cancelled query.
+    ``router`` sends page queries to read replicas, see ``SessionRouter``.
+
+    ``paginate_many`` can't run queries of one session concurrently, so requests
+    of the same session are sequential. Pass ``batch_session`` (e.g.
+    an ``async_sessionmaker``) to run every request in its own pooled session
+    concurrently, they don't see uncommitted changes of the store sessions.
+    """
+
+    __slots__ = (
+        '_predicate',
+        '_yield_per',
+        '_row_factory',
+        '_slow_pages',
+        '_limiter',
+        '_router',
+        '_batch_session',
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *args: Any,
+        predicate: KeysetPredicate = KeysetPredicate.auto,
+        yield_per: int | None = None,
+        row_factory: Callable[..., RowT] | None = None,
+        slow_pages: SlowPageDetector | None = None,
+        limiter: QueryLimiter | None = None,
+        router: SessionRouter | None = None,
+        batch_session: Callable[[], AsyncSession] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self._predicate = predicate
+        self._yield_per = _check_yield_per(yield_per)
+        self._row_factory = row_factory
+        self._slow_pages = slow_pages
+        self._limiter = limiter
+        self._router = router
+        self._batch_session = batch_session
+
+    @property
+    def _statement_timeout(self) -> float | None:
+        return None if self._limiter is None else self._limiter.timeout
+
+    async def _paginate_data(
+        self,
+        store: SQLAlchemyStoreT,
+        cursor: CurrentCursor,
+    ) -> list[RowT]:
+        return await self._run_query(self._fetch_page, store, cursor)
+
+    async def _fetch_page(
+        self,
+        store: SQLAlchemyStoreT,
+        cursor: CurrentCursor,
+    ) -> list[RowT]:
+        if self._slow_pages is None:
+            return await self._route_page(store, cursor)
+        start = time.perf_counter()
+        try:
+            rows = await self._route_page(store, cursor)
+        except BaseException as exc:
+            # Timed out and failed pages are the slowest ones
+            self._check_slow_page(store, cursor, 0, time.perf_counter() - start, exc)
+            raise
+        self._check_slow_page(store, cursor, len(rows), time.perf_counter() - start)
+        return rows
+
+    async def _route_page(
+        self,
+        store: SQLAlchemyStoreT,
+        cursor: CurrentCursor,
+    ) -> list[RowT]:
+        if self._router is None:
+            return await self._query_page(store, cursor)
+        session, stmt = store
+        return await self._router.run(
+            session,
+            lambda s: self._query_page((s, stmt), cursor),
+        )
+
+    async def _query_page(
+        self,
+        store: SQLAlchemyStoreT,
+        cursor: CurrentCursor,
+    ) -> list[RowT]:
+        session, stmt = store
+        timeout = self._statement_timeout
+        if timeout is None or _get_dialect(session, stmt).name != 'postgresql':
+            return await self._execute_page(store, cursor)
+
+        # Transaction-local timeout, the previous value is restored after the page
+        bind_arguments = {'clause': stmt}
+        previous, _ = (
+            await session.execute(
+                _pg_set_timeout_stmt(timeout),
+                bind_arguments=bind_arguments,
+            )
+        ).one()
+        aborted = False
+        try:
+            return await self._execute_page(store, cursor)
+        except (DBAPIError, asyncio.CancelledError):
+            # A failed or cancelled query aborts the transaction, it rejects
+            # other statements until the rollback, which drops the value anyway
+            aborted = True
+            raise
+        finally:
+            if not aborted:
+                await session.execute(
+                    select(func.set_config('statement_timeout', previous, true())),
+                    bind_arguments=bind_arguments,
+                )
+
+    async def _execute_page(
+        self,
+        store: SQLAlchemyStoreT,
+        cursor: CurrentCursor,
+    ) -> list[RowT]:
+        if self._yield_per:
+            return [row async for row in self._stream_data(store, cursor)]
+
+        session, stmt = store
+        page_stmt = self._make_page_stmt(stmt, cursor, _get_dialect(session, stmt).name)
+        if _selects_entity(stmt):
+            return list((await session.scalars(page_stmt)).all())
+        return self._make_rows((await session.execute(page_stmt)).all())
+
+    async def _stream_data(
+        self,
+        store: SQLAlchemyStoreT,
+        cursor: CurrentCursor,
+    ) -> AsyncGenerator[RowT, None]:
+        if not self._yield_per:
+            async for row in super()._stream_data(store, cursor):
+                yield row
+            return
+
+        session, stmt = store
+        page_stmt = self._make_page_stmt(stmt, cursor, _get_dialect(session, stmt).name)
+        if _selects_entity(stmt):
+            scalars = await session.stream_scalars(page_stmt)
+            try:
+                async for row in scalars:
+                    yield row
+            finally:
+                await scalars.close()
+            return
+
+        result = await session.stream(page_stmt)
+        try:
+            async for r in result:
+                yield self._make_row(r)
+        finally:
+            await result.close()
+
+    async def _has_rows_behind(
+        self,
+        store: SQLAlchemyStoreT,
+        cursor: CurrentCursor,
+    ) -> bool:
+        session, stmt = store
+        dialect_name = _get_dialect(session, stmt).name
+        return bool(
+            await self._run_query(
+                session.scalar,
+                self._make_behind_stmt(stmt, cursor, dialect_name),
+            ),
+        )
+
+    async def _count_rows(
+        self,
+        store: SQLAlchemyStoreT,
+        count: CountStrategy,
+    ) -> PageTotal:
+        session, stmt = store
+        if (
+            count.mode == CountMode.estimate
+            and (
+                estimate_stmt := self._make_estimate_stmt(
+                    stmt,
+                    _get_dialect(session, stmt),
+                )
+            )
+            is not None
+        ):
+            # EXPLAIN can't resolve binds of a session bound per mapper
+            scalar = partial(session.scalar, bind_arguments={'clause': stmt})
+            return self._parse_estimate(await self._run_query(scalar, estimate_stmt))
+
+        count_stmt = self._make_count_stmt(stmt, count)
+        value = await self._run_query(session.scalar, count_stmt) or 0
+        return self._make_total(value, count)
+
+    async def _paginate_data_many(
+        self,
+        queries: Sequence[tuple[SQLAlchemyStoreT, CurrentCursor]],
+    ) -> list[list[RowT]]:
+        return await self._run_many(queries, self._paginate_data)
+
+    async def _has_rows_behind_many(
+        self,
+        queries: Sequence[tuple[SQLAlchemyStoreT, CurrentCursor]],
+    ) -> list[bool]:
+        return await self._run_many(queries, self._has_rows_behind)
+
+    async def _run_query(self, func: Callable[..., Awaitable[_R]], *args: Any) -> _R:
+        if (limiter := self._limiter) is None:
+            return await func(*args)
+        try:
+            return await limiter.run(func, *args)
+        except DBAPIError as exc:
+            if limiter.timeout is None or not _is_statement_timeout(exc):
+                raise
+            msg = f'Query is not finished in {limiter.timeout} seconds'
+            raise PaginationTimeoutErr(msg, limiter.retry_after) from exc
+
+    async def _run_many(
+        self,
+        queries: Sequence[tuple[SQLAlchemyStoreT, CurrentCursor]],
+        func: Callable[[SQLAlchemyStoreT, CurrentCursor], Awaitable[_R]],
+    ) -> list[_R]:
+        if (make_session := self._batch_session) is None:
+            return await self._run_per_session(queries, func)
+
+        async def run(stmt: Select[Any], cursor: CurrentCursor) -> _R:
+            async with make_session() as session:
+                return await func((session, stmt), cursor)
+
+        return list(
+            await asyncio.gather(*(run(stmt, cursor) for (_, stmt), cursor in queries)),
+        )
+
+    @staticmethod
+    async def _run_per_session(
+        queries: Sequence[tuple[SQLAlchemyStoreT, CurrentCursor]],
+        func: Callable[[SQLAlchemyStoreT, CurrentCursor], Awaitable[_R]],
+    ) -> list[_R]:
+        # A session can't run queries concurrently, so queries of the same session
+        # are sequential and different sessions (connections) are concurrent.
+        by_session: dict[AsyncSession, list[int]] = {}
+        for i, ((session, _), _) in enumerate(queries):
+            by_session.setdefault(session, []).append(i)
+
+        results: dict[int, _R] = {}
+
+        async def run(indexes: list[int]) -> None:
+            for i in indexes:
+                results[i] = await func(*queries[i])
+
+        await asyncio.gather(*(run(indexes) for indexes in by_session.values()))
+        return [results[i] for i in range(len(queries))]
+
+
+class SyncSQLAlchemyCursorPaginator(
+    _SQLAlchemyStatements[RowT],
+    SyncCursorPaginator[ColumnT, SyncSQLAlchemyStoreT, RowT],
+):
+    """Sync version of ``SQLAlchemyCursorPaginator`` over ``Session``."""
+
+    __slots__ = ('_predicate', '_yield_per', '_row_factory', '_slow_pages')
+
+    def __init__(
+        self,
+        *args: Any,
+        predicate: KeysetPredicate = KeysetPredicate.auto,
+        yield_per: int | None = None,
+        row_factory: Callable[..., RowT] | None = None,
+        slow_pages: SlowPageDetector | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self._predicate = predicate
+        self._yield_per = _check_yield_per(yield_per)
+        self._row_factory = row_factory
+        self._slow_pages = slow_pages
+
+    def _paginate_data(
+        self,
+        store: SyncSQLAlchemyStoreT,
+        cursor: CurrentCursor,
+    ) -> list[RowT]:
+        if self._slow_pages is None:
+            return self._query_page(store, cursor)
+        start = time.perf_counter()
+        try:
+            rows = self._query_page(store, cursor)
+        except BaseException as exc:
+            self._check_slow_page(store, cursor, 0, time.perf_counter() - start, exc)
+            raise
+        self._check_slow_page(store, cursor, len(rows), time.perf_counter() - start)
+        return rows
+
+    def _query_page(
+        self,
+        store: SyncSQLAlchemyStoreT,
+        cursor: CurrentCursor,
+    ) -> list[RowT]:
+        if self._yield_per:
+            return list(self._stream_data(store, cursor))
+
+        session, stmt = store
+        page_stmt = self._make_page_stmt(stmt, cursor, _get_dialect(session, stmt).name)
+        if _selects_entity(stmt):
+            return list(session.scalars(page_stmt).all())
+        return self._make_rows(session.execute(page_stmt).all())
+
+    def _stream_data(
+        self,
+        store: SyncSQLAlchemyStoreT,
+        cursor: CurrentCursor,
+    ) -> Generator[RowT, None, None]:
+        if not self._yield_per:
+            yield from super()._stream_data(store, cursor)
+            return
+
+        session, stmt = store
+        page_stmt = self._make_page_stmt(stmt, cursor, _get_dialect(session, stmt).name)
+        if _selects_entity(stmt):
+            with closing(session.scalars(page_stmt)) as scalars:
+                yield from scalars
+            return
+
+        with closing(session.execute(page_stmt)) as result:
+            for r in result:
+                yield self._make_row(r)
+
+    def _has_rows_behind(
+        self,
+        store: SyncSQLAlchemyStoreT,
+        cursor: CurrentCursor,
+    ) -> bool:
+        session, stmt = store
+        dialect_name = _get_dialect(session, stmt).name
+        return bool(session.scalar(self._make_behind_stmt(stmt, cursor, dialect_name)))
+
+    def _count_rows(
+        self,
+        store: SyncSQLAlchemyStoreT,
+        count: CountStrategy,
+    ) -> PageTotal:
+        session, stmt = store
+        if (
+            count.mode == CountMode.estimate
+            and (
+                estimate_stmt := self._make_estimate_stmt(
+                    stmt,
+                    _get_dialect(session, stmt),
+                )
+            )
+            is not None
+        ):
+            return self._parse_estimate(
+                session.scalar(estimate_stmt, bind_arguments={'clause': stmt}),
+            )
+
+        value = session.scalar(self._make_count_stmt(stmt, count)) or 0
+        return self._make_total(value, count)
+
+
+def _check_yield_per(yield_per: int | None) -> int | None:
+    # Stream rows with a server-side cursor and build ORM objects
+    # by batches of "yield_per" rows, instead of buffering the whole result
+    if yield_per is not None and yield_per <= 0:
+        msg = '"yield_per" must be > 0'
+        raise ConfigurationErr(msg)
+    return yield_per
+
+
+def _to_ms(seconds: float) -> int:
+    return max(int(seconds * 1000), 1)
+
+
+def _pg_set_timeout_stmt(timeout: float) -> Select[tuple[str, str]]:
+    """Return the current ``statement_timeout`` and set the new one locally."""
+    # "OFFSET 0" keeps the subquery from flattening, so it's read before the change
+    current = (
+        select(func.current_setting('statement_timeout').label('value'))
+        .offset(0)
+        .subquery()
+    )
+    return select(
+        current.c.value,
+        func.set_config('statement_timeout', str(_to_ms(timeout)), true()),
+    )
+
+
+def _is_statement_timeout(exc: DBAPIError) -> bool:
+    orig = exc.orig
+    # PostgreSQL "query_canceled" SQLSTATE (psycopg, asyncpg) and MySQL error 3024
+    if '57014' in (getattr(orig, 'sqlstate', None), getattr(orig, 'pgcode', None)):
+        return True
+    return bool(orig is not None and orig.args and orig.args[0] == _MYSQL_QUERY_TIMEOUT)
+
+
+def _get_dialect(session: AsyncSession | Session, stmt: Select[Any]) -> Dialect:
+    # The statement resolves binds of a session bound per mapper or table
+    return session.get_bind(clause=stmt).dialect
+
+
+def _selects_entity(stmt: Select[Any]) -> bool:
+    """Check the first column of the statement is an ORM entity, not a projection.
+
+    Like ``Session.scalars``, entities of the first column are returned
+    and extra columns (e.g. ``select(A, A.name)``) are dropped.
+    """
+    descriptions = stmt.column_descriptions
+    if not descriptions:
+        return False
+    entity = descriptions[0].get('entity')
+    return entity is not None and descriptions[0]['expr'] is entity
+
+
+class _Explain(Executable, ClauseElement):
+    """``EXPLAIN`` of a statement, which keeps its bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, stmt: Select[Any], prefix: str) -> None:
+        self.stmt = stmt
+        self.prefix = prefix
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler: SQLCompiler, **kw: Any) -> str:
+    return f'{element.prefix} {compiler.process(element.stmt, **kw)}'
+
+
+def _row_value_predicate(
+    fields: Sequence[ColumnT],
+    values: Sequence[Any],
+    *,
+    is_lt: bool,
+    inclusive: bool,
+) -> ColumnElement[bool]:
+    fields_tuple, values_tuple = tuple_(*fields), tuple_(*values)
+    if is_lt:
+        return fields_tuple <= values_tuple if inclusive else fields_tuple < values_tuple
+    return fields_tuple >= values_tuple if inclusive else fields_tuple > values_tuple
+
+
+def _expanded_predicate(
+    fields: Sequence[ColumnT],
+    values: Sequence[Any],
+    lt_flags: Sequence[bool],
+    *,
+    inclusive: bool,
+) -> ColumnElement[bool]:
+    """Make ``a > x OR a = x AND b > y ...`` with a comparison direction per field.
+
+    The leading redundant ``a >= x`` lets a database seek the index range.
+    """
+    last = len(fields) - 1
+    terms = []
+    for i, (field, value, is_lt) in enumerate(zip(fields, values, lt_flags, strict=True)):
+        if i == last and inclusive:
+            cmp = field <= value if is_lt else field >= value
+        else:
+            cmp = field < value if is_lt else field > value
+        terms.append(
+            and_(*(f == v for f, v in zip(fields[:i], values[:i], strict=True)), cmp),
+        )
+
+    if last == 0:
+        return terms[0]
+    lead = fields[0] <= values[0] if lt_flags[0] else fields[0] >= values[0]
+    return and_(lead, or_(*terms))
@@ -0,0 +1,229 @@
+"""Keyset pagination index advisor for ``SQLAlchemyCursorPaginator``.
+
+For every allowed sort spec it returns a composite index DDL
+and checks the query plan of a page query, which must be an index range scan
+without a separate sort.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, replace
+from itertools import permutations, product
+from typing import TYPE_CHECKING, Any, Final
+
+from sqlalchemy import Column, Table
+
+from paginate_any.exc import ConfigurationErr
+from paginate_any.ext.sqlalchemy import _Explain
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from sqlalchemy import Dialect, Select
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from paginate_any.cursor_pagination import SortFieldsT
+    from paginate_any.datastruct import Ordering
+
+    from .sqlalchemy import SQLAlchemyCursorPaginator, SQLAlchemyStoreT
+
+
+__all__ = [
+    'SortSpecReport',
+    'sort_specs',
+    'keyset_index_ddl',
+    'check_keyset_indexes',
+]
+
+
+@dataclass(frozen=True, slots=True)
+class SortSpecReport:
+    # Raw sort param, e.g. "-created"
+    sort: str
+    sort_fields: tuple[str, ...]
+    direction: Ordering
+    # None if a sort field isn't a column of one table
+    index_ddl: str | None
+    plan: list[str]
+    uses_sort: bool
+    uses_full_scan: bool
+
+    @property
+    def ok(self) -> bool:
+        return not (self.uses_sort or self.uses_full_scan)
+
+
+def sort_specs(
+    paginator: SQLAlchemyCursorPaginator[Any],
+    max_fields: int = 2,
+) -> list[str]:
+    """Return raw sort params of all field combinations in both directions.
+
+    With ``mixed_ordering`` every combination of field directions is returned.
+    """
+    unq_field = paginator._unq_field
+    fields = [f for f in paginator._sort_fields if f != unq_field]
+    specs: list[str] = []
+    for n in range(min(max_fields, len(fields)) + 1):
+        for combination in permutations(fields, n):
+            spec_fields = (*combination, unq_field)
+            if paginator._mixed_ordering:
+                specs.extend(
+                    ','.join(
+                        f'{sign}{f}' for sign, f in zip(signs, spec_fields, strict=True)
+                    )
+                    for signs in product(('', '-'), repeat=len(spec_fields))
+                )
+            else:
+                spec = ','.join(spec_fields)
+                specs.extend((spec, f'-{spec}'))
+    return specs
+
+
+def keyset_index_ddl(
+    paginator: SQLAlchemyCursorPaginator[Any],
+    sort_fields: SortFieldsT,
+    dialect: Dialect,
+    directions: Sequence[Ordering] | None = None,
+) -> str | None:
+    """Return a composite index DDL for the sort fields.
+
+    The same index serves both directions, a database scans it backward,
+    so only fields sorted against the first one get ``DESC``.
+    """
+    columns = []
+    for f in sort_fields:
+        if (column := _table_column(paginator._sort_fields[f])) is None:
+            return None
+        columns.append(column)
+    if len({c.table for c in columns}) != 1:
+        return None
+
+    table = columns[0].table
+    preparer = dialect.identifier_preparer
+    names = [c.name for c in columns]
+    suffixes = [''] * len(names)
+    if directions:
+        suffixes = [' DESC' if d != directions[0] else '' for d in directions]
+    name_parts = (f'{n}_desc' if sf else n for n, sf in zip(names, suffixes, strict=True))
+    index_name = '_'.join(('ix', table.name, *name_parts))
+    index_columns = ', '.join(
+        f'{preparer.quote(n)}{sf}' for n, sf in zip(names, suffixes, strict=True)
+    )
+    return (
+        f'CREATE INDEX {preparer.quote(index_name)} '
+        f'ON {preparer.format_table(table)} ({index_columns})'
+    )
+
+
+async def check_keyset_indexes(
+    paginator: SQLAlchemyCursorPaginator[Any],
+    store: SQLAlchemyStoreT,
+    sorts: Iterable[str] | None = None,
+    max_fields: int = 2,
+) -> list[SortSpecReport]:
+    """Explain a page query of every sort spec, see ``sort_specs`` for defaults.
+
+    A cursor is made from the first row of the spec ordering,
+    so put realistic data into the database to get realistic plans.
+    Supported dialects: SQLite, PostgreSQL and MySQL.
+    """
+    session, stmt = store
+    dialect = session.get_bind(clause=stmt).dialect
+    if (explain := _EXPLAIN_PREFIXES.get(dialect.name)) is None:
+        msg = f'Query plan check does not support "{dialect.name}" dialect'
+        raise ConfigurationErr(msg)
+
+    reports = []
+    if sorts is None:
+        sorts = sort_specs(paginator, max_fields)
+    for sort in sorts:
+        cursor = paginator._make_cursor(None, None, sort, 1)
+        if rows := await paginator._paginate_data(store, cursor):
+            values = paginator._get_row_key_func(rows[0], cursor.sort_fields)(rows[0])
+            cursor = replace(cursor, after=values)
+
+        page_stmt = paginator._make_page_stmt(stmt, cursor, dialect.name)
+        plan = await _explain(session, page_stmt, explain)
+        uses_sort, uses_full_scan = _PLAN_CHECKS[dialect.name](plan)
+        reports.append(
+            SortSpecReport(
+                sort=sort,
+                sort_fields=cursor.sort_fields,
+                direction=cursor.sort_direction,
+                index_ddl=keyset_index_ddl(
+                    paginator,
+                    cursor.sort_fields,
+                    dialect,
+                    cursor.field_directions,
+                ),
+                plan=plan,
+                uses_sort=uses_sort,
+                uses_full_scan=uses_full_scan,
+            ),
+        )
+    return reports
+
+
+def _table_column(field: Any) -> Column[Any] | None:
+    expr = getattr(field, 'expression', field)
+    if not isinstance(expr, Column):
+        return None
+    column = next(iter(expr.base_columns))
+    if not isinstance(column, Column) or not isinstance(column.table, Table):
+        return None
+    return column
+
+
+async def _explain(session: AsyncSession, stmt: Select[Any], prefix: str) -> list[str]:
+    result = await session.execute(
+        _Explain(stmt, prefix),
+        bind_arguments={'clause': stmt},
+    )
+    rows = result.all()
+    if prefix == 'EXPLAIN QUERY PLAN':
+        # SQLite: id, parent, notused, detail
+        return [str(r[-1]) for r in rows]
+    if len(result.keys()) == 1:
+        return [str(r[0]) for r in rows]
+    return [str(dict(r._mapping)) for r in rows]
+
+
+_EXPLAIN_PREFIXES: Final = {
+    'sqlite': 'EXPLAIN QUERY PLAN',
+    'postgresql': 'EXPLAIN',
+    'mysql': 'EXPLAIN',
+    'mariadb': 'EXPLAIN',
+}
+_PG_SORT_RE: Final = re.compile(r'(^|->)\s*(Incremental )?Sort\s+\(')
+
+
+def _check_sqlite_plan(plan: list[str]) -> tuple[bool, bool]:
+    return (
+        any('USE TEMP B-TREE' in line for line in plan),
+        # "SCAN t USING (COVERING) INDEX ix" is an ordered index scan
+        any(line.startswith('SCAN ') and ' INDEX ' not in line for line in plan),
+    )
+
+
+def _check_postgresql_plan(plan: list[str]) -> tuple[bool, bool]:
+    return (
+        any(_PG_SORT_RE.search(line) for line in plan),
+        any('Seq Scan' in line for line in plan),
+    )
+
+
+def _check_mysql_plan(plan: list[str]) -> tuple[bool, bool]:
+    return (
+        any('Using filesort' in line for line in plan),
+        any("'type': 'ALL'" in line for line in plan),
+    )
+
+
+_PLAN_CHECKS: Final = {
+    'sqlite': _check_sqlite_plan,
+    'postgresql': _check_postgresql_plan,
+    'mysql': _check_mysql_plan,
+    'mariadb': _check_mysql_plan,
+}
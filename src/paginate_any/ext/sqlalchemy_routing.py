@@ -0,0 +1,158 @@
+"""Read replica routing of page queries for ``SQLAlchemyCursorPaginator``."""
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from itertools import count
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from paginate_any.cache import TTLCache
+from paginate_any.exc import ConfigurationErr
+from paginate_any.ext.sqlalchemy import _is_statement_timeout
+
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable, Iterator, Sequence
+
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+
+__all__ = [
+    'RoutingStrategy',
+    'SessionRouter',
+]
+
+
+logger = logging.getLogger(__name__)
+
+_R = TypeVar('_R')
+
+
+class RoutingStrategy(Enum):
+    # Replicas one by one
+    round_robin = 'round_robin'
+    # Replica with the least number of running page queries
+    least_loaded = 'least_loaded'
+
+
+class SessionRouter:
+    """Send page queries of a paginator to read replicas.
+
+    A page query runs in a new session of a replica engine, the session
+    of the store (the primary) is used if there are no replicas,
+    if a replica connection fails or in the read-your-writes window.
+
+    Read-your-writes: bind a request key (e.g. a user id) with ``bind``
+    and call ``mark_write`` after a write, then pages of the key are read
+    from the primary for ``read_your_writes`` seconds, while replicas catch up.
+    """
+
+    __slots__ = (
+        'strategy',
+        '_sessionmakers',
+        '_loads',
+        '_counter',
+        '_writes',
+        '_key',
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        replicas: Sequence[AsyncEngine],
+        strategy: RoutingStrategy = RoutingStrategy.round_robin,
+        *,
+        read_your_writes: float | None = None,
+        max_keys: int = 10_000,
+        session_kwargs: dict[str, Any] | None = None,
+    ) -> None:
+        if read_your_writes is not None and read_your_writes <= 0:
+            msg = '"read_your_writes" must be > 0'
+            raise ConfigurationErr(msg)
+        self.strategy = strategy
+        self._sessionmakers = [
+            async_sessionmaker(engine, **(session_kwargs or {})) for engine in replicas
+        ]
+        # Running page queries of every replica
+        self._loads = [0] * len(replicas)
+        self._counter = count()
+        # Keys written in the window -> True
+        self._writes: TTLCache[Hashable, bool] | None = None
+        if read_your_writes is not None:
+            self._writes = TTLCache(max_keys, read_your_writes)
+        self._key: ContextVar[Hashable | None] = ContextVar(
+            f'paginate_any_router_key_{id(self)}',
+            default=None,
+        )
+
+    @contextmanager
+    def bind(self, key: Hashable) -> Iterator[None]:
+        """Bind the key to the current request (context), e.g. in a middleware."""
+        token = self._key.set(key)
+        try:
+            yield
+        finally:
+            self._key.reset(token)
+
+    def mark_write(self, key: Hashable | None = None) -> None:
+        """Read pages of the key (the bound one by default) from the primary."""
+        if self._writes is None:
+            msg = 'Router is created without "read_your_writes"'
+            raise ConfigurationErr(msg)
+        if (key := self._key.get() if key is None else key) is not None:
+            self._writes.set(key, value=True)
+
+    async def run(
+        self,
+        primary: AsyncSession,
+        query: Callable[[AsyncSession], Awaitable[_R]],
+    ) -> _R:
+        """Run the query with a replica session.
+
+        Fall back to the primary, if the replica connection fails, other errors
+        (e.g. a statement timeout) are raised: the primary would fail as well.
+        """
+        if not self._sessionmakers or self._reads_primary():
+            return await query(primary)
+
+        i = self._pick_replica()
+        self._loads[i] += 1
+        # Cancellation (e.g. by the limiter timeout) isn't caught and isn't retried
+        try:
+            async with self._sessionmakers[i]() as session:
+                return await query(session)
+        except DBAPIError as exc:
+            if not _is_replica_down(exc):
+                raise
+            logger.warning('Replica %s is unavailable, use primary', i, exc_info=True)
+        except OSError:
+            logger.warning('Replica %s is unavailable, use primary', i, exc_info=True)
+        finally:
+            self._loads[i] -= 1
+        return await query(primary)
+
+    def _reads_primary(self) -> bool:
+        if self._writes is None or (key := self._key.get()) is None:
+            return False
+        return self._writes.get(key) is not None
+
+    def _pick_replica(self) -> int:
+        n = len(self._sessionmakers)
+        start = next(self._counter) % n
+        if self.strategy == RoutingStrategy.round_robin:
+            return start
+        # Ties are broken round-robin
+        return min(((start + k) % n for k in range(n)), key=self._loads.__getitem__)
+
+
+def _is_replica_down(exc: DBAPIError) -> bool:
+    if exc.connection_invalidated:
+        return True
+    # Connection errors, but PostgreSQL and MySQL report timeouts as OperationalError
+    return isinstance(exc, OperationalError | InterfaceError) and not (
+        _is_statement_timeout(exc)
+    )
@@ -0,0 +1,98 @@
+import abc
+import time
+from contextlib import AbstractContextManager, nullcontext
+from enum import Enum
+from types import TracebackType
+from typing import Final
+
+from .datastruct import CurrentCursor
+from .exc import CursorValueErr
+
+
+__all__ = [
+    'Stage',
+    'Instrumentation',
+    'TimedInstrumentation',
+]
+
+
+class Stage(Enum):
+    # Whole "paginate" call of a paginator
+    paginate = 'paginate'
+    # Sort params and cursor token decoding
+    make_cursor = 'make_cursor'
+    # Data query, including the probe of rows behind the strict cursor
+    fetch = 'fetch'
+    # Cut the page from fetched rows
+    trim = 'trim'
+    # Total count, see "count" of a paginator
+    count = 'count'
+    # Prev and next cursor tokens
+    encode_cursor = 'encode_cursor'
+    # REST layer: pagination params of the query string
+    parse_query = 'parse_query'
+    # REST layer: prev and next links
+    links = 'links'
+
+
+_null_stage: Final = nullcontext()
+
+
+class Instrumentation:
+    """Pagination hooks, the base class does nothing.
+
+    Pass it to a paginator as ``instrumentation``, its ``paginate``
+    and the REST layer call the hooks. Without an instrumentation
+    the hooks aren't called at all.
+    """
+
+    __slots__ = ()
+
+    def stage(self, stage: Stage) -> AbstractContextManager[object]:
+        """Wrap a stage, e.g. to measure it or to start a span."""
+        return _null_stage
+
+    def on_page(self, cursor: CurrentCursor, fetched: int, returned: int) -> None:
+        """Page is made: rows fetched from the store and rows of the page."""
+
+    def on_cursor_err(self, err: CursorValueErr) -> None:
+        """Cursor token can't be decoded."""
+
+    def on_page_cache(self, cursor: CurrentCursor, *, hit: bool) -> None:
+        """Page is looked up in the cache of ``CachedCursorPaginator``.
+
+        Misses are followed by stages of the wrapped paginator, hits aren't.
+        """
+
+
+class TimedInstrumentation(Instrumentation, metaclass=abc.ABCMeta):
+    """Instrumentation, which measures stages with ``time.perf_counter``."""
+
+    __slots__ = ()
+
+    def stage(self, stage: Stage) -> AbstractContextManager[object]:
+        return _StageTimer(self, stage)
+
+    @abc.abstractmethod
+    def on_stage(self, stage: Stage, seconds: float) -> None:
+        """Stage is finished, including failed ones."""
+
+
+class _StageTimer:
+    __slots__ = ('_instrumentation', '_stage', '_start')
+
+    def __init__(self, instrumentation: TimedInstrumentation, stage: Stage) -> None:
+        self._instrumentation = instrumentation
+        self._stage = stage
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self._instrumentation.on_stage(self._stage, time.perf_counter() - self._start)
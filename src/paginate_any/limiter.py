@@ -0,0 +1,79 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from .exc import ConfigurationErr, PaginationTimeoutErr
+
+
+__all__ = [
+    'QueryLimiter',
+]
+
+
+_R = TypeVar('_R')
+
+
+class QueryLimiter:
+    """Limit concurrent queries of a paginator and their duration.
+
+    Only ``max_concurrency`` queries run at once, the others wait in a queue,
+    so expensive pages can't take all connections of a pool.
+    ``timeout`` limits the wait and the query in seconds, the query is cancelled
+    and ``PaginationTimeoutErr`` is raised. Share a limiter between paginators
+    to limit their queries together.
+
+    The timeout is client-side: the slot is freed on cancellation, but a driver
+    may keep running the statement on the database (e.g. aiosqlite in its thread).
+    ``SQLAlchemyCursorPaginator`` also sets a server-side timeout of page queries
+    on PostgreSQL and MySQL.
+    """
+
+    __slots__ = ('max_concurrency', 'timeout', 'retry_after', '_semaphore', '_waiting')
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        timeout: float | None = None,
+        retry_after: int = 1,
+    ) -> None:
+        if max_concurrency is not None and max_concurrency <= 0:
+            msg = '"max_concurrency" must be > 0'
+            raise ConfigurationErr(msg)
+        if timeout is not None and timeout <= 0:
+            msg = '"timeout" must be > 0'
+            raise ConfigurationErr(msg)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._semaphore: asyncio.Semaphore | None = None
+        if max_concurrency is not None:
+            self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Queries waiting for a free slot."""
+        return self._waiting
+
+    async def run(self, func: Callable[..., Awaitable[_R]], *args: Any) -> _R:
+        if self.timeout is None:
+            return await self._run(func, *args)
+        try:
+            return await asyncio.wait_for(self._run(func, *args), self.timeout)
+        except asyncio.TimeoutError as exc:
+            msg = f'Query is not finished in {self.timeout} seconds'
+            raise PaginationTimeoutErr(msg, self.retry_after) from exc
+
+    async def _run(self, func: Callable[..., Awaitable[_R]], *args: Any) -> _R:
+        if (semaphore := self._semaphore) is None:
+            return await func(*args)
+
+        self._waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            return await func(*args)
+        finally:
+            semaphore.release()
@@ -0,0 +1,268 @@
+import asyncio
+import hashlib
+import pickle
+from collections.abc import Awaitable, Callable, Hashable
+from itertools import count
+from typing import Any, Generic, Protocol, cast, runtime_checkable
+
+from .cache import TTLCache
+from .cursor_pagination import (
+    CursorPaginator,
+    FieldT,
+    RowsStoreT,
+    RowT,
+    SortFieldsRawT,
+)
+from .datastruct import CurrentCursor, CursorPaginationPage, CursorRawT
+from .exc import ConfigurationErr
+from .instrumentation import Instrumentation, Stage
+
+
+__all__ = [
+    'PageCacheBackend',
+    'InProcessPageCache',
+    'RedisLike',
+    'RedisPageCache',
+    'CachedCursorPaginator',
+]
+
+
+@runtime_checkable
+class PageCacheBackend(Protocol):
+    """Storage of cached pages and invalidation generations."""
+
+    async def get(self, key: str) -> Any | None:  # pragma: no cover
+        ...
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:  # pragma: no cover
+        ...
+
+    async def incr(self, key: str) -> int:  # pragma: no cover
+        """Increment an integer value (0 if missing).
+
+        It must not expire before pages cached with the previous value.
+        """
+
+
+class InProcessPageCache:
+    """LRU cache of pages in the process memory, pages aren't copied.
+
+    Generations of invalidated stores live as long as the longest page ttl,
+    at most ``maxsize`` of them: if they overflow, all pages are dropped.
+    """
+
+    __slots__ = ('_pages', '_generations', '_counter', '_max_ttl')
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self._pages: TTLCache[str, Any] = TTLCache(maxsize)
+        self._generations: TTLCache[str, int] = TTLCache(maxsize)
+        # Generations are unique, so an expired generation (0 again)
+        # matches only pages cached before its first increment, and they're expired
+        self._counter = count(1)
+        self._max_ttl = 0.0
+
+    async def get(self, key: str) -> Any | None:
+        if (generation := self._generations.get(key)) is not None:
+            return generation
+        return self._pages.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._max_ttl = max(self._max_ttl, ttl)
+        self._pages.set(key, value, ttl)
+
+    async def incr(self, key: str) -> int:
+        generations = self._generations
+        if generations.get(key) is None and len(generations) >= generations.maxsize:
+            generations.expire()
+            if len(generations) >= generations.maxsize:
+                # The evicted generation is 0 again and matches its old pages
+                self._pages.clear()
+        generation = next(self._counter)
+        generations.set(key, generation, self._max_ttl or None)
+        return generation
+
+
+class RedisLike(Protocol):
+    """Subset of the ``redis.asyncio.Redis`` client used by ``RedisPageCache``."""
+
+    async def get(self, name: str) -> bytes | None:  # pragma: no cover
+        ...
+
+    async def set(  # pragma: no cover
+        self,
+        name: str,
+        value: bytes,
+        px: int | None = None,
+    ) -> Any:
+        ...
+
+    async def incr(self, name: str) -> int:  # pragma: no cover
+        ...
+
+
+class RedisPageCache:
+    """Pages shared by processes in Redis, rows of pages must be picklable."""
+
+    __slots__ = ('_client',)
+
+    def __init__(self, client: RedisLike) -> None:
+        self._client = client
+
+    async def get(self, key: str) -> Any | None:
+        if (value := await self._client.get(key)) is None:
+            return None
+        # "incr" stores generations as plain integers
+        return int(value) if value.isdigit() else pickle.loads(value)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._client.set(key, pickle.dumps(value), px=int(ttl * 1000))
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+
+def _hash_key(value: Any) -> str:
+    return hashlib.blake2b(repr(value).encode(), digest_size=16).hexdigest()
+
+
+class CachedCursorPaginator(Generic[FieldT, RowsStoreT, RowT]):
+    """Paginator wrapper, which caches pages by the store and the parsed cursor.
+
+    Stores are identified by ``CursorPaginator._store_fingerprint``,
+    pass ``store_key`` for backends without it (e.g. in memory), None - don't cache.
+    Rows bound to a store (SQLAlchemy ORM entities) can't be cached
+    without ``store_key``, select columns or use ``row_factory`` instead.
+    Concurrent misses of the same page in the process wait for one query.
+    Misses are instrumented as the wrapped paginator, lookups are reported
+    by ``Instrumentation.on_page_cache``.
+    Call ``invalidate`` after writes to drop pages of a store or all pages.
+    """
+
+    __slots__ = ('_paginator', '_backend', '_ttl', '_prefix', '_store_key', '_inflight')
+
+    def __init__(  # noqa: PLR0913
+        self,
+        paginator: CursorPaginator[FieldT, RowsStoreT, RowT],
+        backend: PageCacheBackend,
+        *,
+        ttl: float = 30,
+        prefix: str = 'paginate_any',
+        store_key: Callable[[RowsStoreT], Hashable | None] | None = None,
+    ) -> None:
+        if ttl <= 0:
+            msg = '"ttl" must be > 0'
+            raise ConfigurationErr(msg)
+        self._paginator = paginator
+        self._backend = backend
+        self._ttl = ttl
+        self._prefix = prefix
+        self._store_key = store_key
+        self._inflight: dict[str, asyncio.Future[CursorPaginationPage[RowT] | None]] = {}
+
+    @property
+    def instrumentation(self) -> Instrumentation | None:
+        """Instrumentation of the wrapped paginator, e.g. for the REST layer."""
+        return self._paginator.instrumentation
+
+    async def paginate(  # noqa: PLR0913
+        self,
+        store: RowsStoreT,
+        sort_fields: SortFieldsRawT = None,
+        before: CursorRawT = None,
+        after: CursorRawT = None,
+        size: int | None = None,
+    ) -> CursorPaginationPage[RowT]:
+        p = self._paginator
+        if (i := p.instrumentation) is None:
+            cursor = p._make_cursor(before, after, sort_fields, size)
+            return await self._paginate_cursor(None, store, cursor)
+        with i.stage(Stage.paginate):
+            cursor = p._make_cursor_instrumented(i, before, after, sort_fields, size)
+            return await self._paginate_cursor(i, store, cursor)
+
+    async def invalidate(self, store: RowsStoreT | None = None) -> None:
+        """Drop cached pages of the store, or pages of all stores without it."""
+        if store is None:
+            await self._backend.incr(self._generation_key(None))
+        elif (store_key := self._get_store_key(store)) is not None:
+            await self._backend.incr(self._generation_key(_hash_key(store_key)))
+
+    async def _paginate_cursor(
+        self,
+        i: Instrumentation | None,
+        store: RowsStoreT,
+        cursor: CurrentCursor,
+    ) -> CursorPaginationPage[RowT]:
+        if (store_key := self._get_store_key(store)) is None:
+            return await self._query_page(i, store, cursor)
+
+        key = await self._make_page_key(_hash_key(store_key), cursor)
+        page = await self._backend.get(key)
+        # Waiters of a cancelled load get None and load the page themselves
+        while page is None and (inflight := self._inflight.get(key)) is not None:
+            page = await asyncio.shield(inflight)
+        if i is not None:
+            i.on_page_cache(cursor, hit=page is not None)
+        if page is not None:
+            return cast(CursorPaginationPage[RowT], page)
+        return await self._load_page(i, key, store, cursor)
+
+    def _query_page(
+        self,
+        i: Instrumentation | None,
+        store: RowsStoreT,
+        cursor: CurrentCursor,
+    ) -> Awaitable[CursorPaginationPage[RowT]]:
+        if i is None:
+            return self._paginator._paginate_cursor(store, cursor)
+        return self._paginator._paginate_cursor_instrumented(i, store, cursor)
+
+    def _get_store_key(self, store: RowsStoreT) -> Hashable | None:
+        if self._store_key is not None:
+            return self._store_key(store)
+        p = self._paginator
+        if not p._rows_outlive_store(store):
+            msg = (
+                f'Rows of {type(p).__name__} store are bound to it (e.g. ORM entities), '
+                'select plain values or pass "store_key"'
+            )
+            raise ConfigurationErr(msg)
+        return p._store_fingerprint(store)
+
+    async def _make_page_key(self, store_hash: str, cursor: CurrentCursor) -> str:
+        # Pages of old generations aren't read anymore and expire by the ttl
+        generations = (
+            await self._backend.get(self._generation_key(None)) or 0,
+            await self._backend.get(self._generation_key(store_hash)) or 0,
+        )
+        return f'{self._prefix}:page:{store_hash}:{_hash_key((generations, cursor))}'
+
+    def _generation_key(self, store_hash: str | None) -> str:
+        return f'{self._prefix}:gen:{store_hash or "*"}'
+
+    async def _load_page(
+        self,
+        i: Instrumentation | None,
+        key: str,
+        store: RowsStoreT,
+        cursor: CurrentCursor,
+    ) -> CursorPaginationPage[RowT]:
+        inflight = asyncio.get_running_loop().create_future()
+        self._inflight[key] = inflight
+        try:
+            page = await self._query_page(i, store, cursor)
+            await self._backend.set(key, page, self._ttl)
+        except asyncio.CancelledError:
+            # Don't cancel waiters with the loader (e.g. its client is gone)
+            inflight.set_result(None)
+            raise
+        except Exception as exc:
+            inflight.set_exception(exc)
+            # Waiters get the exception, don't warn if there are none
+            inflight.exception()
+            raise
+        else:
+            inflight.set_result(page)
+            return page
+        finally:
+            del self._inflight[key]
@@ -1,27 +1,37 @@
 import abc
 from dataclasses import dataclass, fields
-from functools import partial
+from enum import Enum
 from typing import (
     Final,
     Generic,
     NamedTuple,
+    Protocol,
     TypeAlias,
     TypeVar,
+    overload,
 )
-from urllib import parse
-from urllib.parse import parse_qs, urlunparse
+from urllib.parse import quote_plus, unquote_plus
+
+import msgspec.json
 
 # TypedDict reason: https://docs.pydantic.dev/2.5/errors/usage_errors/#typed-dict-version
 from typing_extensions import NotRequired, Required, TypedDict
 
-from paginate_any.cursor_pagination import CursorPaginator, FieldT, RowsStoreT, RowT
-from paginate_any.datastruct import CursorPaginationPage, DictStrAny
+from paginate_any.cursor_pagination import (
+    CursorPaginator,
+    FieldT,
+    RowsStoreT,
+    RowT,
+    SortFieldsRawT,
+)
+from paginate_any.datastruct import CursorPaginationPage, CursorRawT, DictStrAny
 from paginate_any.exc import (
     CursorParamsErr,
     CursorValueErr,
     MultipleCursorsErr,
     SortParamErr,
 )
+from paginate_any.instrumentation import Instrumentation, Stage
 
 
 __all__ = [
@@ -32,16 +42,21 @@ __all__ = [
     'JsonCursorPagination',
     'JsonCursorPagination',
     'JsonCursorPagination',
+    'PaginatorProtocol',
     'PaginationResult',
     'JsonPaginationResp',
     'QueryParamsT',
     'ReqT',
     'UrlParts',
+    'LinksMode',
     'PaginationConf',
     'set_default_conf',
 ]
 
 
+_json_encoder: Final = msgspec.json.Encoder()
+_no_instrumentation: Final = Instrumentation()
+
 _HTTP_SCHEMAS: Final = {'http', 'ws'}
 _HTTPS_SCHEMAS: Final = {'https', 'wss'}
 _HTTP_DEFAULT_PORT: Final = 80
@@ -80,12 +95,24 @@ class UrlParts(NamedTuple):
     path: str
 
 
+class LinksMode(Enum):
+    # https://host/path?after=...
+    absolute = 'absolute'
+    # /path?after=...
+    relative = 'relative'
+    # ?after=...
+    query = 'query'
+    # No links, cursors are in "pagination" only
+    none = 'none'
+
+
 @dataclass(frozen=True, slots=True)
 class PaginationConf:
     sort_param: str = 'ordering'
     size_param: str = 'size'
     before_param: str = 'before'
     after_param: str = 'after'
+    links: LinksMode = LinksMode.absolute
 
 
 _default_conf = PaginationConf()
@@ -101,10 +128,16 @@ class Links(TypedDict):
     next: NotRequired[str]
 
 
+class PaginationTotal(TypedDict):
+    value: int
+    relation: str
+
+
 class Pagination(TypedDict):
     size: Required[int]
     before: NotRequired[str]
     after: NotRequired[str]
+    total: NotRequired[PaginationTotal]
 
 
 DataT = TypeVar('DataT')
@@ -112,7 +145,7 @@ DataT = TypeVar('DataT')
 
 class JsonPaginationResp(TypedDict, Generic[DataT]):
     pagination: Pagination
-    links: Links
+    links: NotRequired[Links]
     data: list[DataT]
 
 
@@ -129,26 +162,57 @@ class PaginationResult(Generic[RowT]):
             'pagination': {
                 'size': self.page.cursor_params.size,
             },
-            'links': {},
         }
         p = resp['pagination']
         if self.page.prev:
             p['before'] = self.page.prev
         if self.page.next:
             p['after'] = self.page.next
+        if total := self.page.total:
+            p['total'] = {'value': total.value, 'relation': total.relation.value}
 
-        links = resp.setdefault('links', {})
-        if self.prev_link:
-            links['prev'] = self.prev_link
-        if self.next_link:
-            links['next'] = self.next_link
+        if self.conf.links != LinksMode.none:
+            links = resp['links'] = {}
+            if self.prev_link:
+                links['prev'] = self.prev_link
+            if self.next_link:
+                links['next'] = self.next_link
 
         return resp
 
+    def to_json_bytes(self, encoder: msgspec.json.Encoder | None = None) -> bytes:
+        """Encode ``json_resp`` straight to JSON bytes.
+
+        Rows may be dataclasses, msgspec structs, named tuples or anything else
+        supported by msgspec, use an ``encoder`` with ``enc_hook`` for other types.
+        """
+        return (encoder or _json_encoder).encode(self.json_resp())
+
 
 ReqT = TypeVar('ReqT')
 QueryParamsT: TypeAlias = dict[str, list[str]]
 
+_T_contra = TypeVar('_T_contra', contravariant=True)
+_R = TypeVar('_R')
+
+
+class PaginatorProtocol(Protocol[_T_contra, _R]):
+    """Paginator of the REST layer, e.g. ``CursorPaginator`` or its cache wrapper."""
+
+    @property
+    def instrumentation(self) -> Instrumentation | None:  # pragma: no cover
+        ...
+
+    async def paginate(  # noqa: PLR0913
+        self,
+        store: _T_contra,
+        sort_fields: SortFieldsRawT = None,
+        before: CursorRawT = None,
+        after: CursorRawT = None,
+        size: int | None = None,
+    ) -> CursorPaginationPage[_R]:  # pragma: no cover
+        ...
+
 
 class JsonCursorPagination(
     Generic[ReqT, FieldT, RowsStoreT, RowT],
@@ -159,11 +223,27 @@ class JsonCursorPagination(
         '_conf',
     )
 
+    @overload
     def __init__(
         self,
         paginator: CursorPaginator[FieldT, RowsStoreT, RowT],
         conf: PaginationConf | None = None,
-    ):
+    ) -> None:  # pragma: no cover
+        ...
+
+    @overload
+    def __init__(
+        self,
+        paginator: PaginatorProtocol[RowsStoreT, RowT],
+        conf: PaginationConf | None = None,
+    ) -> None:  # pragma: no cover
+        ...
+
+    def __init__(
+        self,
+        paginator: PaginatorProtocol[RowsStoreT, RowT],
+        conf: PaginationConf | None = None,
+    ) -> None:
         self._paginator = paginator
         self._conf = conf
 
@@ -177,19 +257,14 @@ class JsonCursorPagination(
         store: RowsStoreT,
     ) -> PaginationResult[RowT]:
         c = self.conf
-        params: QueryParamsT = {}
-        if params_str := self._get_query_params(req):
-            params = parse_qs(
-                params_str,
-                keep_blank_values=True,
-                strict_parsing=True,
-            )
-
-        get = partial(self._get_param_val, params)
-        sort_fields = get(c.sort_param)
-        before, after = get(c.before_param), get(c.after_param)
+        i = self._paginator.instrumentation or _no_instrumentation
+        with i.stage(Stage.parse_query):
+            query = self._get_query_params(req)
+            values, link_query = _scan_query(query, c, links=c.links != LinksMode.none)
+        sort_fields = values.get(c.sort_param)
+        before, after = values.get(c.before_param), values.get(c.after_param)
         try:
-            size = int(v) if (v := get(c.size_param)) else None
+            size = int(v) if (v := values.get(c.size_param)) else None
         except (ValueError, TypeError) as exc:
             err = Error(
                 title='Must be a valid integer',
@@ -203,26 +278,19 @@ class JsonCursorPagination(
             errors = self._pagination_err_to_api_err(exc, before, after)
             raise self._to_framework_error(req, errors) from exc
 
-        path = self._get_request_path(req)
-
-        def gen_link(param: str, value: str) -> str:
-            return self._generate_url(path, {param: [value], **params})
+        if c.links == LinksMode.none or not (page.prev or page.next):
+            return PaginationResult(page=page, conf=c)
 
-        params.pop(c.before_param, None)
-        params.pop(c.after_param, None)
-        result: PaginationResult[RowT] = PaginationResult(
-            page=page,
-            conf=c,
-            prev_link=gen_link(c.before_param, page.prev) if page.prev else None,
-            next_link=gen_link(c.after_param, page.next) if page.next else None,
-        )
+        with i.stage(Stage.links):
+            links = _LinkTemplate.make(self._get_links_base(req, c.links), link_query)
+            result: PaginationResult[RowT] = PaginationResult(
+                page=page,
+                conf=c,
+                prev_link=links.format(c.before_param, page.prev) if page.prev else None,
+                next_link=links.format(c.after_param, page.next) if page.next else None,
+            )
         return result
 
-    @staticmethod
-    def _get_param_val(params: QueryParamsT, key: str) -> str | None:
-        """Return first query param value."""
-        return val[0] if (val := params.get(key)) else None
-
     @abc.abstractmethod
     def _get_query_params(self, req: ReqT) -> str:
         pass
@@ -231,6 +299,13 @@ class JsonCursorPagination(
     def _get_url_parts_from_request(self, req: ReqT) -> UrlParts:
         pass
 
+    def _get_links_base(self, req: ReqT, mode: LinksMode) -> str:
+        if mode == LinksMode.relative:
+            return self._get_url_parts_from_request(req).path
+        if mode == LinksMode.query:
+            return ''
+        return self._get_request_path(req)
+
     def _get_request_path(self, req: ReqT) -> str:
         scheme, host, port, path = self._get_url_parts_from_request(req)
         if (
@@ -243,12 +318,7 @@ class JsonCursorPagination(
         else:
             netloc = f'{host}:{port}'
 
-        return str(urlunparse((scheme, netloc, path, None, None, None)))
-
-    @staticmethod
-    def _generate_url(path: str, params: QueryParamsT) -> str:
-        query_params = f'?{parse.urlencode(params, doseq=True)}' if params else ''
-        return parse.urljoin(path, query_params)
+        return f'{scheme}://{netloc or ""}{path}'
 
     def _pagination_err_to_api_err(
         self,
@@ -285,3 +355,43 @@ class JsonCursorPagination(
     @abc.abstractmethod
     def _to_framework_error(self, req: ReqT, errors: list[Error]) -> Exception:
         pass
+
+
+def _scan_query(
+    query: str,
+    conf: PaginationConf,
+    *,
+    links: bool = True,
+) -> tuple[dict[str, str], str]:
+    """Return first values of the pagination params and the query for links.
+
+    Only the pagination params are decoded, the rest of the query is copied
+    to links as is, without cursor params.
+    """
+    params = (conf.sort_param, conf.size_param, conf.before_param, conf.after_param)
+    cursor_params = params[2:]
+    values: dict[str, str] = {}
+    link_params: list[str] = []
+    for pair in query.split('&'):
+        if not pair:
+            continue
+        key, _, value = pair.partition('=')
+        if '%' in key or '+' in key:
+            key = unquote_plus(key)
+        if key in params and key not in values:
+            values[key] = unquote_plus(value)
+        if links and key not in cursor_params:
+            link_params.append(pair)
+    return values, '&'.join(link_params)
+
+
+class _LinkTemplate(NamedTuple):
+    prefix: str
+    suffix: str
+
+    @classmethod
+    def make(cls, base_url: str, query: str) -> '_LinkTemplate':
+        return cls(f'{base_url}?', f'&{query}' if query else '')
+
+    def format(self, param: str, cursor: str) -> str:
+        return f'{self.prefix}{quote_plus(param)}={quote_plus(cursor)}{self.suffix}'
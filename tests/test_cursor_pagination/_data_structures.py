@@ -1,15 +1,23 @@
 import abc
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Generic, TypeVar
 
-from paginate_any.cursor_pagination import CursorPaginator, InMemoryCursorPaginator
-from paginate_any.datastruct import CursorPaginationPage
+from paginate_any.cursor_pagination import (
+    CursorPaginator,
+    IndexedRowsStore,
+    InMemoryCursorPaginator,
+)
+from paginate_any.datastruct import CurrentCursor, CursorPaginationPage
+from paginate_any.exc import CursorValueErr
+from paginate_any.instrumentation import Stage, TimedInstrumentation
 
 
 __all__ = [
     'LogPaginatorFactory',
     'InMemoryLogPaginatorFactory',
+    'IndexedInMemoryLogPaginatorFactory',
+    'RecordingInstrumentation',
     'utc_now',
 ]
 
@@ -28,6 +36,7 @@ class LogPaginatorFactory(Generic[LogT], metaclass=abc.ABCMeta):
     rows_store: Any
     paginator: type[CursorPaginator[Any, Any, LogT]]
     sort_fields: dict[str, Any]
+    paginator_kwargs: dict[str, Any] = field(default_factory=dict)
 
     @abc.abstractmethod
     async def create_log(
@@ -49,6 +58,7 @@ class LogPaginatorFactory(Generic[LogT], metaclass=abc.ABCMeta):
             sort_fields=self.sort_fields,
             default_size=2,
             max_size=3,
+            **self.paginator_kwargs,
         )
 
     async def paginate(self, **kwargs) -> CursorPaginationPage[LogT]:
@@ -82,3 +92,42 @@ class InMemoryLogPaginatorFactory(LogPaginatorFactory[Log]):
 
     async def rm_log(self, row: Log) -> None:
         self.rows_store.remove(row)
+
+
+class IndexedInMemoryLogPaginatorFactory(LogPaginatorFactory[Log]):
+    rows_store: IndexedRowsStore[Log]
+    paginator: type[CursorPaginator[str, Any, Log]]
+
+    async def create_log(
+        self,
+        id: int,
+        action: str = '',
+        created: datetime | None = None,
+    ) -> Log:
+        log = Log(id, action, created or utc_now())
+        self.rows_store.add(log)
+        return log
+
+    async def rm_log(self, row: Log) -> None:
+        self.rows_store.remove(row)
+
+
+class RecordingInstrumentation(TimedInstrumentation):
+    def __init__(self) -> None:
+        self.stages: list[Stage] = []
+        self.pages: list[tuple[int, int, int]] = []
+        self.errors: list[CursorValueErr] = []
+        self.cache_hits: list[bool] = []
+
+    def on_stage(self, stage: Stage, seconds: float) -> None:
+        assert seconds >= 0
+        self.stages.append(stage)
+
+    def on_page(self, cursor: CurrentCursor, fetched: int, returned: int) -> None:
+        self.pages.append((cursor.size, fetched, returned))
+
+    def on_cursor_err(self, err: CursorValueErr) -> None:
+        self.errors.append(err)
+
+    def on_page_cache(self, cursor: CurrentCursor, *, hit: bool) -> None:
+        self.cache_hits.append(hit)
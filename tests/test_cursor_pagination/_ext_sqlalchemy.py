@@ -31,6 +31,8 @@ else:
 
 
 __all__ = [
+    'Base',
+    'SALog',
     'engine',
     'scoped_session_cls',
     'create_db',
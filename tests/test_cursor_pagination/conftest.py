@@ -0,0 +1,53 @@
+from collections.abc import AsyncGenerator
+from typing import TYPE_CHECKING
+
+import pytest
+import pytest_asyncio
+
+
+if TYPE_CHECKING:
+    from ._ext_sqlalchemy import SQLAlchemyLogPaginatorFactory
+
+
+@pytest_asyncio.fixture()
+async def sqlalchemy_p_factory() -> AsyncGenerator['SQLAlchemyLogPaginatorFactory', None]:
+    try:
+        import sqlalchemy  # noqa: F401
+    except ImportError as e:
+        pytest.skip(str(e))
+
+    from ._ext_sqlalchemy import (
+        create_db,
+        drop_db,
+        engine,
+        make_sqlalchemy_p_factory,
+        scoped_session_cls,
+    )
+
+    await create_db(engine)
+    session = scoped_session_cls()
+    await session.begin()
+
+    yield make_sqlalchemy_p_factory(session)
+
+    await session.rollback()
+    await drop_db(engine)
+    await engine.dispose()
+
+
+@pytest.fixture()
+def sqlalchemy_expanded_p_factory(
+    sqlalchemy_p_factory: 'SQLAlchemyLogPaginatorFactory',
+) -> 'SQLAlchemyLogPaginatorFactory':
+    from paginate_any.ext.sqlalchemy import KeysetPredicate
+
+    sqlalchemy_p_factory.paginator_kwargs['predicate'] = KeysetPredicate.expanded
+    return sqlalchemy_p_factory
+
+
+@pytest.fixture()
+def sqlalchemy_stream_p_factory(
+    sqlalchemy_p_factory: 'SQLAlchemyLogPaginatorFactory',
+) -> 'SQLAlchemyLogPaginatorFactory':
+    sqlalchemy_p_factory.paginator_kwargs['yield_per'] = 1
+    return sqlalchemy_p_factory
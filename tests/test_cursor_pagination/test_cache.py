@@ -0,0 +1,76 @@
+import pytest
+from paginate_any.cache import TTLCache
+from paginate_any.exc import ConfigurationErr
+
+
+class _Timer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_expiration():
+    # arrange
+    timer = _Timer()
+    cache = TTLCache[str, int](maxsize=10, ttl=10, timer=timer)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=20)
+    # act
+    timer.now = 9.9
+    before_ttl = cache.get('a'), cache.get('b')
+    timer.now = 10
+    after_ttl = cache.get('a'), cache.get('b')
+    # assert
+    assert before_ttl == (1, 2)
+    assert after_ttl == (None, 2)
+    assert len(cache) == 1
+
+
+def test_ttl_cache_lru_eviction():
+    # arrange
+    cache = TTLCache[str, int](maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # act
+    cache.get('a')
+    cache.set('c', 3)
+    # assert
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+
+def test_ttl_cache_expire():
+    # arrange
+    timer = _Timer()
+    cache = TTLCache[str, int](maxsize=10, ttl=10, timer=timer)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=20)
+    # act
+    timer.now = 10
+    cache.expire()
+    # assert
+    assert len(cache) == 1
+    assert cache.get('b') == 2
+
+
+def test_ttl_cache_pop_and_clear():
+    # arrange
+    cache = TTLCache[str, int]()
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # act
+    popped, missing = cache.pop('a'), cache.pop('a')
+    cache.clear()
+    # assert
+    assert (popped, missing) == (1, None)
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize(('maxsize', 'ttl'), [(0, 1), (1, 0)])
+def test_ttl_cache_configuration_err(maxsize, ttl):
+    # act
+    with pytest.raises(ConfigurationErr):
+        TTLCache[str, int](maxsize, ttl)
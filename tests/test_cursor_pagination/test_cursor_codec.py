@@ -0,0 +1,132 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID
+
+import pytest
+from paginate_any.cursor_codec import MsgpackCursorCodec, StructCursorCodec
+from paginate_any.cursor_pagination import InMemoryCursorPaginator
+from paginate_any.exc import ConfigurationErr, CursorValueErr, PaginationErr
+
+from ._data_structures import Log, utc_now
+
+
+_struct_codec = StructCursorCodec(
+    {
+        'id': int,
+        'created': datetime,
+        'day': date,
+        'uid': UUID,
+        'score': float,
+        'flag': bool,
+    },
+)
+
+
+def test_msgpack_codec_cache():
+    # arrange
+    codec = MsgpackCursorCodec(cache_size=1)
+    token = codec.encode((1, 'a'), ('id', 'action'))
+    # act
+    values = [codec.decode(token, ('id', 'action')) for _ in range(3)]
+    # assert
+    assert values == [(1, 'a')] * 3
+    assert codec.cache_info.hits == 2
+    assert codec.cache_info.misses == 1
+
+
+def test_msgpack_codec_errors_are_not_cached():
+    # arrange
+    codec = MsgpackCursorCodec()
+    # act
+    for _ in range(2):
+        with pytest.raises(CursorValueErr):
+            codec.decode('bad_value', ('id',))
+    # assert
+    assert codec.cache_info.currsize == 0
+
+
+@pytest.mark.parametrize(
+    ('fields', 'values'),
+    [
+        (('id',), (-(2**63),)),
+        (('created', 'id'), (datetime(1909, 7, 16, 1, 2, 3, 4, tzinfo=timezone.utc), 1)),
+        (
+            ('day', 'uid', 'score', 'flag', 'id'),
+            (date(2024, 2, 29), UUID(int=2**128 - 1), 0.5, True, 2**63 - 1),
+        ),
+    ],
+)
+def test_struct_codec_roundtrip(fields, values):
+    # act
+    token = _struct_codec.encode(values, fields)
+    decoded = _struct_codec.decode(token, fields)
+    # assert
+    assert decoded == values
+    assert len(token) <= len(MsgpackCursorCodec().encode(values, fields))
+
+
+def test_struct_codec_decodes_datetime_in_utc():
+    # arrange
+    created = datetime(2020, 1, 1, 3, tzinfo=timezone(timedelta(hours=3)))
+    # act
+    token = _struct_codec.encode((created, 1), ('created', 'id'))
+    decoded_created, _ = _struct_codec.decode(token, ('created', 'id'))
+    # assert
+    assert decoded_created == created
+    assert decoded_created.tzinfo == timezone.utc
+
+
+@pytest.mark.parametrize(
+    ('token', 'detail'),
+    [
+        ('bad_value', 'Invalid base64 value'),
+        ('AQI=', 'Invalid cursor value'),
+    ],
+)
+def test_struct_codec_invalid_token(token, detail):
+    # act
+    with pytest.raises(CursorValueErr) as exc:
+        _struct_codec.decode(token, ('id',))
+    # assert
+    assert exc.value.detail == detail
+
+
+@pytest.mark.parametrize(
+    ('fields', 'values'),
+    [
+        (('id',), (2**64,)),
+        (('created', 'id'), (datetime(2020, 1, 1), 1)),  # noqa: DTZ001
+    ],
+    ids=['int_overflow', 'naive_datetime'],
+)
+def test_struct_codec_encode_err(fields, values):
+    # act
+    with pytest.raises(PaginationErr):
+        _struct_codec.encode(values, fields)
+
+
+def test_struct_codec_configuration_err():
+    # act
+    with pytest.raises(ConfigurationErr):
+        StructCursorCodec({'id': int, 'name': str})
+    with pytest.raises(ConfigurationErr):
+        _struct_codec.encode((1, 'a'), ('id', 'action'))
+
+
+async def test_pagination_with_struct_codec():
+    # arrange
+    now = utc_now()
+    p = InMemoryCursorPaginator[Any](
+        unq_field='id',
+        sort_fields={'id': 'id', 'created': 'created'},
+        codec=_struct_codec,
+    )
+    rows = [Log(i, '', now - timedelta(seconds=i % 3)) for i in range(1, 6)]
+    # act
+    p1 = await p.paginate(rows, '-created', size=2)
+    p2 = await p.paginate(rows, '-created', after=p1.next, size=2)
+    p3 = await p.paginate(rows, '-created', before=p2.prev, size=2)
+    # assert
+    assert [r.id for r in p1.rows] == [3, 4]
+    assert [r.id for r in p2.rows] == [1, 5]
+    assert p3.rows == p1.rows
@@ -0,0 +1,95 @@
+from typing import Any
+
+import pytest
+from paginate_any.cursor_pagination import InMemoryCursorPaginator
+from paginate_any.exc import CursorValueErr
+
+from ._data_structures import Log, utc_now
+
+
+pytest.importorskip('opentelemetry.sdk')
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture()
+def exporter_and_paginator():
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+    from paginate_any.ext.opentelemetry import OpenTelemetryInstrumentation
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    p = InMemoryCursorPaginator[Any](
+        'id',
+        {'id': 'id'},
+        instrumentation=OpenTelemetryInstrumentation(provider),
+    )
+    return exporter, p
+
+
+async def test_opentelemetry_instrumentation(exporter_and_paginator):
+    # arrange
+    exporter, p = exporter_and_paginator
+    now = utc_now()
+    rows = [Log(i, '', now) for i in range(1, 6)]
+    # act
+    await p.paginate(rows, size=2)
+    # assert
+    spans = {s.name: s for s in exporter.get_finished_spans()}
+    assert list(spans) == [
+        'paginate_any.make_cursor',
+        'paginate_any.fetch',
+        'paginate_any.trim',
+        'paginate_any.encode_cursor',
+        'paginate_any.paginate',
+    ]
+    root = spans['paginate_any.paginate']
+    assert {s.parent.span_id for n, s in spans.items() if s is not root} == {
+        root.context.span_id,
+    }
+    assert root.attributes == {
+        'paginate_any.page.size': 2,
+        'paginate_any.page.sort': 'id',
+        'paginate_any.rows.fetched': 4,
+        'paginate_any.rows.returned': 2,
+    }
+
+
+async def test_opentelemetry_page_cache(exporter_and_paginator):
+    from paginate_any.page_cache import CachedCursorPaginator, InProcessPageCache
+
+    # arrange
+    exporter, p = exporter_and_paginator
+    cached = CachedCursorPaginator(p, InProcessPageCache(), store_key=lambda _: 'logs')
+    rows = [Log(i, '', utc_now()) for i in range(1, 6)]
+    # act
+    await cached.paginate(rows, size=2)
+    await cached.paginate(rows, size=2)
+    # assert
+    hits = [
+        s.attributes['paginate_any.page_cache.hit']
+        for s in exporter.get_finished_spans()
+        if s.name == 'paginate_any.paginate'
+    ]
+    assert hits == [False, True]
+
+
+async def test_opentelemetry_cursor_err(exporter_and_paginator):
+    # arrange
+    exporter, p = exporter_and_paginator
+    # act
+    with pytest.raises(CursorValueErr):
+        await p.paginate([], after='bad_value')
+    # assert
+    make_cursor, paginate = exporter.get_finished_spans()
+    assert [e.name for e in make_cursor.events] == [
+        'paginate_any.cursor_error',
+        'exception',
+    ]
+    assert not make_cursor.status.is_ok
+    assert not paginate.status.is_ok
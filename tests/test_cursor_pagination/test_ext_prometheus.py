@@ -0,0 +1,66 @@
+from typing import Any
+
+import pytest
+from paginate_any.cursor_pagination import InMemoryCursorPaginator
+from paginate_any.exc import CursorValueErr
+
+from ._data_structures import Log, utc_now
+
+
+prometheus_client = pytest.importorskip('prometheus_client')
+
+pytestmark = pytest.mark.integration
+
+
+async def test_prometheus_instrumentation():
+    from paginate_any.ext.prometheus import PrometheusInstrumentation
+
+    # arrange
+    registry = prometheus_client.CollectorRegistry()
+    p = InMemoryCursorPaginator[Any](
+        'id',
+        {'id': 'id'},
+        instrumentation=PrometheusInstrumentation('pa', registry),
+    )
+    now = utc_now()
+    rows = [Log(i, '', now) for i in range(1, 6)]
+    # act
+    page = await p.paginate(rows, size=2)
+    await p.paginate(rows, after=page.next, size=4)
+    with pytest.raises(CursorValueErr):
+        await p.paginate(rows, after='bad_value')
+    # assert
+    get = registry.get_sample_value
+    assert get('pa_stage_seconds_count', {'stage': 'paginate'}) == 3
+    assert get('pa_stage_seconds_count', {'stage': 'fetch'}) == 2
+    assert get('pa_stage_seconds_count', {'stage': 'count'}) is None
+    assert get('pa_page_size_bucket', {'le': '1.0'}) == 0
+    assert get('pa_page_size_bucket', {'le': '5.0'}) == 2
+    assert get('pa_page_size_sum') == 6
+    assert get('pa_rows_fetched_total') == 4 + 4
+    assert get('pa_rows_returned_total') == 2 + 3
+    assert get('pa_cursor_errors_total') == 1
+
+
+async def test_prometheus_page_cache():
+    from paginate_any.ext.prometheus import PrometheusInstrumentation
+    from paginate_any.page_cache import CachedCursorPaginator, InProcessPageCache
+
+    # arrange
+    registry = prometheus_client.CollectorRegistry()
+    p = InMemoryCursorPaginator[Any](
+        'id',
+        {'id': 'id'},
+        instrumentation=PrometheusInstrumentation('pa', registry),
+    )
+    cached = CachedCursorPaginator(p, InProcessPageCache(), store_key=lambda _: 'logs')
+    rows = [Log(i, '', utc_now()) for i in range(1, 6)]
+    # act
+    for _ in range(3):
+        await cached.paginate(rows, size=2)
+    # assert
+    get = registry.get_sample_value
+    assert get('pa_page_cache_total', {'result': 'miss'}) == 1
+    assert get('pa_page_cache_total', {'result': 'hit'}) == 2
+    assert get('pa_stage_seconds_count', {'stage': 'paginate'}) == 3
+    assert get('pa_stage_seconds_count', {'stage': 'fetch'}) == 1
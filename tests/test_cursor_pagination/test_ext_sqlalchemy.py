@@ -0,0 +1,625 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+import pytest_asyncio
+from paginate_any.datastruct import CurrentCursor, Ordering
+
+
+sqlalchemy = pytest.importorskip('sqlalchemy')
+
+pytestmark = [pytest.mark.integration, pytest.mark.sqlalchemy]
+
+
+def _cursor(
+    direction: Ordering,
+    *,
+    inclusive: bool = True,
+    id_direction: Ordering | None = None,
+) -> CurrentCursor:
+    return CurrentCursor(
+        before=None,
+        after=('a', 1),
+        size=2,
+        sort_fields=('action', 'id'),
+        sort_direction=direction,
+        inclusive=inclusive,
+        sort_directions=(direction, id_direction) if id_direction else None,
+    )
+
+
+@pytest.mark.parametrize(
+    ('predicate', 'dialect', 'cursor', 'expected'),
+    [
+        (
+            'auto',
+            'sqlite',
+            _cursor(Ordering.ASC),
+            '(logs.action, logs.id) >= (:param_1, :param_2)',
+        ),
+        (
+            'auto',
+            'mysql',
+            _cursor(Ordering.ASC),
+            'logs.action >= :action_1 AND (logs.action > :action_2'
+            ' OR logs.action = :action_3 AND logs.id >= :id_1)',
+        ),
+        (
+            'expanded',
+            'sqlite',
+            _cursor(Ordering.DESC, inclusive=False),
+            'logs.action <= :action_1 AND (logs.action < :action_2'
+            ' OR logs.action = :action_3 AND logs.id < :id_1)',
+        ),
+        (
+            'row_value',
+            'sqlite',
+            _cursor(Ordering.DESC, id_direction=Ordering.ASC),
+            'logs.action <= :action_1 AND (logs.action < :action_2'
+            ' OR logs.action = :action_3 AND logs.id >= :id_1)',
+        ),
+        (
+            'row_value',
+            'mysql',
+            _cursor(Ordering.DESC, inclusive=False),
+            '(logs.action, logs.id) < (:param_1, :param_2)',
+        ),
+    ],
+)
+def test_keyset_predicate(predicate, dialect, cursor, expected):
+    from paginate_any.ext.sqlalchemy import KeysetPredicate, SQLAlchemyCursorPaginator
+
+    from ._ext_sqlalchemy import SALog
+
+    # arrange
+    p = SQLAlchemyCursorPaginator[SALog](
+        unq_field='id',
+        sort_fields={'id': SALog.id, 'action': SALog.action},
+        predicate=KeysetPredicate(predicate),
+    )
+    # act
+    sql = str(p._make_sql_cursor(cursor, dialect))
+    # assert
+    assert sql == expected
+
+
+def test_order_by_mixed_directions():
+    from paginate_any.ext.sqlalchemy import SQLAlchemyCursorPaginator
+
+    from ._ext_sqlalchemy import SALog
+
+    # arrange
+    p = SQLAlchemyCursorPaginator[SALog](
+        unq_field='id',
+        sort_fields={'id': SALog.id, 'action': SALog.action},
+    )
+    cursor = _cursor(Ordering.DESC, id_direction=Ordering.ASC)
+    # act
+    order_by = [str(f.compile()) for f in p._order_by_fields(cursor)]
+    # assert
+    assert order_by == ['logs.action DESC', 'logs.id']
+
+
+def test_init__invalid_yield_per():
+    from paginate_any.exc import ConfigurationErr
+    from paginate_any.ext.sqlalchemy import SQLAlchemyCursorPaginator
+
+    from ._ext_sqlalchemy import SALog
+
+    # act
+    with pytest.raises(ConfigurationErr):
+        SQLAlchemyCursorPaginator[SALog](
+            unq_field='id',
+            sort_fields={'id': SALog.id},
+            yield_per=0,
+        )
+
+
+async def test_iterate_streams_rows(sqlalchemy_stream_p_factory, mocker):
+    # arrange
+    factory = sqlalchemy_stream_p_factory
+    for i in range(1, 6):
+        await factory.create_log(i)
+    session = factory.rows_store[0]
+    stream_scalars = mocker.spy(session, 'stream_scalars')
+    scalars = mocker.spy(session, 'scalars')
+    # act
+    ids = [r.id async for r in factory.p.iterate(factory.rows_store, size=2)]
+    # assert
+    assert ids == [1, 2, 3, 4, 5]
+    assert stream_scalars.call_count == 3
+    assert scalars.call_count == 0
+
+
+async def test_paginate_window_single_query(sqlalchemy_p_factory, mocker):
+    # arrange
+    factory = sqlalchemy_p_factory
+    for i in range(1, 8):
+        await factory.create_log(i)
+    scalars = mocker.spy(factory.rows_store[0], 'scalars')
+    # act
+    window = await factory.p.paginate_window(factory.rows_store, ahead=2)
+    # assert
+    assert [[r.id for r in page.rows] for page in window.pages] == [
+        [1, 2],
+        [3, 4],
+        [5, 6],
+    ]
+    assert window.ahead[-1].next is not None
+    assert scalars.call_count == 1
+    assert scalars.call_args.args[0]._limit == 8
+
+
+@pytest.mark.parametrize('yield_per', [None, 2])
+async def test_column_projection(yield_per, sqlalchemy_p_factory):
+    from sqlalchemy import Row, select
+
+    from ._ext_sqlalchemy import SALog
+
+    # arrange
+    factory = sqlalchemy_p_factory
+    for i in range(1, 6):
+        await factory.create_log(i, 'AB'[i % 2])
+    factory.paginator_kwargs['yield_per'] = yield_per
+    store = (factory.rows_store[0], select(SALog.action, SALog.id))
+    p = factory.p
+    # act
+    p1 = await p.paginate(store, 'action')
+    p2 = await p.paginate(store, 'action', after=p1.next)
+    p3 = await p.paginate(store, 'action', before=p2.prev)
+    ids = [r.id async for r in p.iterate(store, 'action')]
+    # assert
+    assert all(isinstance(r, Row) for r in p1.rows)
+    assert [tuple(r) for r in p1.rows] == [('A', 2), ('A', 4)]
+    assert [tuple(r) for r in p2.rows] == [('B', 1), ('B', 3)]
+    assert p3.rows == p1.rows
+    assert ids == [2, 4, 1, 3, 5]
+
+
+@pytest.mark.parametrize('yield_per', [None, 2])
+async def test_entity_with_extra_columns(yield_per, sqlalchemy_p_factory):
+    from sqlalchemy import func, select
+
+    from ._ext_sqlalchemy import SALog
+
+    # arrange
+    factory = sqlalchemy_p_factory
+    for i in range(1, 4):
+        await factory.create_log(i, 'A' * i)
+    factory.paginator_kwargs['yield_per'] = yield_per
+    session = factory.rows_store[0]
+    stmts = [
+        select(SALog).add_columns(func.length(SALog.action)),
+        select(SALog, SALog.action),
+    ]
+    p = factory.p
+    for stmt in stmts:
+        # act
+        p1 = await p.paginate((session, stmt), '-action')
+        p2 = await p.paginate((session, stmt), '-action', after=p1.next)
+        # assert
+        assert all(isinstance(r, SALog) for r in p1.rows)
+        assert [r.id for r in p1.rows + p2.rows] == [3, 2, 1]
+
+
+async def test_column_projection_row_factory(sqlalchemy_p_factory):
+    import msgspec
+    from sqlalchemy import select
+
+    from ._ext_sqlalchemy import SALog
+
+    class LogItem(msgspec.Struct):
+        id: int
+        action: str
+
+    # arrange
+    factory = sqlalchemy_p_factory
+    for i in range(1, 4):
+        await factory.create_log(i, 'AB'[i % 2])
+    factory.paginator_kwargs['row_factory'] = LogItem
+    store = (factory.rows_store[0], select(SALog.id, SALog.action))
+    # act
+    page = await factory.p.paginate(store, '-action')
+    # assert
+    assert page.rows == [LogItem(3, 'B'), LogItem(1, 'B')]
+    assert page.next is not None
+
+
+@pytest.mark.parametrize('yield_per', [None, 2])
+async def test_slow_page_detector(yield_per, sqlalchemy_p_factory):
+    from paginate_any.ext.sqlalchemy import SlowPage, SlowPageDetector
+
+    # arrange
+    factory = sqlalchemy_p_factory
+    for i in range(1, 6):
+        await factory.create_log(i, 'AB'[i % 2])
+    slow: list[SlowPage] = []
+    detector = SlowPageDetector(threshold=0, maxlen=2, on_slow=slow.append)
+    factory.paginator_kwargs.update(slow_pages=detector, yield_per=yield_per)
+    p = factory.p
+    # act
+    p1 = await p.paginate(factory.rows_store, '-action')
+    p2 = await p.paginate(factory.rows_store, '-action', after=p1.next)
+    p3 = await p.paginate(factory.rows_store, '-action', after=p2.next)
+    # assert
+    assert len(slow) == 3
+    assert detector.records == slow[1:]
+    record = detector.records[-1]
+    assert record.cursor == p3.cursor_params
+    assert record.rows == 2
+    assert record.seconds >= 0
+    assert 'WHERE (logs.action, logs.id) <= (' in record.sql
+    assert 'ORDER BY logs.action DESC, logs.id DESC' in record.sql
+    assert {'A', 4} <= set(record.params.values())
+
+
+async def test_slow_page_detector_threshold(sqlalchemy_p_factory):
+    from paginate_any.ext.sqlalchemy import SlowPageDetector
+
+    # arrange
+    factory = sqlalchemy_p_factory
+    await factory.create_log(1)
+    detector = SlowPageDetector(threshold=60)
+    factory.paginator_kwargs['slow_pages'] = detector
+    # act
+    page = await factory.paginate()
+    # assert
+    assert len(page.rows) == 1
+    assert detector.records == []
+
+
+@pytest.mark.parametrize('kwargs', [{'threshold': -1}, {'maxlen': 0}])
+def test_slow_page_detector_configuration_err(kwargs):
+    from paginate_any.exc import ConfigurationErr
+    from paginate_any.ext.sqlalchemy import SlowPageDetector
+
+    # act
+    with pytest.raises(ConfigurationErr):
+        SlowPageDetector(**kwargs)
+
+
+async def test_query_limiter(sqlalchemy_p_factory, mocker):
+    from paginate_any.datastruct import CountStrategy
+    from paginate_any.limiter import QueryLimiter
+
+    # arrange
+    factory = sqlalchemy_p_factory
+    for i in range(1, 6):
+        await factory.create_log(i)
+    limiter = QueryLimiter(max_concurrency=1, timeout=5)
+    run = mocker.spy(QueryLimiter, 'run')
+    factory.paginator_kwargs.update(
+        limiter=limiter,
+        strict_cursor=True,
+        count=CountStrategy(),
+    )
+    p = factory.p
+    # act
+    p1 = await p.paginate(factory.rows_store)
+    p2 = await p.paginate(factory.rows_store, after=p1.next)
+    # assert
+    assert [r.id for r in p2.rows] == [3, 4]
+    assert p2.total is not None
+    # Two pages, a cached count and a probe behind the strict cursor
+    assert run.call_count == 4
+
+
+async def test_query_limiter_timeout(sqlalchemy_p_factory, mocker):
+    from paginate_any.exc import PaginationTimeoutErr
+    from paginate_any.ext.sqlalchemy import SQLAlchemyCursorPaginator
+    from paginate_any.limiter import QueryLimiter
+
+    # arrange
+    factory = sqlalchemy_p_factory
+    factory.paginator_kwargs['limiter'] = QueryLimiter(timeout=0.01)
+    query_page = SQLAlchemyCursorPaginator._query_page
+
+    async def slow_query_page(*args):
+        await asyncio.sleep(1)
+        return await query_page(*args)
+
+    mocker.patch.object(SQLAlchemyCursorPaginator, '_query_page', slow_query_page)
+    # act
+    with pytest.raises(PaginationTimeoutErr):
+        await factory.paginate()
+
+
+async def test_query_limiter_timeout_slow_page(sqlalchemy_p_factory, mocker):
+    from paginate_any.exc import PaginationTimeoutErr
+    from paginate_any.ext.sqlalchemy import SlowPageDetector, SQLAlchemyCursorPaginator
+    from paginate_any.limiter import QueryLimiter
+
+    # arrange
+    factory = sqlalchemy_p_factory
+    detector = SlowPageDetector(threshold=0)
+    factory.paginator_kwargs.update(
+        limiter=QueryLimiter(timeout=0.01),
+        slow_pages=detector,
+    )
+
+    async def slow_query_page(*args):
+        await asyncio.sleep(1)
+
+    mocker.patch.object(SQLAlchemyCursorPaginator, '_query_page', slow_query_page)
+    # act
+    with pytest.raises(PaginationTimeoutErr):
+        await factory.paginate()
+    # assert
+    (record,) = detector.records
+    assert record.error == 'CancelledError'
+    assert record.rows == 0
+    assert record.seconds >= 0.01
+
+
+def test_estimate_stmt_bound_params():
+    from paginate_any.ext.sqlalchemy import SQLAlchemyCursorPaginator
+    from sqlalchemy import create_mock_engine, select
+
+    from ._ext_sqlalchemy import SALog
+
+    # arrange
+    dialect = create_mock_engine('postgresql://', None).dialect
+    stmt = select(SALog).where(SALog.action == 'login :user').order_by(SALog.id)
+    # act
+    estimate_stmt = SQLAlchemyCursorPaginator._make_estimate_stmt(stmt, dialect)
+    # assert
+    assert estimate_stmt is not None
+    compiled = estimate_stmt.compile(dialect=dialect)
+    assert str(compiled).startswith('EXPLAIN (FORMAT JSON) SELECT')
+    assert 'ORDER BY' not in str(compiled)
+    assert list(compiled.params.values()) == ['login :user']
+
+
+def test_statement_timeout_mysql_hint():
+    from paginate_any.ext.sqlalchemy import SQLAlchemyCursorPaginator
+    from paginate_any.limiter import QueryLimiter
+    from sqlalchemy import select
+    from sqlalchemy.dialects import mysql
+
+    from ._ext_sqlalchemy import SALog
+
+    # arrange
+    p = SQLAlchemyCursorPaginator[SALog](
+        unq_field='id',
+        sort_fields={'id': SALog.id},
+        limiter=QueryLimiter(timeout=1.5),
+    )
+    cursor = p._make_cursor(None, None, None)
+    # act
+    sql, sqlite_sql = (
+        str(p._make_page_stmt(select(SALog), cursor, name).compile(dialect=dialect))
+        for name, dialect in [('mysql', mysql.dialect()), ('sqlite', None)]
+    )
+    # assert
+    assert sql.startswith('SELECT /*+ MAX_EXECUTION_TIME(1500) */ logs.id')
+    assert 'MAX_EXECUTION_TIME' not in sqlite_sql
+
+
+@pytest_asyncio.fixture()
+async def emulated_pg(tmp_path, mocker) -> AsyncGenerator[tuple[Any, list[str]], None]:
+    """SQLite engine, which pretends to be PostgreSQL with the setting functions."""
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from ._ext_sqlalchemy import Base
+
+    settings = {'statement_timeout': '0'}
+    changes: list[str] = []
+
+    def set_config(name: str, value: str, is_local: int) -> str:
+        assert is_local
+        changes.append(value)
+        settings[name] = value
+        return value
+
+    engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path}/logs.db')
+
+    @event.listens_for(engine.sync_engine, 'connect')
+    def add_functions(dbapi_conn, _):
+        dbapi_conn.create_function('current_setting', 1, settings.__getitem__)
+        dbapi_conn.create_function('set_config', 3, set_config)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    mocker.patch.object(engine.sync_engine.dialect, 'name', 'postgresql')
+    yield engine, changes
+    await engine.dispose()
+
+
+def _timeout_paginator() -> Any:
+    from paginate_any.ext.sqlalchemy import SQLAlchemyCursorPaginator
+    from paginate_any.limiter import QueryLimiter
+
+    from ._ext_sqlalchemy import SALog
+
+    return SQLAlchemyCursorPaginator[SALog](
+        unq_field='id',
+        sort_fields={'id': SALog.id},
+        limiter=QueryLimiter(timeout=1.5),
+    )
+
+
+async def test_statement_timeout_postgresql(emulated_pg):
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from ._data_structures import utc_now
+    from ._ext_sqlalchemy import SALog
+
+    # arrange
+    engine, changes = emulated_pg
+    p = _timeout_paginator()
+    async with AsyncSession(engine) as session:
+        session.add(SALog(id=1, action='', created=utc_now()))
+        await session.flush()
+        # act
+        page = await p.paginate((session, select(SALog)))
+    # assert
+    assert [r.id for r in page.rows] == [1]
+    assert changes == ['1500', '0']
+
+
+@pytest.mark.parametrize(
+    ('err', 'expected_changes'),
+    [
+        (TypeError('Bad row factory'), ['1500', '0']),
+        # The aborted transaction rejects the restore, its rollback drops the value
+        (sqlalchemy.exc.OperationalError('SELECT', None, Exception()), ['1500']),
+        (asyncio.CancelledError(), ['1500']),
+    ],
+    ids=['page_err', 'db_err', 'cancelled'],
+)
+async def test_statement_timeout_postgresql_err(
+    err,
+    expected_changes,
+    emulated_pg,
+    mocker,
+):
+    from paginate_any.ext.sqlalchemy import SQLAlchemyCursorPaginator
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from ._ext_sqlalchemy import SALog
+
+    # arrange
+    engine, changes = emulated_pg
+    p = _timeout_paginator()
+    mocker.patch.object(SQLAlchemyCursorPaginator, '_execute_page', side_effect=err)
+    async with AsyncSession(engine) as session:
+        # act
+        with pytest.raises(type(err)):
+            await p.paginate((session, select(SALog)))
+    # assert
+    assert changes == expected_changes
+
+
+@pytest.mark.parametrize(
+    ('orig_attrs', 'expected_err'),
+    [
+        ({'sqlstate': '57014'}, 'PaginationTimeoutErr'),
+        ({'pgcode': '57014'}, 'PaginationTimeoutErr'),
+        ({'args': (3024, 'Query execution was interrupted')}, 'PaginationTimeoutErr'),
+        ({'sqlstate': '40001'}, 'DBAPIError'),
+    ],
+)
+async def test_statement_timeout_err(
+    orig_attrs,
+    expected_err,
+    sqlalchemy_p_factory,
+    mocker,
+):
+    from paginate_any.ext.sqlalchemy import SQLAlchemyCursorPaginator
+    from paginate_any.limiter import QueryLimiter
+    from sqlalchemy.exc import DBAPIError
+
+    # arrange
+    orig = Exception()
+    for name, value in orig_attrs.items():
+        setattr(orig, name, value)
+    mocker.patch.object(
+        SQLAlchemyCursorPaginator,
+        '_query_page',
+        side_effect=DBAPIError('SELECT', {}, orig),
+    )
+    factory = sqlalchemy_p_factory
+    factory.paginator_kwargs['limiter'] = QueryLimiter(timeout=1, retry_after=3)
+    # act
+    with pytest.raises(Exception) as exc_info:  # noqa: PT011
+        await factory.paginate()
+    # assert
+    assert type(exc_info.value).__name__ == expected_err
+    assert getattr(exc_info.value, 'retry_after', 3) == 3
+
+
+async def test_session_bound_per_mapper(tmp_path):
+    from paginate_any.datastruct import CountMode, CountStrategy, PageTotal
+    from paginate_any.ext.sqlalchemy import SlowPageDetector, SQLAlchemyCursorPaginator
+    from paginate_any.ext.sqlalchemy_advisor import check_keyset_indexes
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from ._data_structures import utc_now
+    from ._ext_sqlalchemy import Base, SALog
+
+    # arrange
+    engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path}/logs.db')
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    detector = SlowPageDetector(threshold=0)
+    p = SQLAlchemyCursorPaginator[SALog](
+        unq_field='id',
+        sort_fields={'id': SALog.id},
+        default_size=2,
+        strict_cursor=True,
+        count=CountStrategy(CountMode.estimate),
+        slow_pages=detector,
+    )
+    async with AsyncSession(binds={Base: engine}) as session:
+        session.add_all(SALog(id=i, action='', created=utc_now()) for i in range(1, 6))
+        await session.flush()
+        store = (session, select(SALog))
+        # act
+        p1 = await p.paginate(store)
+        p2 = await p.paginate(store, after=p1.next)
+        ids = [r.id async for r in p.iterate(store)]
+        reports = await check_keyset_indexes(p, store, sorts=['id'])
+    await engine.dispose()
+    # assert
+    assert [r.id for r in p2.rows] == [3, 4]
+    assert p2.prev is not None
+    assert p2.total == PageTotal(5)
+    assert ids == [1, 2, 3, 4, 5]
+    assert detector.records[0].cursor == p1.cursor_params
+    assert reports[0].ok
+
+
+async def test_paginate_many_batch_session(tmp_path):
+    from paginate_any.cursor_pagination import PageRequest
+    from paginate_any.ext.sqlalchemy import SQLAlchemyCursorPaginator
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import (
+        AsyncSession,
+        async_sessionmaker,
+        create_async_engine,
+    )
+
+    from ._data_structures import utc_now
+    from ._ext_sqlalchemy import Base, SALog
+
+    # arrange
+    engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path}/logs.db')
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    make_session = async_sessionmaker(engine)
+    async with make_session() as s, s.begin():
+        s.add_all(SALog(id=i, action='AB'[i % 2], created=utc_now()) for i in range(1, 6))
+    sessions: list[AsyncSession] = []
+
+    def batch_session() -> AsyncSession:
+        sessions.append(session := make_session())
+        return session
+
+    p = SQLAlchemyCursorPaginator[SALog](
+        unq_field='id',
+        sort_fields={'id': SALog.id},
+        default_size=2,
+        strict_cursor=True,
+        batch_session=batch_session,
+    )
+    async with make_session() as session:
+        first = await p.paginate((session, select(SALog)))
+        requests = [
+            PageRequest((session, select(SALog))),
+            PageRequest((session, select(SALog).where(SALog.action == 'A'))),
+            PageRequest((session, select(SALog)), after=first.next),
+        ]
+        # act
+        pages = await p.paginate_many(requests)
+    await engine.dispose()
+    # assert
+    assert [[r.id for r in page.rows] for page in pages] == [[1, 2], [2, 4], [3, 4]]
+    assert pages[2].prev is not None
+    # Three pages and a probe behind the strict cursor
+    assert len(sessions) == 4
+    assert session not in sessions
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from paginate_any.exc import ConfigurationErr, PaginationTimeoutErr
+from paginate_any.limiter import QueryLimiter
+
+
+async def test_limiter_concurrency():
+    # arrange
+    limiter = QueryLimiter(max_concurrency=2)
+    running, max_running = 0, 0
+    release = asyncio.Event()
+
+    async def query(i: int) -> int:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await release.wait()
+        running -= 1
+        return i
+
+    # act
+    tasks = [asyncio.create_task(limiter.run(query, i)) for i in range(5)]
+    await asyncio.sleep(0)
+    queue_depth = limiter.queue_depth
+    release.set()
+    results = await asyncio.gather(*tasks)
+    # assert
+    assert results == [0, 1, 2, 3, 4]
+    assert max_running == 2
+    assert queue_depth == 3
+    assert limiter.queue_depth == 0
+
+
+@pytest.mark.parametrize('max_concurrency', [None, 1])
+async def test_limiter_timeout(max_concurrency):
+    # arrange
+    limiter = QueryLimiter(max_concurrency, timeout=0.01, retry_after=3)
+    cancelled = asyncio.Event()
+
+    async def query() -> None:
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    # act
+    with pytest.raises(PaginationTimeoutErr) as exc:
+        await limiter.run(query)
+    # assert
+    assert exc.value.retry_after == 3
+    assert cancelled.is_set()
+
+
+async def test_limiter_timeout_in_queue():
+    # arrange
+    limiter = QueryLimiter(max_concurrency=1)
+    release = asyncio.Event()
+
+    async def query() -> str:
+        return 'done'
+
+    busy = asyncio.create_task(limiter.run(release.wait))
+    await asyncio.sleep(0)
+    limiter.timeout = 0.01
+    # act
+    with pytest.raises(PaginationTimeoutErr):
+        await limiter.run(query)
+    queue_depth = limiter.queue_depth
+    release.set()
+    await busy
+    result = await limiter.run(query)
+    # assert
+    assert queue_depth == 0
+    assert result == 'done'
+
+
+@pytest.mark.parametrize('kwargs', [{'max_concurrency': 0}, {'timeout': 0}])
+def test_limiter_configuration_err(kwargs):
+    # act
+    with pytest.raises(ConfigurationErr):
+        QueryLimiter(**kwargs)
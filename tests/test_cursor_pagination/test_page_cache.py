@@ -0,0 +1,262 @@
+import asyncio
+from typing import Any
+
+import pytest
+from paginate_any.cursor_pagination import InMemoryCursorPaginator
+from paginate_any.exc import ConfigurationErr, PaginationErr
+from paginate_any.instrumentation import Stage
+from paginate_any.page_cache import (
+    CachedCursorPaginator,
+    InProcessPageCache,
+    PageCacheBackend,
+    RedisPageCache,
+)
+
+from ._data_structures import Log, RecordingInstrumentation, utc_now
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, name: str) -> bytes | None:
+        return self.data.get(name)
+
+    async def set(self, name: str, value: bytes, px: int | None = None) -> None:
+        self.data[name] = value
+
+    async def incr(self, name: str) -> int:
+        value = int(self.data.get(name, b'0')) + 1
+        self.data[name] = str(value).encode()
+        return value
+
+
+@pytest.fixture(params=['in_process', 'redis'])
+def backend(request: pytest.FixtureRequest) -> PageCacheBackend:
+    if request.param == 'redis':
+        return RedisPageCache(_FakeRedis())
+    return InProcessPageCache()
+
+
+@pytest.fixture()
+def logs() -> list[Log]:
+    now = utc_now()
+    return [Log(i, 'AB'[i % 2], now) for i in range(1, 6)]
+
+
+def _make_cached(backend: PageCacheBackend, mocker: Any) -> tuple[Any, Any]:
+    p = InMemoryCursorPaginator[Log](unq_field='id', sort_fields={'id': 'id'})
+    spy = mocker.spy(p, '_paginate_data')
+    return CachedCursorPaginator(p, backend, store_key=lambda _: 'logs'), spy
+
+
+async def test_cache_hit(backend, logs, mocker):
+    # arrange
+    cached, spy = _make_cached(backend, mocker)
+    # act
+    p1 = await cached.paginate(logs, '-id', size=2)
+    p1_again = await cached.paginate(logs, '-id', size=2)
+    p2 = await cached.paginate(logs, '-id', after=p1.next, size=2)
+    p2_again = await cached.paginate(logs, '-id', after=p1.next, size=2)
+    # assert
+    assert p1_again == p1
+    assert p2_again == p2
+    assert [r.id for r in p2.rows] == [3, 2]
+    assert spy.call_count == 2
+
+
+@pytest.mark.parametrize('by_store', [True, False])
+async def test_invalidate(by_store, backend, logs, mocker):
+    # arrange
+    cached, spy = _make_cached(backend, mocker)
+    await cached.paginate(logs)
+    logs.append(Log(6, 'A', utc_now()))
+    # act
+    stale = await cached.paginate(logs)
+    await cached.invalidate(logs if by_store else None)
+    fresh = await cached.paginate(logs)
+    # assert
+    assert len(stale.rows) == 5
+    assert len(fresh.rows) == 6
+    assert spy.call_count == 2
+
+
+async def test_in_process_generations_overflow(logs):
+    # arrange
+    p = InMemoryCursorPaginator[Log](unq_field='id', sort_fields={'id': 'id'})
+    backend = InProcessPageCache(maxsize=2)
+    cached = CachedCursorPaginator(p, backend, store_key=lambda rows: next(iter(rows)).id)
+    await cached.paginate(logs)
+    logs.append(Log(6, 'A', utc_now()))
+    # act
+    await cached.invalidate(logs)
+    for i in range(1, 3):
+        await cached.invalidate(logs[i:])
+    page = await cached.paginate(logs)
+    # assert
+    assert len(backend._generations) == 2
+    assert len(page.rows) == 6
+
+
+async def test_no_store_key(logs, mocker):
+    # arrange
+    p = InMemoryCursorPaginator[Log](unq_field='id', sort_fields={'id': 'id'})
+    spy = mocker.spy(p, '_paginate_data')
+    cached = CachedCursorPaginator(p, InProcessPageCache())
+    # act
+    await cached.paginate(logs)
+    await cached.paginate(logs)
+    # assert
+    assert spy.call_count == 2
+
+
+async def test_instrumentation(logs):
+    # arrange
+    i = RecordingInstrumentation()
+    p = InMemoryCursorPaginator[Log](
+        unq_field='id',
+        sort_fields={'id': 'id'},
+        instrumentation=i,
+    )
+    cached = CachedCursorPaginator(p, InProcessPageCache(), store_key=lambda _: 'logs')
+    # act
+    await cached.paginate(logs, size=2)
+    await cached.paginate(logs, size=2)
+    # assert
+    assert i.cache_hits == [False, True]
+    assert i.stages == [
+        Stage.make_cursor,
+        Stage.fetch,
+        Stage.trim,
+        Stage.encode_cursor,
+        Stage.paginate,
+        Stage.make_cursor,
+        Stage.paginate,
+    ]
+    assert i.pages == [(2, 4, 2)]
+
+
+async def test_stampede_protection(logs, mocker):
+    # arrange
+    p = InMemoryCursorPaginator[Log](unq_field='id', sort_fields={'id': 'id'})
+    paginate_data = p._paginate_data
+
+    async def slow_paginate_data(*args: Any) -> list[Log]:
+        await asyncio.sleep(0.01)
+        return await paginate_data(*args)
+
+    spy = mocker.patch.object(p, '_paginate_data', side_effect=slow_paginate_data)
+    cached = CachedCursorPaginator(p, InProcessPageCache(), store_key=lambda _: 'logs')
+    # act
+    pages = await asyncio.gather(*(cached.paginate(logs) for _ in range(5)))
+    # assert
+    assert spy.call_count == 1
+    assert all(page == pages[0] for page in pages)
+
+
+async def test_stampede_protection__err(logs, mocker):
+    # arrange
+    cached, spy = _make_cached(InProcessPageCache(), mocker)
+
+    async def fail(*_: Any) -> list[Log]:
+        await asyncio.sleep(0.01)
+        raise PaginationErr
+
+    spy.side_effect = fail
+    # act
+    results = await asyncio.gather(
+        *(cached.paginate(logs) for _ in range(3)),
+        return_exceptions=True,
+    )
+    # assert
+    assert all(isinstance(r, PaginationErr) for r in results)
+    assert spy.call_count == 1
+    assert cached._inflight == {}
+
+
+async def test_stampede_protection__loader_cancelled(logs, mocker):
+    # arrange
+    cached, spy = _make_cached(InProcessPageCache(), mocker)
+    started = asyncio.Event()
+
+    async def slow_paginate_data(*args: Any) -> list[Log]:
+        started.set()
+        await asyncio.sleep(0.01)
+        return await InMemoryCursorPaginator._paginate_data(cached._paginator, *args)
+
+    spy.side_effect = slow_paginate_data
+    loader = asyncio.create_task(cached.paginate(logs))
+    await started.wait()
+    waiters = [asyncio.create_task(cached.paginate(logs)) for _ in range(2)]
+    await asyncio.sleep(0)
+    # act
+    loader.cancel()
+    pages = await asyncio.gather(*waiters)
+    # assert
+    assert loader.cancelled()
+    assert [len(page.rows) for page in pages] == [5, 5]
+    assert spy.call_count == 2
+    assert cached._inflight == {}
+
+
+@pytest.mark.integration()
+@pytest.mark.sqlalchemy()
+async def test_sqlalchemy_store_fingerprint(tmp_path, mocker):
+    pytest.importorskip('sqlalchemy')
+    from paginate_any.ext.sqlalchemy import SQLAlchemyCursorPaginator
+    from sqlalchemy import Row, select
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from ._ext_sqlalchemy import Base, SALog
+
+    # arrange
+    engines = [
+        create_async_engine(f'sqlite+aiosqlite:///{tmp_path}/{name}.db')
+        for name in ('logs', 'other_logs')
+    ]
+    for n, engine in enumerate(engines, 1):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as s, s.begin():
+            s.add_all(SALog(id=i, action='A', created=utc_now()) for i in range(1, n + 2))
+    p = SQLAlchemyCursorPaginator[Any](unq_field='id', sort_fields={'id': SALog.id})
+    execute = mocker.spy(AsyncSession, 'execute')
+    cached = CachedCursorPaginator(p, InProcessPageCache())
+    stmt = select(SALog.id, SALog.action)
+    # act
+    pages = []
+    for engine in (engines[0], engines[0], engines[1]):
+        async with AsyncSession(engine) as session, session.begin():
+            pages.append(await cached.paginate((session, stmt)))
+    for engine in engines:
+        await engine.dispose()
+    # assert
+    first, cached_first, other = pages
+    assert all(isinstance(r, Row) for r in cached_first.rows)
+    assert [(r.id, r.action) for r in cached_first.rows] == [(1, 'A'), (2, 'A')]
+    assert [r.id for r in other.rows] == [1, 2, 3]
+    assert execute.call_count == 2
+
+
+async def test_sqlalchemy_entities_need_store_key(sqlalchemy_p_factory):
+    # arrange
+    cached = CachedCursorPaginator(sqlalchemy_p_factory.p, InProcessPageCache())
+    with_key = CachedCursorPaginator(
+        sqlalchemy_p_factory.p,
+        InProcessPageCache(),
+        store_key=lambda _: 'logs',
+    )
+    # act
+    with pytest.raises(ConfigurationErr):
+        await cached.paginate(sqlalchemy_p_factory.rows_store)
+    page = await with_key.paginate(sqlalchemy_p_factory.rows_store)
+    # assert
+    assert page.rows == []
+
+
+def test_init__invalid_ttl():
+    # arrange
+    p = InMemoryCursorPaginator[Log](unq_field='id', sort_fields={'id': 'id'})
+    # act
+    with pytest.raises(ConfigurationErr):
+        CachedCursorPaginator(p, InProcessPageCache(), ttl=0)
@@ -1,29 +1,44 @@
 import base64
-from collections.abc import AsyncGenerator
+import random
+from collections import namedtuple
 from functools import partial
-from typing import TYPE_CHECKING, Any, cast
+from operator import attrgetter
+from typing import Any, cast
 
 import pytest
-import pytest_asyncio
-from paginate_any.cursor_pagination import InMemoryCursorPaginator
+from paginate_any.cursor_pagination import (
+    CursorPaginator,
+    IndexedRowsStore,
+    InMemoryCursorPaginator,
+    PageRequest,
+)
+from paginate_any.datastruct import (
+    CountMode,
+    CountStrategy,
+    CursorPaginationPage,
+    PageTotal,
+    TotalRelation,
+)
 from paginate_any.exc import (
     ConfigurationErr,
     CursorParamsErr,
     CursorValueErr,
     MultipleCursorsErr,
     PaginationErr,
+    SortParamErr,
 )
+from paginate_any.instrumentation import Stage
 
 from ._data_structures import (
+    IndexedInMemoryLogPaginatorFactory,
     InMemoryLogPaginatorFactory,
+    Log,
     LogPaginatorFactory,
+    RecordingInstrumentation,
+    utc_now,
 )
 
 
-if TYPE_CHECKING:
-    from ._ext_sqlalchemy import SQLAlchemyLogPaginatorFactory
-
-
 @pytest.fixture()
 def in_memory_p_factory() -> InMemoryLogPaginatorFactory:
     return InMemoryLogPaginatorFactory(
@@ -33,51 +48,52 @@ def in_memory_p_factory() -> InMemoryLogPaginatorFactory:
     )
 
 
-@pytest_asyncio.fixture()
-async def sqlalchemy_p_factory() -> AsyncGenerator['SQLAlchemyLogPaginatorFactory', None]:
-    try:
-        import sqlalchemy  # noqa: F401
-    except ImportError as e:
-        pytest.skip(str(e))
-
-    from ._ext_sqlalchemy import (
-        create_db,
-        drop_db,
-        engine,
-        make_sqlalchemy_p_factory,
-        scoped_session_cls,
+@pytest.fixture()
+def in_memory_indexed_store_p_factory() -> IndexedInMemoryLogPaginatorFactory:
+    return IndexedInMemoryLogPaginatorFactory(
+        rows_store=IndexedRowsStore(),
+        paginator=InMemoryCursorPaginator,
+        sort_fields={k: k for k in ('id', 'action', 'created')},
     )
 
-    await create_db(engine)
-    session = scoped_session_cls()
-    await session.begin()
-
-    yield make_sqlalchemy_p_factory(session)
-
-    await session.rollback()
-    await drop_db(engine)
-    await engine.dispose()
-
 
 class PFactoryReq(pytest.FixtureRequest):
     param: str
 
 
+@pytest.fixture(params=['inclusive', 'strict'])
+def cursor_mode(request: PFactoryReq) -> str:
+    return request.param
+
+
 @pytest.fixture(
     params=[
         pytest.param(
             'sqlalchemy',
             marks=[pytest.mark.integration, pytest.mark.sqlalchemy],
         ),
+        pytest.param(
+            'sqlalchemy_expanded',
+            marks=[pytest.mark.integration, pytest.mark.sqlalchemy],
+        ),
+        pytest.param(
+            'sqlalchemy_stream',
+            marks=[pytest.mark.integration, pytest.mark.sqlalchemy],
+        ),
         'in_memory',
+        'in_memory_indexed_store',
     ],
 )
-def p_factory(request: PFactoryReq) -> LogPaginatorFactory[Any]:
+def p_factory(request: PFactoryReq, cursor_mode: str) -> LogPaginatorFactory[Any]:
     try:
-        return request.getfixturevalue(f'{request.param}_p_factory')
+        factory: LogPaginatorFactory[Any] = request.getfixturevalue(
+            f'{request.param}_p_factory',
+        )
     except pytest.FixtureLookupError:
         msg = f'Plugin or library "{request.param}" is not installed'
         pytest.skip(msg)
+    factory.paginator_kwargs['strict_cursor'] = cursor_mode == 'strict'
+    return factory
 
 
 @pytest.mark.parametrize(
@@ -181,6 +197,39 @@ async def test_sort_by_multiple_fields(
     assert _get_ids(results) == expected
 
 
+@pytest.mark.parametrize(
+    ('sort_by', 'expected'),
+    [
+        ('-action,id', [[3, 4], [5, 6], [1, 2], [5, 6], [3, 4]]),
+        ('action,-id', [[2, 1], [6, 5], [4, 3], [6, 5], [2, 1]]),
+        ('-action,-id', [[4, 3], [6, 5], [2, 1], [6, 5], [4, 3]]),
+        ('-action', [[4, 3], [6, 5], [2, 1], [6, 5], [4, 3]]),
+    ],
+)
+async def test_sort_by_mixed_directions(
+    sort_by,
+    expected,
+    p_factory: LogPaginatorFactory[Any],
+):
+    # arrange
+    p_factory.paginator_kwargs['mixed_ordering'] = True
+    create_log = p_factory.create_log
+    [await create_log(i, '') for i in range(1, 3)]
+    [await create_log(i, 'B') for i in range(3, 5)]
+    [await create_log(i, 'A') for i in range(5, 7)]
+    paginate = partial(p_factory.paginate, sort_fields=sort_by)
+    # act
+    p1 = await paginate()
+    p2 = await paginate(after=p1.next)
+    p3 = await paginate(after=p2.next)
+    p4 = await paginate(before=p3.prev)
+    p5 = await paginate(before=p4.prev)
+    # assert
+    assert _get_ids([p.rows for p in (p1, p2, p3, p4, p5)]) == expected
+    assert p3.next is None
+    assert p5.prev is None
+
+
 async def test_empty_store(p_factory: LogPaginatorFactory[Any]):
     # act
     page = await p_factory.paginate()
@@ -190,7 +239,289 @@ async def test_empty_store(p_factory: LogPaginatorFactory[Any]):
     assert page.next is None
 
 
-async def test_consistency_on_data_remove(p_factory: LogPaginatorFactory[Any]):
+async def test_fetch_size(p_factory: LogPaginatorFactory[Any], cursor_mode: str):
+    # arrange
+    for i in range(1, 10):
+        await p_factory.create_log(i)
+    p = p_factory.p
+    page = await p.paginate(p_factory.rows_store)
+    cursor = p._make_cursor(None, page.next, None)
+    # act
+    rows = await p._paginate_data(p_factory.rows_store, cursor)
+    # assert
+    assert len(rows) == (3 if cursor_mode == 'strict' else 4)
+    assert _rows_to_ids(rows)[-3:] == [3, 4, 5]
+
+
+async def test_paginate_many(p_factory: LogPaginatorFactory[Any]):
+    # arrange
+    for i in range(1, 6):
+        await p_factory.create_log(i, 'B' if i % 2 else 'A')
+    p, store = p_factory.p, p_factory.rows_store
+    first = await p.paginate(store, '-id')
+    requests = [
+        PageRequest(store),
+        PageRequest(store, 'action', size=3),
+        PageRequest(store, '-id', after=first.next),
+        PageRequest(store, '-id', before=first.next, size=1),
+    ]
+    # act
+    pages = await p.paginate_many(requests)
+    # assert
+    assert [_rows_to_ids(page.rows) for page in pages] == [
+        [1, 2],
+        [2, 4, 1],
+        [3, 2],
+        [5],
+    ]
+    for r, page in zip(requests, pages, strict=True):
+        expected = await p.paginate(r.store, r.sort_fields, r.before, r.after, r.size)
+        assert (page.prev, page.next) == (expected.prev, expected.next)
+
+
+async def test_paginate_many__err(p_factory: LogPaginatorFactory[Any]):
+    # arrange
+    store = p_factory.rows_store
+    # act
+    with pytest.raises(CursorValueErr):
+        await p_factory.p.paginate_many(
+            [PageRequest(store), PageRequest(store, after='bad_value')],
+        )
+
+
+@pytest.mark.parametrize('param', ['after', 'before'])
+@pytest.mark.parametrize(
+    ('sort_by', 'ahead', 'behind', 'expected'),
+    [
+        ('id', 1, 0, [[5, 6], [7, 8]]),
+        ('id', 2, 2, [[1, 2], [3, 4], [5, 6], [7, 8], [9]]),
+        ('id', 3, 0, [[5, 6], [7, 8], [9]]),
+        ('-id', 1, 1, [[7, 6], [5, 4], [3, 2]]),
+        ('-id', 0, 3, [[9, 8], [7, 6], [5, 4]]),
+    ],
+)
+async def test_paginate_window(
+    param,
+    sort_by,
+    ahead,
+    behind,
+    expected,
+    p_factory: LogPaginatorFactory[Any],
+):
+    # arrange
+    for i in range(1, 10):
+        await p_factory.create_log(i)
+    p, store = p_factory.p, p_factory.rows_store
+    second = await p.paginate(
+        store,
+        sort_by,
+        after=(await p.paginate(store, sort_by)).next,
+    )
+    fourth = await p.paginate(
+        store,
+        sort_by,
+        after=(await p.paginate(store, sort_by, after=second.next)).next,
+    )
+    before, after = (None, second.next) if param == 'after' else (fourth.prev, None)
+    # act
+    window = await p.paginate_window(
+        store,
+        sort_by,
+        before,
+        after,
+        ahead=ahead,
+        behind=behind,
+    )
+    # assert
+    assert [_rows_to_ids(page.rows) for page in window.pages] == expected
+    current = await p.paginate(store, sort_by, before, after)
+    assert window.current == current
+    for prev_page, page in zip(window.pages, window.pages[1:], strict=False):
+        expected_next = await p.paginate(store, sort_by, after=prev_page.next)
+        expected_prev = await p.paginate(store, sort_by, before=page.prev)
+        assert _page_links(page) == _page_links(expected_next)
+        assert _page_links(prev_page) == _page_links(expected_prev)
+
+
+async def test_paginate_window__edges(p_factory: LogPaginatorFactory[Any]):
+    # arrange
+    for i in range(1, 4):
+        await p_factory.create_log(i)
+    p, store = p_factory.p, p_factory.rows_store
+    # act
+    first = await p.paginate_window(store, ahead=3, behind=3)
+    last = await p.paginate_window(store, before=first.ahead[0].prev, behind=3)
+    # assert
+    assert first.behind == []
+    assert [_rows_to_ids(page.rows) for page in first.ahead] == [[3]]
+    assert _page_links(first.current) == _page_links(await p.paginate(store))
+    assert first.ahead[0].next is None
+    assert _page_links(last.current) == _page_links(first.current)
+    assert last.behind == []
+
+
+async def test_paginate_window__empty_store(p_factory: LogPaginatorFactory[Any]):
+    # act
+    window = await p_factory.p.paginate_window(p_factory.rows_store, ahead=2, behind=2)
+    # assert
+    assert window.current == await p_factory.paginate()
+    assert (window.behind, window.ahead) == ([], [])
+
+
+@pytest.mark.parametrize(('ahead', 'behind'), [(-1, 0), (0, -1)])
+async def test_paginate_window__err(ahead, behind):
+    # arrange
+    p = InMemoryCursorPaginator[Any]('id', {'id': 'id'})
+    # act
+    with pytest.raises(ConfigurationErr):
+        await p.paginate_window([], ahead=ahead, behind=behind)
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+@pytest.mark.parametrize(
+    ('sort_by', 'expected'),
+    [
+        ('id', [[1, 2, 3], [4, 5, 6], [7]]),
+        ('-action', [[7, 5, 3], [1, 6, 4], [2]]),
+    ],
+)
+async def test_iterate_pages(
+    sort_by,
+    expected,
+    prefetch,
+    p_factory: LogPaginatorFactory[Any],
+):
+    # arrange
+    for i in range(1, 8):
+        await p_factory.create_log(i, 'AB'[i % 2])
+    p = p_factory.p
+    # act
+    pages = [
+        _rows_to_ids(rows)
+        async for rows in p.iterate_pages(
+            p_factory.rows_store,
+            sort_by,
+            size=10,
+            prefetch=prefetch,
+        )
+    ]
+    ids = [
+        r.id async for r in p.iterate(p_factory.rows_store, sort_by, prefetch=prefetch)
+    ]
+    # assert
+    assert pages == expected
+    assert ids == [i for page in expected for i in page]
+
+
+async def test_iterate_pages__empty_and_break(p_factory: LogPaginatorFactory[Any]):
+    # arrange
+    p = p_factory.p
+    empty = [rows async for rows in p.iterate_pages(p_factory.rows_store)]
+    for i in range(1, 8):
+        await p_factory.create_log(i)
+    # act
+    pages = p.iterate_pages(p_factory.rows_store, prefetch=True)
+    first = await anext(pages)
+    await pages.aclose()
+    # assert
+    assert empty == []
+    assert _rows_to_ids(first) == [1, 2]
+
+
+@pytest.mark.parametrize(
+    ('count', 'expected'),
+    [
+        (CountStrategy(), PageTotal(5)),
+        (CountStrategy(CountMode.estimate), PageTotal(5)),
+        (CountStrategy(CountMode.capped, cap=3), PageTotal(3, TotalRelation.gte)),
+        (CountStrategy(CountMode.capped, cap=5), PageTotal(5)),
+    ],
+    ids=['exact', 'estimate', 'capped', 'capped_all'],
+)
+async def test_count(count, expected, p_factory: LogPaginatorFactory[Any]):
+    # arrange
+    for i in range(1, 6):
+        await p_factory.create_log(i)
+    p_factory.paginator_kwargs['count'] = count
+    # act
+    page = await p_factory.paginate()
+    pages = await p_factory.p.paginate_many([PageRequest(p_factory.rows_store)])
+    # assert
+    assert page.total == expected
+    assert pages[0].total == expected
+
+
+async def test_count_cache(p_factory: LogPaginatorFactory[Any]):
+    # arrange
+    await p_factory.create_log(1)
+    p_factory.paginator_kwargs['count'] = CountStrategy()
+    p = p_factory.p
+    store = p_factory.rows_store
+    cached = p._store_fingerprint(store) is not None
+    # act
+    page = await p.paginate(store)
+    await p_factory.create_log(2)
+    next_page = await p.paginate(store)
+    # assert
+    assert page.total == PageTotal(1)
+    assert next_page.total == PageTotal(1 if cached else 2)
+
+
+async def test_count_not_supported():
+    class Paginator(CursorPaginator[str, list[Any], Any]):
+        async def _paginate_data(self, store, cursor):
+            return store
+
+    # act
+    with pytest.raises(ConfigurationErr, match='Paginator does not support counting'):
+        Paginator(unq_field='id', sort_fields={'id': 'id'}, count=CountStrategy())
+
+
+async def test_instrumentation(p_factory: LogPaginatorFactory[Any], cursor_mode: str):
+    # arrange
+    for i in range(1, 6):
+        await p_factory.create_log(i)
+    expected = await p_factory.paginate(size=2)
+    expected_next = await p_factory.paginate(after=expected.next, size=2)
+    rec = RecordingInstrumentation()
+    p_factory.paginator_kwargs.update(instrumentation=rec, count=CountStrategy())
+    # act
+    page = await p_factory.paginate(size=2)
+    next_page = await p_factory.paginate(after=page.next, size=2)
+    # assert
+    assert (page.rows, page.next) == (expected.rows, expected.next)
+    assert (next_page.rows, next_page.prev) == (expected_next.rows, expected_next.prev)
+    stages = [
+        Stage.make_cursor,
+        Stage.fetch,
+        Stage.trim,
+        Stage.count,
+        Stage.encode_cursor,
+        Stage.paginate,
+    ]
+    assert rec.stages == stages * 2
+    # "size + 2" rows for the inclusive cursor, "size + 1" for the strict one
+    fetched = 4 if cursor_mode == 'inclusive' else 3
+    assert rec.pages == [(2, fetched, 2)] * 2
+
+
+async def test_instrumentation_cursor_err():
+    # arrange
+    i = RecordingInstrumentation()
+    p = InMemoryCursorPaginator[Any]('id', {'id': 'id'}, instrumentation=i)
+    # act
+    with pytest.raises(CursorValueErr):
+        await p.paginate([], after='bad_value')
+    # assert
+    assert len(i.errors) == 1
+    assert i.stages == [Stage.make_cursor, Stage.paginate]
+    assert i.pages == []
+
+
+async def test_consistency_on_data_remove(
+    p_factory: LogPaginatorFactory[Any],
+    cursor_mode: str,
+):
     # arrange
     _, log_2, log_3, _, _ = [await p_factory.create_log(i) for i in range(1, 6)]
     # act
@@ -200,7 +531,9 @@ async def test_consistency_on_data_remove(p_factory: LogPaginatorFactory[Any]):
     p2 = await p_factory.paginate(after=p1.next)
     # assert
     assert _rows_to_ids(p2.rows) == [4, 5]
-    assert p2.prev is None
+    # the inclusive cursor knows about previous rows from the removed cursor row,
+    # the strict cursor checks them separately
+    assert (p2.prev is not None) is (cursor_mode == 'strict')
     assert p2.next is None
 
 
@@ -243,6 +576,7 @@ async def test_null_cursor():
     [
         [{'id': 1, 'action': ''}, {'id': 2, 'action': ''}],
         [object(), object()],
+        [(1, ''), (2, '')],
     ],
 )
 async def test_invalid_data_attrs(data):
@@ -362,9 +696,156 @@ async def test_cursor_param__invalid_cursor_type(param, p_factory):
     assert exc.value.detail == 'Invalid cursor value'
 
 
+@pytest.mark.parametrize(
+    'sort_by',
+    ['id', '-id', 'action,created', '-action,id', '-action,created,-id'],
+)
+async def test_indexed_store_walk(sort_by):
+    # arrange
+    rnd = random.Random(sort_by)
+    now = utc_now()
+    rows = [
+        Log(i, rnd.choice('ABC'), now.replace(microsecond=rnd.randrange(50)))
+        for i in rnd.sample(range(1_000), 100)
+    ]
+    kw: dict[str, Any] = {
+        'unq_field': 'id',
+        'sort_fields': {k: k for k in ('id', 'action', 'created')},
+        'mixed_ordering': True,
+    }
+    p = InMemoryCursorPaginator[Log](**kw)
+    store = IndexedRowsStore(rows)
+    # act
+    pages, after = [], None
+    while True:
+        page = await p.paginate(store, sort_by, after=after, size=7)
+        expected = await p.paginate(rows, sort_by, after=after, size=7)
+        pages.append(page)
+        assert page == expected
+        if (after := page.next) is None:
+            break
+    back = await p.paginate(store, sort_by, before=pages[-1].prev, size=7)
+    # assert
+    assert back.rows == pages[-2].rows
+    assert [r.id for pg in pages for r in pg.rows] == _sorted_ids(rows, sort_by)
+
+
+async def test_indexed_store_update():
+    # arrange
+    p = InMemoryCursorPaginator[Log](
+        unq_field='id',
+        sort_fields={k: k for k in ('id', 'action')},
+        max_size=None,
+    )
+    now = utc_now()
+    logs = [Log(i, a, now) for i, a in enumerate('CABAC')]
+    store = IndexedRowsStore(logs[:3])
+    await p.paginate(store, 'action')
+    index = store._indexes[('action', 'id'), ()]
+    # act
+    store.add(logs[3])
+    store.add(logs[4])
+    store.remove(logs[0])
+    logs[1].action = 'Z'
+    store.remove(logs[1])
+    page = await p.paginate(store, 'action', size=10)
+    # assert
+    assert store._indexes[('action', 'id'), ()] is index
+    assert _rows_to_ids(page.rows) == [3, 2, 4]
+    assert index.keys == [('A', 3), ('B', 2), ('C', 4)]
+    with pytest.raises(ValueError, match='Row is not in the store'):
+        store.remove(logs[1])
+    with pytest.raises(ValueError, match='Row is already in the store'):
+        store.add(logs[2])
+
+
+async def test_sort_fields_cache():
+    # arrange
+    p = InMemoryCursorPaginator[Any](
+        unq_field='id',
+        sort_fields={'id': 'id', 'act': 'act'},
+        sort_cache_size=2,
+    )
+    # act
+    for _ in range(3):
+        await p.paginate([], sort_fields='-act')
+        with pytest.raises(SortParamErr) as exc:
+            await p.paginate([], sort_fields='id,act')
+    await p.paginate([], sort_fields='act')
+    await p.paginate([], sort_fields='-act')
+    # assert
+    assert exc.value.detail == 'Move "id" field to the end'
+    assert p.sort_cache_info.hits == 4
+    assert p.sort_cache_info.misses == 4
+    assert p.sort_cache_info.currsize == 2
+
+
+async def test_mixed_row_shapes():
+    # arrange
+    now = utc_now()
+    p = InMemoryCursorPaginator[Any](
+        unq_field='id',
+        sort_fields={'id': 'id', 'action': 'action'},
+    )
+    rows: list[Any] = [
+        {'id': 3, 'action': 'A'},
+        Log(2, 'A', now),
+        {'id': 1, 'action': 'B'},
+        Log(4, 'B', now),
+    ]
+    # act
+    p1 = await p.paginate(rows, 'action', size=3)
+    p2 = await p.paginate(rows, 'action', after=p1.next, size=3)
+    # assert
+    assert p1.rows == rows[1::-1] + rows[2:3]
+    assert p2.rows == rows[3:]
+
+
+async def test_named_tuple_rows():
+    # arrange
+    p = InMemoryCursorPaginator[Any](
+        unq_field='id',
+        sort_fields={'id': 'id', 'action': 'action'},
+    )
+    log_row = namedtuple('log_row', ['id', 'action'])
+    other_row = namedtuple('other_row', ['action', 'id'])
+    rows = [log_row(i, 'AB'[i % 2]) for i in range(1, 5)]
+    other_rows = [other_row('AB'[i % 2], i) for i in range(1, 5)]
+    # act
+    p1 = await p.paginate(rows, 'action', size=2)
+    p2 = await p.paginate(rows, 'action', after=p1.next, size=2)
+    other_p1 = await p.paginate(other_rows, 'action', size=2)
+    # assert
+    assert [r.id for r in p1.rows + p2.rows] == [2, 4, 1, 3]
+    assert p1.next == other_p1.next
+
+
+def test_init__invalid_sort_cache_size():
+    # act
+    with pytest.raises(ConfigurationErr):
+        InMemoryCursorPaginator(
+            unq_field='id',
+            sort_fields={'id': 'id'},
+            sort_cache_size=-1,
+        )
+
+
+def _sorted_ids(rows: list[Log], sort_by: str) -> list[int]:
+    fields = sort_by.split(',')
+    if fields[-1].removeprefix('-') != 'id':
+        fields.append('-id' if fields[0].startswith('-') else 'id')
+    for f in reversed(fields):
+        rows = sorted(rows, key=attrgetter(f.removeprefix('-')), reverse=f[0] == '-')
+    return [r.id for r in rows]
+
+
 def _get_ids(all_rows: list[list[Any]]) -> list[list[int]]:
     return [_rows_to_ids(rows) for rows in all_rows]
 
 
+def _page_links(page: CursorPaginationPage[Any]) -> tuple[Any, ...]:
+    return _rows_to_ids(page.rows), page.prev, page.next
+
+
 def _rows_to_ids(rows: list[Any]) -> list[int]:
     return [cast(int, row.id) for row in rows]
@@ -0,0 +1,125 @@
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+
+from ._data_structures import utc_now
+
+
+if TYPE_CHECKING:
+    from ._ext_sqlalchemy import SQLAlchemyLogPaginatorFactory
+
+
+pytestmark = [pytest.mark.integration, pytest.mark.sqlalchemy]
+
+
+async def _fill(factory: 'SQLAlchemyLogPaginatorFactory') -> None:
+    now = utc_now()
+    for i in range(1, 51):
+        await factory.create_log(i, f'action_{i % 5}', now - timedelta(minutes=i))
+    await factory.rows_store[0].flush()
+
+
+async def test_sort_specs(sqlalchemy_p_factory):
+    from paginate_any.ext.sqlalchemy_advisor import sort_specs
+
+    # act
+    specs = sort_specs(sqlalchemy_p_factory.p, max_fields=1)
+    # assert
+    assert specs == ['id', '-id', 'action,id', '-action,id', 'created,id', '-created,id']
+
+
+async def test_check_keyset_indexes(sqlalchemy_p_factory):
+    from paginate_any.ext.sqlalchemy_advisor import check_keyset_indexes
+
+    # arrange
+    await _fill(sqlalchemy_p_factory)
+    # act
+    reports = await check_keyset_indexes(
+        sqlalchemy_p_factory.p,
+        sqlalchemy_p_factory.rows_store,
+        sorts=['-id', 'action'],
+    )
+    # assert
+    by_id, by_action = reports
+    assert by_id.ok
+    assert by_id.index_ddl == 'CREATE INDEX ix_logs_id ON logs (id)'
+    assert not by_action.ok
+    assert by_action.uses_sort
+    assert by_action.sort_fields == ('action', 'id')
+    assert by_action.index_ddl == 'CREATE INDEX ix_logs_action_id ON logs (action, id)'
+
+
+async def test_check_keyset_indexes_with_index(sqlalchemy_p_factory):
+    from paginate_any.ext.sqlalchemy_advisor import check_keyset_indexes
+    from sqlalchemy import text
+
+    # arrange
+    await _fill(sqlalchemy_p_factory)
+    session, stmt = sqlalchemy_p_factory.rows_store
+    await session.execute(text('CREATE INDEX ix_logs_created_id ON logs (created, id)'))
+    # act
+    reports = await check_keyset_indexes(
+        sqlalchemy_p_factory.p,
+        (session, stmt),
+        sorts=['created', '-created'],
+    )
+    # assert
+    assert [r.ok for r in reports] == [True, True]
+    assert all('USING INDEX ix_logs_created_id' in ''.join(r.plan) for r in reports)
+
+
+async def test_check_keyset_indexes_empty_table(sqlalchemy_p_factory):
+    from paginate_any.ext.sqlalchemy_advisor import check_keyset_indexes
+    from sqlalchemy import text
+
+    # arrange
+    session, stmt = sqlalchemy_p_factory.rows_store
+    await session.execute(text('CREATE INDEX ix_logs_action_id ON logs (action, id)'))
+    # act
+    reports = await check_keyset_indexes(
+        sqlalchemy_p_factory.p,
+        (session, stmt),
+        sorts=['action', '-action'],
+    )
+    # assert
+    assert all('SCAN logs USING INDEX ix_logs_action_id' in r.plan for r in reports)
+    assert [r.ok for r in reports] == [True, True]
+
+
+@pytest.mark.parametrize(
+    ('line', 'expected'),
+    [
+        ('SCAN logs', True),
+        ('SCAN logs USING INDEX ix_logs_action_id', False),
+        ('SCAN logs USING COVERING INDEX ix_logs_action_id', False),
+        ('SEARCH logs USING INDEX ix_logs_action_id (action>?)', False),
+    ],
+)
+def test_check_sqlite_plan_full_scan(line, expected):
+    from paginate_any.ext.sqlalchemy_advisor import _check_sqlite_plan
+
+    # act
+    _, uses_full_scan = _check_sqlite_plan([line])
+    # assert
+    assert uses_full_scan is expected
+
+
+async def test_check_keyset_indexes_mixed_ordering(sqlalchemy_p_factory):
+    from paginate_any.ext.sqlalchemy_advisor import check_keyset_indexes, sort_specs
+
+    # arrange
+    await _fill(sqlalchemy_p_factory)
+    sqlalchemy_p_factory.paginator_kwargs['mixed_ordering'] = True
+    p = sqlalchemy_p_factory.p
+    # act
+    reports = await check_keyset_indexes(
+        p,
+        sqlalchemy_p_factory.rows_store,
+        sorts=['-created,id'],
+    )
+    # assert
+    assert len(sort_specs(p, max_fields=1)) == 2 + 4 + 4
+    assert reports[0].index_ddl == (
+        'CREATE INDEX ix_logs_created_id_desc ON logs (created, id DESC)'
+    )
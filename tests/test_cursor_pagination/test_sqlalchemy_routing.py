@@ -0,0 +1,185 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+import pytest_asyncio
+from paginate_any.exc import ConfigurationErr
+
+
+sqlalchemy = pytest.importorskip('sqlalchemy')
+
+pytestmark = [pytest.mark.integration, pytest.mark.sqlalchemy]
+
+_DBS = ('primary', 'r0', 'r1')
+
+
+@pytest_asyncio.fixture()
+async def engines(tmp_path) -> AsyncGenerator[dict[str, Any], None]:
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from ._data_structures import utc_now
+    from ._ext_sqlalchemy import Base, SALog
+
+    engines = {
+        name: create_async_engine(f'sqlite+aiosqlite:///{tmp_path / name}.db')
+        for name in (*_DBS, 'broken')
+    }
+    now = utc_now()
+    # Every database has its own "action" to find a source of pages
+    for name in _DBS:
+        async with engines[name].begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engines[name]) as s, s.begin():
+            s.add_all(SALog(id=i, action=name, created=now) for i in range(1, 6))
+    yield engines
+    for engine in engines.values():
+        await engine.dispose()
+
+
+@pytest_asyncio.fixture()
+async def primary(engines) -> AsyncGenerator[Any, None]:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    async with AsyncSession(engines['primary']) as session:
+        yield session
+
+
+def _paginator(router) -> Any:
+    from paginate_any.ext.sqlalchemy import SQLAlchemyCursorPaginator
+
+    from ._ext_sqlalchemy import SALog
+
+    return SQLAlchemyCursorPaginator[SALog](
+        unq_field='id',
+        sort_fields={'id': SALog.id},
+        default_size=2,
+        router=router,
+    )
+
+
+async def _sources(p, primary, count: int = 1) -> list[str]:
+    from ._ext_sqlalchemy import SALog
+
+    pages = [await p.paginate((primary, sqlalchemy.select(SALog))) for _ in range(count)]
+    return [page.rows[0].action for page in pages]
+
+
+async def test_round_robin(engines, primary):
+    from paginate_any.ext.sqlalchemy_routing import SessionRouter
+
+    # arrange
+    p = _paginator(SessionRouter([engines['r0'], engines['r1']]))
+    # act
+    sources = await _sources(p, primary, 4)
+    # assert
+    assert sources == ['r0', 'r1', 'r0', 'r1']
+
+
+async def test_least_loaded(engines, primary):
+    from paginate_any.ext.sqlalchemy_routing import RoutingStrategy, SessionRouter
+
+    # arrange
+    router = SessionRouter(
+        [engines['r0'], engines['r1']],
+        RoutingStrategy.least_loaded,
+    )
+    router._loads[0] = 1
+    p = _paginator(router)
+    # act
+    sources = await _sources(p, primary, 2)
+    # assert
+    assert sources == ['r1', 'r1']
+
+
+async def test_fallback_to_primary(engines, primary):
+    from paginate_any.ext.sqlalchemy_routing import SessionRouter
+
+    # arrange
+    router = SessionRouter([engines['broken'], engines['r1']])
+    p = _paginator(router)
+    # act
+    sources = await _sources(p, primary, 2)
+    # assert
+    assert sources == ['primary', 'r1']
+    assert router._loads == [0, 0]
+
+
+class _QueryCanceled(Exception):
+    sqlstate = '57014'
+
+
+@pytest.mark.parametrize(
+    'exc',
+    [
+        pytest.param(
+            lambda: sqlalchemy.exc.OperationalError('SELECT', None, _QueryCanceled()),
+            id='statement_timeout',
+        ),
+        pytest.param(
+            lambda: sqlalchemy.exc.ProgrammingError('SELECT', None, Exception()),
+            id='query_err',
+        ),
+        pytest.param(asyncio.CancelledError, id='cancelled'),
+    ],
+)
+async def test_replica_err_not_retried(exc, engines, primary):
+    from paginate_any.ext.sqlalchemy_routing import SessionRouter
+
+    # arrange
+    router = SessionRouter([engines['r0']])
+    sessions = []
+
+    async def query(session: Any) -> None:
+        sessions.append(session)
+        raise exc()
+
+    # act
+    with pytest.raises((sqlalchemy.exc.DBAPIError, asyncio.CancelledError)):
+        await router.run(primary, query)
+    # assert
+    assert len(sessions) == 1
+    assert sessions[0] is not primary
+    assert router._loads == [0]
+
+
+async def test_read_your_writes(engines, primary):
+    from paginate_any.ext.sqlalchemy_routing import SessionRouter
+
+    # arrange
+    router = SessionRouter([engines['r0']], read_your_writes=60)
+    p = _paginator(router)
+    # act
+    with router.bind('user_1'):
+        before_write = await _sources(p, primary)
+        router.mark_write()
+        after_write = await _sources(p, primary)
+    with router.bind('user_2'):
+        other_key = await _sources(p, primary)
+    without_key = await _sources(p, primary)
+    # assert
+    assert before_write == ['r0']
+    assert after_write == ['primary']
+    assert other_key == ['r0']
+    assert without_key == ['r0']
+
+
+async def test_without_replicas(primary):
+    from paginate_any.ext.sqlalchemy_routing import SessionRouter
+
+    # arrange
+    p = _paginator(SessionRouter([]))
+    # act
+    sources = await _sources(p, primary)
+    # assert
+    assert sources == ['primary']
+
+
+def test_configuration_err():
+    from paginate_any.ext.sqlalchemy_routing import SessionRouter
+
+    # act
+    with pytest.raises(ConfigurationErr):
+        SessionRouter([], read_your_writes=0)
+    with pytest.raises(ConfigurationErr):
+        SessionRouter([]).mark_write('user_1')
@@ -0,0 +1,213 @@
+from collections.abc import Generator
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from paginate_any.cursor_pagination import (
+    IndexedRowsStore,
+    InMemoryCursorPaginator,
+    SyncCursorPaginator,
+    SyncInMemoryCursorPaginator,
+)
+from paginate_any.datastruct import CountStrategy, PageTotal
+from paginate_any.exc import ConfigurationErr
+from paginate_any.instrumentation import Stage
+
+from ._data_structures import Log, RecordingInstrumentation, utc_now
+
+
+_SORT_FIELDS = ('id', 'action', 'created')
+_NOW = utc_now()
+
+
+def _make_logs() -> list[Log]:
+    now = _NOW
+    return [Log(i, 'AB'[i % 2], now - timedelta(seconds=i % 3)) for i in range(1, 10)]
+
+
+@pytest.fixture()
+def sync_in_memory() -> tuple[SyncCursorPaginator[Any, Any, Any], Any]:
+    p = SyncInMemoryCursorPaginator[Log](
+        unq_field='id',
+        sort_fields={k: k for k in _SORT_FIELDS},
+        default_size=2,
+        count=CountStrategy(),
+    )
+    return p, IndexedRowsStore(_make_logs())
+
+
+@pytest.fixture()
+def sync_sqlalchemy() -> (
+    Generator[tuple[SyncCursorPaginator[Any, Any, Any], Any], None, None]
+):
+    sqlalchemy = pytest.importorskip('sqlalchemy')
+    from paginate_any.ext.sqlalchemy import SyncSQLAlchemyCursorPaginator
+    from sqlalchemy.orm import Session
+
+    from ._ext_sqlalchemy import Base, SALog
+
+    engine = sqlalchemy.create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            SALog(id=log.id, action=log.action, created=log.created)
+            for log in _make_logs()
+        )
+        session.flush()
+        p = SyncSQLAlchemyCursorPaginator[SALog](
+            unq_field='id',
+            sort_fields={
+                'id': SALog.id,
+                'action': SALog.action,
+                'created': SALog.created,
+            },
+            default_size=2,
+            count=CountStrategy(),
+            yield_per=1,
+        )
+        yield p, (session, sqlalchemy.select(SALog))
+    engine.dispose()
+
+
+@pytest.fixture(params=['sync_in_memory', 'sync_sqlalchemy'])
+def sync_p(
+    request: pytest.FixtureRequest,
+) -> tuple[SyncCursorPaginator[Any, Any, Any], Any]:
+    return request.getfixturevalue(request.param)
+
+
+@pytest.mark.parametrize('strict_cursor', [False, True])
+@pytest.mark.parametrize('sort_by', ['id', '-created', '-action,created'])
+async def test_sync_paginate(sort_by, strict_cursor, sync_p):
+    # arrange
+    p, store = sync_p
+    p._strict_cursor = strict_cursor
+    expected_p = InMemoryCursorPaginator[Log](
+        unq_field='id',
+        sort_fields={k: k for k in _SORT_FIELDS},
+        default_size=2,
+    )
+    logs = _make_logs()
+    # act
+    pages, after = [], None
+    while True:
+        page = p.paginate(store, sort_by, after=after)
+        expected = await expected_p.paginate(logs, sort_by, after=after)
+        pages.append(page)
+        assert [r.id for r in page.rows] == [r.id for r in expected.rows]
+        assert (page.prev, page.next) == (expected.prev, expected.next)
+        if (after := page.next) is None:
+            break
+    back = p.paginate(store, sort_by, before=pages[-1].prev)
+    # assert
+    assert [r.id for r in back.rows] == [r.id for r in pages[-2].rows]
+    assert page.total == PageTotal(9)
+
+
+def test_sync_instrumentation(sync_p):
+    # arrange
+    p, store = sync_p
+    expected = p.paginate(store, '-created', size=3)
+    p._instrumentation = i = RecordingInstrumentation()
+    # act
+    page = p.paginate(store, '-created', size=3)
+    # assert
+    assert (page.rows, page.next) == (expected.rows, expected.next)
+    assert i.stages == [
+        Stage.make_cursor,
+        Stage.fetch,
+        Stage.trim,
+        Stage.count,
+        Stage.encode_cursor,
+        Stage.paginate,
+    ]
+    assert i.pages == [(3, 5, 3)]
+
+
+def test_sync_slow_page_detector(sync_sqlalchemy):
+    from paginate_any.ext.sqlalchemy import SlowPageDetector
+
+    # arrange
+    p, store = sync_sqlalchemy
+    p._slow_pages = detector = SlowPageDetector(threshold=0)
+    # act
+    page = p.paginate(store, 'action', size=3)
+    # assert
+    (record,) = detector.records
+    assert record.cursor == page.cursor_params
+    assert record.rows == 5
+    assert 'ORDER BY logs.action, logs.id' in record.sql
+
+
+def test_sync_slow_page_detector_err(sync_sqlalchemy, mocker):
+    from paginate_any.ext.sqlalchemy import SlowPageDetector
+    from sqlalchemy.exc import OperationalError
+
+    # arrange
+    p, store = sync_sqlalchemy
+    p._slow_pages = detector = SlowPageDetector(threshold=0)
+    err = OperationalError('SELECT', None, Exception('canceling statement'))
+    mocker.patch.object(type(p), '_query_page', side_effect=err)
+    # act
+    with pytest.raises(OperationalError):
+        p.paginate(store, 'action', size=3)
+    # assert
+    (record,) = detector.records
+    assert record.error == 'OperationalError'
+    assert record.rows == 0
+
+
+def test_sync_iterate(sync_p):
+    # arrange
+    p, store = sync_p
+    # act
+    pages = [[r.id for r in rows] for rows in p.iterate_pages(store, '-action', size=4)]
+    ids = [r.id for r in p.iterate(store, '-action', size=4)]
+    # assert
+    assert pages == [[9, 7, 5, 3], [1, 8, 6, 4], [2]]
+    assert ids == [i for page in pages for i in page]
+
+
+def test_sync_count_not_supported():
+    # arrange
+    class NoCountPaginator(SyncCursorPaginator[str, list[Log], Log]):
+        def _paginate_data(self, store, cursor):
+            return store
+
+    # act
+    with pytest.raises(ConfigurationErr):
+        NoCountPaginator('id', {'id': 'id'}, count=CountStrategy())
+
+
+def test_sync_session_bound_per_mapper():
+    sqlalchemy = pytest.importorskip('sqlalchemy')
+    from paginate_any.ext.sqlalchemy import SyncSQLAlchemyCursorPaginator
+    from sqlalchemy.orm import Session
+
+    from ._ext_sqlalchemy import Base, SALog
+
+    # arrange
+    engine = sqlalchemy.create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    p = SyncSQLAlchemyCursorPaginator[SALog](
+        unq_field='id',
+        sort_fields={'id': SALog.id},
+        default_size=2,
+        strict_cursor=True,
+        count=CountStrategy(),
+    )
+    with Session(binds={Base: engine}) as session:
+        session.add_all(
+            SALog(id=log.id, action=log.action, created=log.created)
+            for log in _make_logs()
+        )
+        session.flush()
+        store = (session, sqlalchemy.select(SALog))
+        # act
+        p1 = p.paginate(store)
+        p2 = p.paginate(store, after=p1.next)
+    engine.dispose()
+    # assert
+    assert [r.id for r in p2.rows] == [3, 4]
+    assert p2.prev is not None
+    assert p2.total == PageTotal(9)
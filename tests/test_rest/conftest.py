@@ -1,4 +1,5 @@
 import sys
+from functools import partial
 from string import ascii_uppercase
 from typing import Any
 
@@ -20,10 +21,15 @@ def fastapi_fab(paginator, store):
 
     from paginate_any.ext.fastapi import (
         FastApiCursorPagination,
+        PaginationJSONResponse,
         init_paginate_any_fastapi_app,
     )
 
-    def wrap(conf: PaginationConf | None = None) -> tuple[FastAPI, AsyncClient]:
+    def wrap(
+        conf: PaginationConf | None = None,
+        *,
+        json_bytes: bool = False,
+    ) -> tuple[FastAPI, AsyncClient]:
         app = FastAPI()
         init_paginate_any_fastapi_app(app)
 
@@ -31,6 +37,8 @@ def fastapi_fab(paginator, store):
         async def paginate(request: Request):
             pagination = FastApiCursorPagination(paginator, conf)
             pagination_result = await pagination.paginate(request, store)
+            if json_bytes:
+                return PaginationJSONResponse(pagination_result)
             resp = pagination_result.json_resp()
             return resp
 
@@ -39,6 +47,11 @@ def fastapi_fab(paginator, store):
     return wrap
 
 
+@pytest.fixture()
+def fastapi_json_fab(fastapi_fab):
+    return partial(fastapi_fab, json_bytes=True)
+
+
 @pytest.fixture()
 def sanic_fab(paginator, store):
     try:
@@ -57,10 +70,13 @@ def sanic_fab(paginator, store):
     from paginate_any.ext.sanic import (
         SanicJsonCursorPagination,
         init_paginate_any_sanic_app,
+        pagination_json,
     )
 
     def wrap(
         conf: PaginationConf | None = None,
+        *,
+        json_bytes: bool = False,
     ) -> tuple[Sanic[Any, Any], SanicASGITestClient]:
         app = Sanic('test_app')
         app.config.FALLBACK_ERROR_FORMAT = 'json'
@@ -74,6 +90,8 @@ def sanic_fab(paginator, store):
         async def paginate(request):
             pagination = SanicJsonCursorPagination(paginator, conf)
             pagination_result = await pagination.paginate(request, store)
+            if json_bytes:
+                return pagination_json(pagination_result)
             res = pagination_result.json_resp()
             return response.raw(msgspec.json.encode(res))
 
@@ -82,6 +100,11 @@ def sanic_fab(paginator, store):
     return wrap
 
 
+@pytest.fixture()
+def sanic_json_fab(sanic_fab):
+    return partial(sanic_fab, json_bytes=True)
+
+
 @pytest.fixture()
 def paginator():
     return InMemoryCursorPaginator(
@@ -0,0 +1,33 @@
+from dataclasses import replace
+from decimal import Decimal
+
+import msgspec.json
+from paginate_any.rest_api import PaginationConf, PaginationResult
+
+
+async def test_to_json_bytes(paginator, store):
+    # arrange
+    page = await paginator.paginate(store)
+    result = PaginationResult(page, PaginationConf(), next_link='/?after=kQI%3D')
+    # act
+    body = result.to_json_bytes()
+    # assert
+    assert msgspec.json.decode(body) == {
+        'data': [{'id': 1, 'name': 'Z'}, {'id': 2, 'name': 'Y'}],
+        'links': {'next': '/?after=kQI%3D'},
+        'pagination': {'after': 'kQI=', 'size': 2},
+    }
+
+
+async def test_to_json_bytes_custom_encoder(paginator, store):
+    # arrange
+    page = await paginator.paginate(store)
+    page = replace(page, rows=[{'id': 1, 'price': Decimal('1.5')}])
+    result = PaginationResult(page, PaginationConf())
+    encoder = msgspec.json.Encoder(decimal_format='number')
+    # act
+    default_body = result.to_json_bytes()
+    custom_body = result.to_json_bytes(encoder)
+    # assert
+    assert msgspec.json.decode(default_body)['data'] == [{'id': 1, 'price': '1.5'}]
+    assert msgspec.json.decode(custom_body)['data'] == [{'id': 1, 'price': 1.5}]
@@ -3,8 +3,12 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 import pytest
-from paginate_any.exc import CursorParamsErr
-from paginate_any.rest_api import PaginationConf, set_default_conf
+from paginate_any.cursor_pagination import InMemoryCursorPaginator
+from paginate_any.datastruct import CountMode, CountStrategy
+from paginate_any.exc import CursorParamsErr, PaginationTimeoutErr
+from paginate_any.instrumentation import Stage, TimedInstrumentation
+from paginate_any.page_cache import CachedCursorPaginator, InProcessPageCache
+from paginate_any.rest_api import LinksMode, PaginationConf, set_default_conf
 
 
 if TYPE_CHECKING:
@@ -18,7 +22,7 @@ class AppFabReq(pytest.FixtureRequest):
     param: str
 
 
-@pytest.fixture(params=['fastapi', 'sanic'])
+@pytest.fixture(params=['fastapi', 'fastapi_json', 'sanic', 'sanic_json'])
 @pytest.mark.filterwarnings('ignore::DeprecationWarning')
 def app_fab(request: AppFabReq):
     return request.getfixturevalue(f'{request.param}_fab')
@@ -72,6 +76,150 @@ async def test_pagination(app_fab):
     }
 
 
+@pytest.mark.parametrize(
+    'paginator',
+    [
+        InMemoryCursorPaginator(
+            'id',
+            sort_fields={'id': 'id'},
+            default_size=2,
+            count=CountStrategy(CountMode.capped, cap=3),
+        ),
+    ],
+)
+async def test_pagination_total(paginator, app_fab):
+    app, cli = app_fab()
+
+    resp = await cli.get('/')
+
+    assert resp.status_code == 200, resp.content
+    assert resp.json()['pagination'] == {
+        'after': 'kQI=',
+        'size': 2,
+        'total': {'value': 3, 'relation': 'gte'},
+    }
+
+
+async def test_pagination_links_keep_query(app_fab):
+    app, cli = app_fab(conf=PaginationConf(after_param='page[after]'))
+
+    resp = await cli.get('/?q=a%20b&flag&page%5Bafter%5D=kQA%3D&size=1&q=%7E&size=3')
+
+    assert resp.status_code == 200, resp.content
+    assert resp.json()['links'] == {
+        'next': f'{cli.base_url}/?page%5Bafter%5D=kQE%3D&q=a%20b&flag&size=1&q=%7E&size=3',
+    }
+
+
+@pytest.mark.parametrize(
+    ('links', 'prefix'),
+    [(LinksMode.relative, '/'), (LinksMode.query, '')],
+)
+async def test_pagination_links_mode(links, prefix, app_fab):
+    app, cli = app_fab(conf=PaginationConf(links=links))
+
+    resp = await cli.get('/?after=kQI%3D&size=1&q=1')
+
+    assert resp.status_code == 200, resp.content
+    assert resp.json()['links'] == {
+        'prev': f'{prefix}?before=kQM%3D&size=1&q=1',
+        'next': f'{prefix}?after=kQM%3D&size=1&q=1',
+    }
+
+
+async def test_pagination_without_links(app_fab):
+    app, cli = app_fab(conf=PaginationConf(links=LinksMode.none))
+
+    resp = await cli.get('/?after=kQI%3D&size=1')
+
+    assert resp.status_code == 200, resp.content
+    assert resp.json() == {
+        'data': [{'id': 3, 'name': 'X'}],
+        'pagination': {'after': 'kQM=', 'before': 'kQM=', 'size': 1},
+    }
+
+
+class _StagesInstrumentation(TimedInstrumentation):
+    def __init__(self) -> None:
+        self.stages: list[Stage] = []
+
+    def on_stage(self, stage: Stage, seconds: float) -> None:
+        self.stages.append(stage)
+
+
+_stages_instrumentation = _StagesInstrumentation()
+
+
+@pytest.mark.parametrize(
+    'paginator',
+    [
+        InMemoryCursorPaginator(
+            'id',
+            sort_fields={'id': 'id'},
+            default_size=2,
+            instrumentation=_stages_instrumentation,
+        ),
+    ],
+)
+async def test_pagination_instrumentation(paginator, app_fab):
+    app, cli = app_fab()
+    _stages_instrumentation.stages.clear()
+
+    resp = await cli.get('/')
+
+    assert resp.status_code == 200, resp.content
+    assert _stages_instrumentation.stages == [
+        Stage.parse_query,
+        Stage.make_cursor,
+        Stage.fetch,
+        Stage.trim,
+        Stage.encode_cursor,
+        Stage.paginate,
+        Stage.links,
+    ]
+
+
+@pytest.mark.parametrize(
+    'paginator',
+    [
+        CachedCursorPaginator(
+            InMemoryCursorPaginator(
+                'id',
+                sort_fields={'id': 'id'},
+                default_size=2,
+                instrumentation=_stages_instrumentation,
+            ),
+            InProcessPageCache(),
+            store_key=lambda _: 'cars',
+        ),
+    ],
+)
+async def test_pagination_cached_paginator(paginator, app_fab):
+    app, cli = app_fab()
+    await paginator.invalidate()
+    _stages_instrumentation.stages.clear()
+
+    resp = await cli.get('/')
+    cached_resp = await cli.get('/')
+
+    assert resp.status_code == 200, resp.content
+    assert cached_resp.json() == resp.json()
+    assert resp.json()['pagination'] == {'after': 'kQI=', 'size': 2}
+    assert _stages_instrumentation.stages == [
+        Stage.parse_query,
+        Stage.make_cursor,
+        Stage.fetch,
+        Stage.trim,
+        Stage.encode_cursor,
+        Stage.paginate,
+        Stage.links,
+        Stage.parse_query,
+        Stage.make_cursor,
+        Stage.paginate,
+        Stage.links,
+    ]
+
+
 @pytest.fixture()
 def global_conf():
     conf = PaginationConf(size_param='superSize')
@@ -189,3 +337,25 @@ async def test_any_cursor_params_err(paginator, app_fab, mocker: MockerFixture):
 
     assert resp.status_code == 400, resp.content
     assert resp.json() == {'errors': [{'title': 'Some error'}]}
+
+
+async def test_pagination_timeout_err(paginator, app_fab, mocker: MockerFixture):
+    app, cli = app_fab()
+    mocker.patch.object(
+        paginator,
+        'paginate',
+        side_effect=PaginationTimeoutErr('Query is not finished in 1 seconds', 5),
+    )
+
+    resp = await cli.get('/')
+
+    assert resp.status_code == 503, resp.content
+    assert resp.headers['Retry-After'] == '5'
+    assert resp.json() == {
+        'errors': [
+            {
+                'title': 'Pagination timeout',
+                'detail': 'Query is not finished in 1 seconds',
+            },
+        ],
+    }